@@ -3,9 +3,11 @@ from fastapi import APIRouter, Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from pydantic import BaseModel, Field, EmailStr
 import jwt
+import time
 from datetime import datetime, timedelta
 
 from services.auth_service import AuthService
+from services.token_cache import TokenCache
 from utils.config_utils import get_jwt_config
 
 router = APIRouter(prefix="/api/auth", tags=["认证"])
@@ -48,6 +50,10 @@ async def get_current_user_id(token: str = Depends(oauth2_scheme)) -> int:
     Raises:
         HTTPException: 如果令牌无效或过期
     """
+    # 同一令牌验证过一次后，在过期前直接使用缓存的结果
+    user_id = TokenCache.get(token)
+    if user_id is not None:
+        return user_id
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         user_id: int = payload.get("user_id")
@@ -57,7 +63,6 @@ async def get_current_user_id(token: str = Depends(oauth2_scheme)) -> int:
                 detail="无效的令牌",
                 headers={"WWW-Authenticate": "Bearer"},
             )
-        return user_id
     except jwt.ExpiredSignatureError:
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
@@ -70,6 +75,14 @@ async def get_current_user_id(token: str = Depends(oauth2_scheme)) -> int:
             detail="无效的令牌",
             headers={"WWW-Authenticate": "Bearer"},
         )
+    if TokenCache.is_revoked(token, user_id, payload.get("iat")):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="令牌已注销",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+    TokenCache.put(token, user_id, payload["exp"], payload.get("iat"))
+    return user_id
 
 def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta] = None) -> str:
     """
@@ -83,8 +96,10 @@ def create_access_token(data: Dict[str, Any], expires_delta: Optional[timedelta]
         str: JWT令牌
     """
     to_encode = data.copy()
-    expire = datetime.utcnow() + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
-    to_encode.update({"exp": expire})
+    now = datetime.utcnow()
+    expire = now + (expires_delta or timedelta(minutes=ACCESS_TOKEN_EXPIRE_MINUTES))
+    # iat用于按用户吊销此前签发的令牌，保留小数部分，与同一秒内的吊销时间可以区分先后
+    to_encode.update({"exp": expire, "iat": time.time()})
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
@@ -137,4 +152,11 @@ async def get_current_user(user_id: int = Depends(get_current_user_id)):
 @router.get("/verify", response_model=TokenVerify)
 async def verify_token(user_id: int = Depends(get_current_user_id)):
     """验证令牌是否有效"""
-    return {"valid": True} 
\ No newline at end of file
+    return {"valid": True}
+
+@router.post("/logout")
+async def logout(token: str = Depends(oauth2_scheme), user_id: int = Depends(get_current_user_id)):
+    """注销当前令牌，之后使用该令牌的请求返回401"""
+    payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM], options={"verify_exp": False})
+    TokenCache.revoke(token, payload["exp"])
+    return {"success": True}
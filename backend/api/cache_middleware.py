@@ -0,0 +1,281 @@
+import time
+import asyncio
+import weakref
+from typing import Dict, List, Any, Optional, Iterable, Tuple
+import orjson
+from fastapi import HTTPException
+from fastapi.routing import APIRoute
+from starlette.datastructures import Headers
+from api.auth_api import get_current_user_id
+from utils.cache_utils import (
+    CachedResponse, MemoryLRU, SharedCacheBackend, SHARED_BACKENDS, body_etag, response_cache_key
+)
+from utils.logger_utils import setup_logger
+
+# 配置日志
+logger = setup_logger(name="cache_middleware")
+
+
+def _depends_on(dependant, call) -> bool:
+    """依赖树中是否包含指定依赖函数"""
+    return any(dep.call is call or _depends_on(dep, call) for dep in dependant.dependencies)
+
+
+def _header(headers: List[Tuple[bytes, bytes]], name: bytes) -> Optional[bytes]:
+    for k, v in headers:
+        if k.lower() == name:
+            return v
+    return None
+
+
+class ResponseCacheMiddleware:
+    """
+    只读数据接口的响应缓存中间件
+
+    - 缓存键为路径加规范化后的查询参数，与用户无关
+    - 两级缓存：按字节数限制容量的进程内LRU，以及可选的共享缓存层
+    - 同一个键同时只有一个请求访问后端，其余请求等待其结果（single-flight）
+    - 设置ETag和Cache-Control，If-None-Match一致时返回304
+    - 需要登录的接口，命中缓存时仍先校验令牌，校验失败交给接口返回401
+
+    只缓存HTTP 200且业务code为200的JSON响应；请求带Cache-Control: no-cache时跳过读取缓存
+    """
+
+    # 已创建的中间件实例，数据重新导入后由clear_all统一清空
+    _instances: "weakref.WeakSet[ResponseCacheMiddleware]" = weakref.WeakSet()
+
+    def __init__(
+        self,
+        app,
+        prefixes: Iterable[str] = ("/api/data/specialist",),
+        exclude: Iterable[str] = (),
+        ttl: int = 3600,
+        max_bytes: int = 64 * 1024 * 1024,
+        max_entry_bytes: int = 2 * 1024 * 1024,
+        client_max_age: int = 60,
+        shared: Optional[Any] = None
+    ):
+        """
+        Args:
+            app: 下游ASGI应用
+            prefixes: 缓存的路径前缀
+            exclude: 不缓存的路径前缀，如流式导出
+            ttl: 服务端缓存有效期（秒）
+            max_bytes: 进程内缓存总字节数上限
+            max_entry_bytes: 单个响应的字节数上限
+            client_max_age: 返回给客户端的max-age（秒）
+            shared: 共享缓存层，SharedCacheBackend实例或SHARED_BACKENDS中的名称
+        """
+        self.app = app
+        self.prefixes = tuple(prefixes)
+        self.exclude = tuple(exclude)
+        self.ttl = ttl
+        self.client_max_age = client_max_age
+        self.memory = MemoryLRU(max_bytes, max_entry_bytes)
+        if isinstance(shared, str):
+            shared = SHARED_BACKENDS[shared]()
+        self.shared: Optional[SharedCacheBackend] = shared
+        self._inflight: Dict[str, asyncio.Future] = {}
+        self.stats = {"hit": 0, "miss": 0, "coalesced": 0, "not_modified": 0}
+        ResponseCacheMiddleware._instances.add(self)
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http" or scope["method"] != "GET" or not self._cacheable_path(scope["path"]):
+            await self.app(scope, receive, send)
+            return
+
+        headers = Headers(scope=scope)
+        key = response_cache_key(scope["path"], scope.get("query_string", b"").decode("latin-1"))
+        request_cache_control = headers.get("cache-control", "")
+        if "no-cache" not in request_cache_control and "no-store" not in request_cache_control:
+            entry = await self._lookup(key)
+            if entry is not None:
+                self.stats["hit"] += 1
+                await self._serve(scope, receive, send, headers, entry, b"HIT")
+                return
+
+        future = self._inflight.get(key)
+        if future is not None:
+            # 已有相同请求在访问后端，等待其结果
+            self.stats["coalesced"] += 1
+            entry = await asyncio.shield(future)
+            if entry is not None:
+                await self._serve(scope, receive, send, headers, entry, b"HIT")
+            else:
+                await self.app(scope, receive, send)
+            return
+
+        self.stats["miss"] += 1
+        future = asyncio.get_running_loop().create_future()
+        self._inflight[key] = future
+        entry = None
+        try:
+            entry = await self._fetch(scope, receive, send, headers, key)
+        finally:
+            self._inflight.pop(key, None)
+            if not future.done():
+                future.set_result(entry)
+
+    def _cacheable_path(self, path: str) -> bool:
+        return path.startswith(self.prefixes) and not (self.exclude and path.startswith(self.exclude))
+
+    async def _lookup(self, key: str) -> Optional[CachedResponse]:
+        entry = self.memory.get(key)
+        if entry is not None or self.shared is None:
+            return entry
+        try:
+            data = await self.shared.get(key)
+        except Exception as e:
+            logger.warning(f"读取共享缓存失败: {str(e)}")
+            return None
+        if data is None:
+            return None
+        entry = CachedResponse.loads(data)
+        if entry.expired():
+            return None
+        self.memory.set(key, entry)
+        return entry
+
+    async def _store(self, key: str, entry: CachedResponse):
+        self.memory.set(key, entry)
+        if self.shared is not None:
+            try:
+                await self.shared.set(key, entry.dumps(), self.ttl)
+            except Exception as e:
+                logger.warning(f"写入共享缓存失败: {str(e)}")
+
+    async def clear(self):
+        """清空缓存，数据重新导入后调用"""
+        self.memory.clear()
+        if self.shared is not None:
+            await self.shared.clear()
+
+    @classmethod
+    async def clear_all(cls) -> int:
+        """
+        清空所有中间件实例的缓存
+
+        Returns:
+            清空的实例数
+        """
+        instances = list(cls._instances)
+        for instance in instances:
+            await instance.clear()
+        return len(instances)
+
+    @staticmethod
+    def _protected(scope) -> bool:
+        """
+        请求对应的接口是否依赖登录，在下游路由完成匹配后调用
+
+        无法确定路由时按需要登录处理
+        """
+        route = scope.get("route")
+        if not isinstance(route, APIRoute):
+            return True
+        return _depends_on(route.dependant, get_current_user_id)
+
+    @staticmethod
+    async def _authorized(headers: Headers) -> bool:
+        scheme, _, token = headers.get("authorization", "").partition(" ")
+        if scheme.lower() != "bearer" or not token:
+            return False
+        try:
+            await get_current_user_id(token)
+            return True
+        except HTTPException:
+            return False
+
+    async def _serve(self, scope, receive, send, headers: Headers, entry: CachedResponse, source: bytes):
+        """返回缓存的响应，需要登录的接口先校验令牌"""
+        if entry.protected and not await self._authorized(headers):
+            await self.app(scope, receive, send)
+            return
+        await self._send_entry(send, headers, entry, source)
+
+    async def _send_entry(self, send, headers: Headers, entry: CachedResponse, source: bytes):
+        if_none_match = headers.get("if-none-match")
+        if if_none_match and (if_none_match.strip() == "*"
+                              or entry.etag in [tag.strip() for tag in if_none_match.split(",")]):
+            self.stats["not_modified"] += 1
+            response_headers = [(k, v) for k, v in entry.headers if k in (b"etag", b"cache-control")]
+            await send({"type": "http.response.start", "status": 304, "headers": response_headers})
+            await send({"type": "http.response.body", "body": b""})
+            return
+        await send({
+            "type": "http.response.start",
+            "status": entry.status,
+            "headers": entry.headers + [(b"x-cache", source)],
+        })
+        await send({"type": "http.response.body", "body": entry.body})
+
+    async def _fetch(self, scope, receive, send, headers: Headers, key: str) -> Optional[CachedResponse]:
+        """
+        调用下游应用并把响应转发给客户端
+
+        可缓存的响应先完整缓冲，写入缓存后再发送；其余响应原样透传
+
+        Returns:
+            写入缓存的响应，不可缓存时返回None
+        """
+        start: Dict[str, Any] = {}
+        chunks: List[bytes] = []
+        state = {"buffering": False, "size": 0, "entry": None}
+
+        async def flush():
+            await send(start)
+            for chunk in chunks:
+                await send({"type": "http.response.body", "body": chunk, "more_body": True})
+            chunks.clear()
+            state["buffering"] = False
+
+        async def capture(message):
+            if message["type"] == "http.response.start":
+                start.update(message)
+                content_type = _header(message.get("headers", []), b"content-type") or b""
+                state["buffering"] = message["status"] == 200 and content_type.startswith(b"application/json")
+                if not state["buffering"]:
+                    await send(message)
+                return
+            if message["type"] != "http.response.body" or not state["buffering"]:
+                await send(message)
+                return
+            chunks.append(message.get("body", b""))
+            state["size"] += len(chunks[-1])
+            if message.get("more_body", False):
+                if state["size"] > self.memory.max_entry_bytes:
+                    # 响应过大，不再缓冲，改为透传
+                    await flush()
+                return
+            body = b"".join(chunks)
+            entry = self._build_entry(start, body, self._protected(scope))
+            if entry is None:
+                chunks[:] = [body]
+                await flush()
+                await send({"type": "http.response.body", "body": b""})
+                return
+            state["buffering"] = False
+            state["entry"] = entry
+            await self._store(key, entry)
+            await self._send_entry(send, headers, entry, b"MISS")
+
+        await self.app(scope, receive, capture)
+        return state["entry"]
+
+    def _build_entry(self, start: Dict[str, Any], body: bytes, protected: bool) -> Optional[CachedResponse]:
+        """业务code为200的响应生成缓存条目，补充ETag和Cache-Control"""
+        try:
+            data = orjson.loads(body)
+        except orjson.JSONDecodeError:
+            return None
+        if not isinstance(data, dict) or data.get("code", 200) != 200:
+            return None
+        response_headers = [(k, v) for k, v in start.get("headers", []) if k.lower() != b"x-cache"]
+        etag = _header(response_headers, b"etag")
+        if etag is None:
+            etag = body_etag(body).encode("latin-1")
+            response_headers.append((b"etag", etag))
+        if _header(response_headers, b"cache-control") is None:
+            response_headers.append((b"cache-control", f"private, max-age={self.client_max_age}".encode("latin-1")))
+        return CachedResponse(start["status"], response_headers, body, etag.decode("latin-1"),
+                              time.time() + self.ttl, protected)
@@ -1,9 +1,19 @@
+import hmac
+import asyncio
 from typing import Dict, List, Any, Optional
-from fastapi import APIRouter, Depends, HTTPException, status, Query
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, Depends, HTTPException, status, Query, Header, Request, Response
+from fastapi.responses import JSONResponse, ORJSONResponse, StreamingResponse
 from pydantic import BaseModel, Field
 from services.specialist_service import SpecialistService
+from services.score_rank_index import ScoreRankIndex
+from services.score_conversion import ScoreConversion
+from services.college_catalog import CollegeCatalog
+from services.name_search import NameSearch, SEARCH_TYPES
+from services.facet_service import FacetService
+from services.recommendation_engine import RecommendationEngine
 from api.auth_api import get_current_user_id
+from api.cache_middleware import ResponseCacheMiddleware
+from utils.config_utils import get_response_cache_config
 from utils.logger_utils import setup_logger
 from services.profession_service import ProfessionService
 
@@ -41,6 +51,26 @@ class EquivalentRankRequest(BaseModel):
     province_name: str = Field(..., description="省份名称")
     batch: str = Field(..., description="批次")
     score: float = Field(..., description="分数")
+    year: int = Field(2024, description="基准年份")
+
+class EquivalentRankBatchRequest(BaseModel):
+    """批量等效位次请求模型"""
+    province_name: str = Field(..., description="省份名称")
+    batch: str = Field(..., description="批次")
+    scores: List[float] = Field(..., min_length=1, max_length=2000, description="分数列表")
+    years: List[int] = Field([2024], min_length=1, max_length=10, description="基准年份列表")
+
+class EquivalentRankYearResult(BaseModel):
+    """单个年份的批量等效位次结果"""
+    year: int = Field(..., description="基准年份")
+    ranks: Optional[List[int]] = Field(None, description="与scores一一对应的等效位次，没有该年份数据时为空")
+
+class EquivalentRankBatchResponse(BaseModel):
+    """批量等效位次响应模型"""
+    province_name: str = Field(..., description="省份名称")
+    batch: str = Field(..., description="批次")
+    scores: List[float] = Field(..., description="分数列表")
+    results: List[EquivalentRankYearResult] = Field(..., description="各年份的等效位次")
 
 class EquivalentRankResponse(BaseModel):
     """等效位次响应模型"""
@@ -62,6 +92,7 @@ async def get_specialists(
     province_name: Optional[str] = Query(None, description="省份名称，用于筛选专家所在省份"),
     sort_by: Optional[str] = Query(None, description="排序字段"),
     sort_order: str = Query("DESC", description="排序方向，ASC升序，DESC降序"),
+    fields: Optional[str] = Query(None, description="只返回的JSON字段，多个用逗号分隔"),
     current_user_id: int = Depends(get_current_user_id)
 ):
     """
@@ -73,6 +104,7 @@ async def get_specialists(
     - **province_name**: 省份名称，用于筛选专家所在省份
     - **sort_by**: 排序字段，可以是基本字段，也可以是JSON内嵌字段，使用点分隔，例如：name或info.education
     - **sort_order**: 排序方向，ASC升序，DESC降序
+    - **fields**: 字段投影，例如：id,name；不传时返回完整记录
     """
     try:
         # 解析过滤条件
@@ -91,16 +123,20 @@ async def get_specialists(
         if province_name:
             filter_dict["province_name"] = province_name
         
-        # 获取专家列表
+        field_list = [f.strip() for f in fields.split(",") if f.strip()] if fields else None
+        
+        # 获取专家列表，完整记录以原始JSON片段透传，避免解析后再重新编码
         result = await SpecialistService.get_specialists(
             page=page,
             page_size=page_size,
             filters=filter_dict,
             sort_by=sort_by,
-            sort_order=sort_order
+            sort_order=sort_order,
+            fields=field_list,
+            raw=not field_list
         )
         
-        return result
+        return ORJSONResponse(content=result)
     except Exception as e:
         logger.error(f"获取专家列表失败: {str(e)}")
         raise HTTPException(
@@ -153,100 +189,133 @@ async def calculate_equivalent_rank(
     - **province_name**: 省份名称
     - **batch**: 批次
     - **score**: 分数
+    - **year**: 基准年份，默认2024
     """
     try:
-        # 获取2024年的数据作为基准
-        base_data = await SpecialistService.get_score_rank(
+        # 使用基准年份的一分一段表，命中进程内索引时无需访问ClickHouse
+        result = await ScoreRankIndex.equivalent_rank(
             province_name=request.province_name,
-            year=2024,
-            batch=request.batch
+            year=request.year,
+            batch=request.batch,
+            score=request.score
         )
-        
-        if not base_data or not base_data.get("data"):
+        if result is None:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
-                detail="未找到2024年的基准数据"
+                detail=f"未找到{request.year}年的基准数据"
             )
+        return result
         
-        # 对数据进行排序，确保按分数从高到低排序
-        sorted_data = sorted(
-            base_data["data"],
-            key=lambda x: x["minScore"],
-            reverse=True
+    except HTTPException:
+        raise
+    except Exception as e:
+        logger.error(f"计算等效位次失败: {str(e)}")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"计算等效位次失败: {str(e)}"
+        )
+
+@router.post("/equivalent-rank/batch", response_model=EquivalentRankBatchResponse)
+async def calculate_equivalent_rank_batch(
+    request: EquivalentRankBatchRequest,
+    current_user_id: int = Depends(get_current_user_id)
+):
+    """
+    批量计算多个分数在多个年份的等效位次
+    
+    - **province_name**: 省份名称
+    - **batch**: 批次
+    - **scores**: 分数列表
+    - **years**: 基准年份列表，默认[2024]
+    """
+    try:
+        ranks_by_year = await ScoreRankIndex.batch_ranks(
+            province_name=request.province_name,
+            batch=request.batch,
+            scores=request.scores,
+            years=request.years
         )
-        
-        # 处理边界情况
-        if request.score > sorted_data[0]["maxScore"]:
-            return {
-                "rank": sorted_data[0]["lowestRank"],
-                "score_range": {
-                    "min": sorted_data[0]["minScore"],
-                    "max": sorted_data[0]["maxScore"]
-                },
-                "same_count": sorted_data[0]["sameCount"]
-            }
-        
-        if request.score < sorted_data[-1]["minScore"]:
-            return {
-                "rank": sorted_data[-1]["highestRank"] + 1,
-                "score_range": {
-                    "min": sorted_data[-1]["minScore"],
-                    "max": sorted_data[-1]["maxScore"]
-                },
-                "same_count": sorted_data[-1]["sameCount"]
-            }
-        
-        # 二分查找
-        left, right = 0, len(sorted_data) - 1
-        while left <= right:
-            mid = (left + right) // 2
-            current_range = sorted_data[mid]
-            
-            if current_range["minScore"] <= request.score <= current_range["maxScore"]:
-                return {
-                    "rank": current_range["lowestRank"],
-                    "score_range": {
-                        "min": current_range["minScore"],
-                        "max": current_range["maxScore"]
-                    },
-                    "same_count": current_range["sameCount"]
-                }
-            
-            if request.score > current_range["maxScore"]:
-                right = mid - 1
-            else:
-                left = mid + 1
-        
-        # 如果没找到精确匹配，返回最接近的较低分数段
-        if left > 0:
-            return {
-                "rank": sorted_data[left - 1]["lowestRank"],
-                "score_range": {
-                    "min": sorted_data[left - 1]["minScore"],
-                    "max": sorted_data[left - 1]["maxScore"]
-                },
-                "same_count": sorted_data[left - 1]["sameCount"]
-            }
-        
-        # 如果所有分数段都高于输入分数
         return {
-            "rank": sorted_data[-1]["highestRank"] + 1,
-            "score_range": {
-                "min": sorted_data[-1]["minScore"],
-                "max": sorted_data[-1]["maxScore"]
-            },
-            "same_count": sorted_data[-1]["sameCount"]
+            "province_name": request.province_name,
+            "batch": request.batch,
+            "scores": request.scores,
+            "results": [
+                {"year": year, "ranks": ranks}
+                for year, ranks in ranks_by_year.items()
+            ]
         }
-        
     except Exception as e:
-        logger.error(f"计算等效位次失败: {str(e)}")
+        logger.error(f"批量计算等效位次失败: {str(e)}")
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
-            detail=f"计算等效位次失败: {str(e)}"
+            detail=f"批量计算等效位次失败: {str(e)}"
+        )
+
+@router.get("/score-conversion")
+async def convert_score(
+    province_name: str = Query(..., description="省份名称"),
+    score: float = Query(..., description="分数"),
+    from_year: int = Query(..., description="分数所在年份"),
+    to_year: int = Query(..., description="目标年份"),
+    batch: str = Query("本科", description="批次"),
+    current_user_id: int = Depends(get_current_user_id)
+):
+    """
+    跨年份等位分换算：同一位次在目标年份对应的分数，基于预计算的转换表
+    
+    - **province_name**: 省份名称
+    - **score**: 分数
+    - **from_year**: 分数所在年份
+    - **to_year**: 目标年份
+    - **batch**: 批次，默认为"本科"
+    """
+    equivalent_score = ScoreConversion.convert(province_name, batch, score, from_year, to_year)
+    if equivalent_score is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"未找到{province_name}{batch}{from_year}/{to_year}年的等位分转换表"
         )
+    rank = ScoreConversion.rank_of(province_name, batch, score, from_year)
+    return {
+        "province_name": province_name,
+        "batch": batch,
+        "score": score,
+        "from_year": from_year,
+        "to_year": to_year,
+        "rank": int(rank[0]),
+        "equivalent_score": int(equivalent_score[0])
+    }
+
+async def college_etag() -> Optional[str]:
+    """
+    获取院校目录的ETag，缓存不可用时返回None
+
+    Returns:
+        ETag
+    """
+    try:
+        return await CollegeCatalog.etag()
+    except Exception as e:
+        logger.warning(f"获取院校目录ETag失败: {str(e)}")
+        return None
+
+def etag_matches(request: Request, etag: Optional[str]) -> bool:
+    """请求的If-None-Match是否与当前ETag一致"""
+    if not etag:
+        return False
+    if_none_match = request.headers.get("if-none-match")
+    if not if_none_match:
+        return False
+    return etag in [tag.strip() for tag in if_none_match.split(",")] or if_none_match.strip() == "*"
+
+def etag_response(content: Dict[str, Any], etag: Optional[str]) -> ORJSONResponse:
+    """带ETag的响应，客户端需要重新验证后才能使用缓存"""
+    headers = {"ETag": etag, "Cache-Control": "no-cache"} if etag else None
+    return ORJSONResponse(content=content, headers=headers)
 
 @router.get("/colleges")
 async def get_college_list(
+    request: Request,
     page: int = Query(1, ge=1),
     page_size: int = Query(10, ge=1, le=100),
     cn_name: Optional[str] = Query(None, description="学校名称，模糊搜索"),
@@ -255,7 +324,10 @@ async def get_college_list(
     features: Optional[str] = Query(None, description="院校特色，多个用逗号分隔"),
     nature_type: Optional[str] = Query(None, description="院校性质，多个用逗号分隔，public/privite/aw_ga")
 ) -> Dict[str, Any]:
-    """获取大学列表，支持多条件筛选"""
+    """获取大学列表，支持多条件筛选，支持If-None-Match条件请求"""
+    etag = await college_etag()
+    if etag_matches(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
     try:
         # 处理多选参数
         def to_list(val):
@@ -279,11 +351,11 @@ async def get_college_list(
             features=features_list,
             nature_type=nature_type_list
         )
-        return {
+        return etag_response({
             "code": 200,
             "message": "获取大学列表成功",
             "data": result
-        }
+        }, etag)
     except Exception as e:
         logger.error(f"获取大学列表失败: {str(e)}")
         return {
@@ -293,15 +365,18 @@ async def get_college_list(
         }
 
 @router.get("/colleges/{code}")
-async def get_college_detail(code: str) -> Dict[str, Any]:
-    """根据code获取院校详情"""
+async def get_college_detail(code: str, request: Request) -> Dict[str, Any]:
+    """根据code获取院校详情，支持If-None-Match条件请求"""
+    etag = await college_etag()
+    if etag_matches(request, etag):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers={"ETag": etag})
     try:
         result = await SpecialistService.get_college_detail(code)
-        return {
+        return etag_response({
             "code": 200,
             "message": "获取院校详情成功",
             "data": result
-        }
+        }, etag)
     except Exception as e:
         logger.error(f"获取院校详情失败: {str(e)}")
         return {
@@ -310,6 +385,199 @@ async def get_college_detail(code: str) -> Dict[str, Any]:
             "data": None
         }
 
+@router.get("/search/suggest")
+async def search_suggest(
+    q: str = Query(..., min_length=1, description="检索词，支持汉字、简称、全拼和拼音首字母"),
+    type: Optional[str] = Query(None, description="检索类型，college或profession，不传则都检索"),
+    limit: int = Query(10, ge=1, le=50, description="返回条数")
+) -> Dict[str, Any]:
+    """院校和专业名称联想，在内存索引中检索"""
+    if type and type not in SEARCH_TYPES:
+        return {
+            "code": 400,
+            "message": f"不支持的检索类型: {type}",
+            "data": None
+        }
+    try:
+        result = await NameSearch.suggest(q, search_type=type, limit=limit)
+        return {
+            "code": 200,
+            "message": "名称联想成功",
+            "data": result
+        }
+    except Exception as e:
+        logger.error(f"名称联想失败: {str(e)}")
+        return {
+            "code": 500,
+            "message": f"名称联想失败: {str(e)}",
+            "data": None
+        }
+
+def split_values(val: Optional[str]) -> Optional[List[str]]:
+    """拆分逗号分隔的多选参数"""
+    if not val:
+        return None
+    return [v for v in val.split(",") if v]
+
+@router.get("/facets/colleges")
+async def get_college_facets(
+    cn_name: Optional[str] = Query(None, description="学校名称，模糊搜索"),
+    province_name: Optional[str] = Query(None, description="省份名称，多个用逗号分隔"),
+    categories: Optional[str] = Query(None, description="院校类别，多个用逗号分隔"),
+    features: Optional[str] = Query(None, description="院校特色，多个用逗号分隔"),
+    nature_type: Optional[str] = Query(None, description="院校性质，多个用逗号分隔")
+) -> Dict[str, Any]:
+    """
+    院校筛选面板的分面计数，参数与/colleges一致
+
+    每个分面的计数按除该分面以外的其他已选条件统计，选中某个省份后其他省份的计数仍然可见
+    """
+    try:
+        result = await FacetService.get_college_facets(
+            cn_name=cn_name,
+            province_name=split_values(province_name),
+            nature_type=split_values(nature_type),
+            categories=split_values(categories),
+            features=split_values(features)
+        )
+        return {
+            "code": 200,
+            "message": "获取院校分面成功",
+            "data": result
+        }
+    except Exception as e:
+        logger.error(f"获取院校分面失败: {str(e)}")
+        return {
+            "code": 500,
+            "message": f"获取院校分面失败: {str(e)}",
+            "data": None
+        }
+
+@router.get("/facets/profession-versions")
+async def get_profession_version_facets(
+    college_code: Optional[str] = Query(None, description="院校代码"),
+    college_name: Optional[str] = Query(None, description="院校名称，模糊搜索"),
+    profession_name: Optional[str] = Query(None, description="专业名称，模糊搜索"),
+    province: Optional[str] = Query(None, description="省份，多个用逗号分隔"),
+    bus_year: Optional[str] = Query(None, description="业务年份，多个用逗号分隔"),
+    batch: Optional[str] = Query(None, description="批次，多个用逗号分隔"),
+    profession_category: Optional[str] = Query(None, description="门类，多个用逗号分隔"),
+    profession_type: Optional[str] = Query(None, description="专业类，多个用逗号分隔"),
+    subject_category: Optional[str] = Query(None, description="科类，多个用逗号分隔"),
+    college_type: Optional[str] = Query(None, description="院校类型，多个用逗号分隔"),
+    nature_type: Optional[str] = Query(None, description="院校性质，多个用逗号分隔"),
+    city_level: Optional[str] = Query(None, description="城市等级，多个用逗号分隔"),
+    education_level: Optional[str] = Query(None, description="办学层次，多个用逗号分隔"),
+    current_user_id: int = Depends(get_current_user_id)
+) -> Dict[str, Any]:
+    """专业版本筛选面板的分面计数，一次查询返回全部分面"""
+    try:
+        years = split_values(bus_year)
+        selected = {
+            "province": split_values(province),
+            "bus_year": [int(y) for y in years] if years else None,
+            "batch": split_values(batch),
+            "profession_category": split_values(profession_category),
+            "profession_type": split_values(profession_type),
+            "subject_category": split_values(subject_category),
+            "college_type": split_values(college_type),
+            "nature_type": split_values(nature_type),
+            "city_level": split_values(city_level),
+            "education_level": split_values(education_level),
+        }
+    except ValueError:
+        return {
+            "code": 400,
+            "message": f"业务年份格式错误: {bus_year}",
+            "data": None
+        }
+    try:
+        result = await FacetService.get_profession_version_facets(
+            selected,
+            college_name=college_name,
+            profession_name=profession_name,
+            college_code=college_code
+        )
+        return {
+            "code": 200,
+            "message": "获取专业版本分面成功",
+            "data": result
+        }
+    except Exception as e:
+        logger.error(f"获取专业版本分面失败: {str(e)}")
+        return {
+            "code": 500,
+            "message": f"获取专业版本分面失败: {str(e)}",
+            "data": None
+        }
+
+def profession_version_filters(**kwargs) -> Dict[str, Any]:
+    """构建专业版本筛选条件，忽略未传的参数"""
+    return {key: value for key, value in kwargs.items() if value}
+
+@router.get("/profession-versions/export")
+async def export_profession_versions(
+    format: str = Query("csv", description="导出格式，csv或parquet"),
+    college_code: Optional[str] = Query(None, description="院校代码"),
+    college_name: Optional[str] = Query(None, description="院校名称，模糊搜索"),
+    profession_name: Optional[str] = Query(None, description="专业名称，模糊搜索"),
+    profession_type: Optional[str] = Query(None, description="专业类"),
+    profession_category: Optional[str] = Query(None, description="门类"),
+    batch: Optional[str] = Query(None, description="批次"),
+    subject_category: Optional[str] = Query(None, description="科类"),
+    subject_requirements: Optional[str] = Query(None, description="选科要求"),
+    province: Optional[str] = Query(None, description="省份"),
+    college_type: Optional[str] = Query(None, description="院校类型"),
+    nature_type: Optional[str] = Query(None, description="院校性质"),
+    bus_year: Optional[int] = Query(None, description="业务年份"),
+    sort_by: Optional[str] = Query(None, description="排序字段，同/profession-versions"),
+    sort_order: str = Query("DESC", description="排序方向，ASC升序，DESC降序"),
+    current_user_id: int = Depends(get_current_user_id)
+):
+    """
+    导出符合条件的全部专业版本，筛选参数与/profession-versions一致
+
+    不分页、不统计总数，由ClickHouse直接输出CSV或Parquet并分块流式返回
+    """
+    filters = profession_version_filters(
+        college_code=college_code,
+        college_name=college_name,
+        profession_name=profession_name,
+        profession_type=profession_type,
+        profession_category=profession_category,
+        batch=batch,
+        subject_category=subject_category,
+        subject_requirements=subject_requirements,
+        province=province,
+        college_type=college_type,
+        nature_type=nature_type,
+        bus_year=bus_year
+    )
+    try:
+        # 发出查询并等待响应头是阻塞调用，放到线程池中执行；之后的分块读取由StreamingResponse在线程池中完成
+        chunks, media_type, extension = await asyncio.to_thread(
+            SpecialistService.export_profession_versions,
+            filters, fmt=format.lower(), sort_by=sort_by, sort_order=sort_order
+        )
+    except ValueError as e:
+        return {
+            "code": 400,
+            "message": str(e),
+            "data": None
+        }
+    except Exception as e:
+        logger.error(f"导出专业版本失败: {str(e)}")
+        return {
+            "code": 500,
+            "message": f"导出专业版本失败: {str(e)}",
+            "data": None
+        }
+    return StreamingResponse(
+        chunks,
+        media_type=media_type,
+        headers={"Content-Disposition": f'attachment; filename="profession_versions.{extension}"'}
+    )
+
 @router.get("/profession-versions")
 async def get_profession_version_list(
     page: int = Query(1, ge=1, description="页码，从1开始"),
@@ -326,7 +594,7 @@ async def get_profession_version_list(
     college_type: Optional[str] = Query(None, description="院校类型"),
     nature_type: Optional[str] = Query(None, description="院校性质"),
     bus_year: Optional[int] = Query(None, description="业务年份"),
-    sort_by: Optional[str] = Query(None, description="排序字段"),
+    sort_by: Optional[str] = Query(None, description="排序字段，只允许年份、院校、专业、计划数、学费、历年位次和分数等字段"),
     sort_order: str = Query("DESC", description="排序方向，ASC升序，DESC降序"),
     current_user_id: int = Depends(get_current_user_id)
 ) -> ProfessionVersionListResponse:
@@ -351,32 +619,20 @@ async def get_profession_version_list(
     - **sort_order**: 排序方向，ASC升序，DESC降序
     """
     try:
-        # 构建筛选条件
-        filters = {}
-        if college_code:
-            filters["college_code"] = college_code
-        if college_name:
-            filters["college_name"] = college_name
-        if profession_name:
-            filters["profession_name"] = profession_name
-        if profession_type:
-            filters["profession_type"] = profession_type
-        if profession_category:
-            filters["profession_category"] = profession_category
-        if batch:
-            filters["batch"] = batch
-        if subject_category:
-            filters["subject_category"] = subject_category
-        if subject_requirements:
-            filters["subject_requirements"] = subject_requirements
-        if province:
-            filters["province"] = province
-        if college_type:
-            filters["college_type"] = college_type
-        if nature_type:
-            filters["nature_type"] = nature_type
-        if bus_year:
-            filters["bus_year"] = bus_year
+        filters = profession_version_filters(
+            college_code=college_code,
+            college_name=college_name,
+            profession_name=profession_name,
+            profession_type=profession_type,
+            profession_category=profession_category,
+            batch=batch,
+            subject_category=subject_category,
+            subject_requirements=subject_requirements,
+            province=province,
+            college_type=college_type,
+            nature_type=nature_type,
+            bus_year=bus_year
+        )
 
         # 获取专业版本列表
         result = await SpecialistService.get_profession_version_list(
@@ -392,6 +648,12 @@ async def get_profession_version_list(
             "message": "获取专业版本列表成功",
             "data": result
         }
+    except ValueError as e:
+        return {
+            "code": 400,
+            "message": str(e),
+            "data": {}
+        }
     except Exception as e:
         logger.error(f"获取专业版本列表失败: {str(e)}")
         return {
@@ -442,7 +704,7 @@ async def get_profession_list(
     profession_category: Optional[str] = Query(None, description="专业门类"),
     profession_type: Optional[str] = Query(None, description="专业类"),
     degree_category: Optional[str] = Query(None, description="学位类别"),
-    sort_by: Optional[str] = Query(None, description="排序字段"),
+    sort_by: Optional[str] = Query(None, description="排序字段，只允许专业表中的基础字段"),
     sort_order: str = Query("DESC", description="排序方向，ASC升序，DESC降序"),
     current_user_id: int = Depends(get_current_user_id)
 ):
@@ -484,6 +746,12 @@ async def get_profession_list(
             "message": "获取专业列表成功",
             "data": result
         }
+    except ValueError as e:
+        return {
+            "code": 400,
+            "message": str(e),
+            "data": None
+        }
     except Exception as e:
         logger.error(f"获取专业列表失败: {str(e)}")
         return {
@@ -496,14 +764,36 @@ async def get_profession_list(
 async def get_recommendation(
     rank: Optional[int] = Query(None, description="分数排名"),
     province_name: Optional[str] = Query(None, description="省份名称"),
-    subjects: Optional[str] = Query(None, description="选科要求，逗号分隔")
+    subjects: Optional[str] = Query(None, description="选科要求，逗号分隔"),
+    top_k: Optional[int] = Query(None, ge=1, le=100, description="按冲/稳/保分档，每档返回的条数")
 ):
     """
     专业组推荐接口，支持按 rank、province_name、subjects（逗号分隔）筛选
+    
+    传入top_k（需同时传入rank和province_name）时，按录取概率分为冲/稳/保三档，每档返回前top_k个专业组
     """
     try:
+        if top_k is not None:
+            if rank is None or not province_name:
+                return {
+                    "code": 400,
+                    "message": "分档推荐需要提供rank和province_name",
+                    "data": None
+                }
+            from services.specialist_recommendation_service import get_tiered_recommendation_service
+            tiers = await get_tiered_recommendation_service(
+                rank=rank,
+                province_name=province_name,
+                subjects=subjects,
+                top_k=top_k
+            )
+            return {
+                "code": 200,
+                "message": "获取推荐列表成功",
+                "data": tiers
+            }
         from services.specialist_recommendation_service import get_recommendation_service
-        records = get_recommendation_service(
+        records = await get_recommendation_service(
             rank=rank,
             province_name=province_name,
             subjects=subjects,
@@ -522,3 +812,28 @@ async def get_recommendation(
             "data": None
         }
 
+
+@router.post("/cache/clear")
+async def clear_data_cache(
+    x_admin_token: Optional[str] = Header(None, description="response_cache.admin_token中配置的令牌")
+) -> Dict[str, Any]:
+    """
+    数据重新导入后清空缓存：响应缓存，以及院校目录、分面、名称索引、一分一段和推荐快照
+
+    由导入任务在导入完成后调用，未配置admin_token时不可用
+    """
+    admin_token = get_response_cache_config().get("admin_token") or ""
+    if not admin_token or not x_admin_token or not hmac.compare_digest(x_admin_token, admin_token):
+        raise HTTPException(status_code=status.HTTP_403_FORBIDDEN, detail="无权清空缓存")
+    cleared = await ResponseCacheMiddleware.clear_all()
+    CollegeCatalog.invalidate()
+    FacetService.invalidate()
+    NameSearch.invalidate()
+    ScoreRankIndex.invalidate()
+    RecommendationEngine.invalidate()
+    logger.info(f"已清空数据缓存，响应缓存实例数: {cleared}")
+    return {
+        "code": 200,
+        "message": "清空缓存成功",
+        "data": {"response_caches": cleared}
+    }
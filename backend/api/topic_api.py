@@ -1,5 +1,5 @@
-from typing import Dict, Any, List
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import Dict, Any, List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, status
 from pydantic import BaseModel, Field
 from services.topic_service import TopicService
 from api.auth_api import get_current_user_id
@@ -9,6 +9,7 @@ from fastapi.responses import StreamingResponse
 from pydantic import BaseModel, Field
 from services.message_service import MessageService
 from services.profile_service import ProfileService
+from services.score_rank_index import ScoreRankIndex, DEFAULT_BASE_YEAR
 from api.auth_api import get_current_user_id
 from utils.logger_utils import setup_logger
 
@@ -49,6 +50,16 @@ class TopicResponse(BaseModel):
     started_at: str = Field(..., description="开始时间")
     updated_at: str = Field(..., description="更新时间")
 
+class TopicListItem(TopicResponse):
+    last_message: Optional[str] = Field(None, description="最后一条消息的摘要")
+    last_message_type: Optional[str] = Field(None, description="最后一条消息的类型")
+    last_message_at: Optional[str] = Field(None, description="最后一条消息的时间")
+    message_count: int = Field(0, description="消息数")
+
+class TopicPage(BaseModel):
+    items: List[TopicListItem] = Field(..., description="话题列表")
+    next_cursor: Optional[str] = Field(None, description="下一页游标，没有下一页时为空")
+
 @router.post("", response_model=TopicResponse, status_code=status.HTTP_201_CREATED)
 async def create_topic(
     topic_data: TopicCreate,
@@ -74,6 +85,18 @@ async def get_user_topics(
     topics = await TopicService.get_user_topics(current_user_id)
     return topics
 
+@router.get("/page", response_model=TopicPage)
+async def get_user_topics_page(
+    limit: int = Query(30, ge=1, le=100, description="每页条数"),
+    cursor: Optional[str] = Query(None, description="上一页返回的next_cursor"),
+    current_user_id: int = Depends(get_current_user_id)
+):
+    """按更新时间倒序分页获取用户的话题，附带最后一条消息摘要和消息数"""
+    try:
+        return await TopicService.get_user_topics_page(current_user_id, limit, cursor)
+    except ValueError as e:
+        raise HTTPException(status_code=status.HTTP_400_BAD_REQUEST, detail=str(e))
+
 @router.post("/{topic_id}/messages", response_model=MessageResponse, status_code=status.HTTP_201_CREATED)
 async def create_message(
     topic_id: int,
@@ -114,9 +137,35 @@ router.include_router(
 
 
 
+async def resolve_rank(profile: Dict[str, Any]) -> Optional[int]:
+    """
+    获取考生位次，档案中没有位次时按分数换算等效位次
+    
+    Args:
+        profile: 用户档案
+        
+    Returns:
+        位次，无法获取时返回None
+    """
+    if profile.get("rank"):
+        return profile["rank"]
+    if not profile.get("province") or not profile.get("score"):
+        return None
+    try:
+        result = await ScoreRankIndex.equivalent_rank(
+            province_name=profile["province"],
+            year=DEFAULT_BASE_YEAR,
+            batch=profile.get("batch") or "本科",
+            score=profile["score"]
+        )
+        return result["rank"] if result else None
+    except Exception as e:
+        logger.warning(f"换算等效位次失败: {str(e)}")
+        return None
+
 @router.post("/{topic_id}/chat/stream")
 async def chat_stream(
-    topic_id: str,
+    topic_id: int,
     request: GraphChatRequest,
     current_user_id: int = Depends(get_current_user_id)
 ):
@@ -141,12 +190,13 @@ async def chat_stream(
             detail="请先完善个人档案"
         )
     
-    logger.info(f"用户ID {current_user_id} 的档案信息：{profile}")
+    logger.debug(f"用户ID {current_user_id} 的档案信息：{profile}")
     
     # 构建用户信息
     user_info = {
         "province": profile.get("province", ""),
         "score": profile.get("score", 0),
+        "rank": await resolve_rank(profile),
         "subjects": profile.get("subject_choice", []),
         "requirement": profile.get("requirement", "")
     }
@@ -69,6 +69,15 @@ curl -v -X GET "http://localhost:8000/api/data/specialist?page=1&page_size=10&so
 
 echo -e "\n"
 
+# 10. 批量计算等效位次（多个分数、多个年份）
+echo "===== 批量计算等效位次 ====="
+curl -v -X POST "http://localhost:8000/api/data/specialist/equivalent-rank/batch" \
+  -H "Authorization: Bearer $TOKEN" \
+  -H "Content-Type: application/json" \
+  -d '{"province_name":"北京","batch":"本科","scores":[600,620,640],"years":[2022,2023,2024]}'
+
+echo -e "\n"
+
 # 一些可能用到的URL编码筛选条件示例：
 # {"name":"张三"} -> %7B%22name%22%3A%22张三%22%7D
 # {"age":30} -> %7B%22age%22%3A30%7D
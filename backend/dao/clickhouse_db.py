@@ -1,14 +1,49 @@
 import clickhouse_connect
-import json
-from typing import Dict, List, Any, Optional
+import re
+import copy
+import time
+import asyncio
+import threading
+from typing import Dict, List, Any, Optional, Set, Iterable, Iterator
 import logging
 from utils.config_utils import get_clickhouse_config
+from utils.array_utils import parse_string_array
+from dao.query_builder import cache_key
 
 # 配置日志
 logger = logging.getLogger("clickhouse_db")
 
+# 只读查询：跳过开头的注释后以SELECT或WITH开始，只有只读查询才合并执行
+_READ_QUERY = re.compile(r"^\s*(?:--[^\n]*\n\s*|/\*.*?\*/\s*)*(?:SELECT|WITH)\b", re.IGNORECASE | re.DOTALL)
+
+
+class _InFlightQuery:
+    """执行中的查询，相同查询的后到调用等待其结果"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.result: Optional[List[Dict]] = None
+        self.error: Optional[Exception] = None
+        self.waiters = 0
+
+
 class ClickHouseDB:
     _client = None
+    # 表结构缓存：{表名: (加载时间, 列名集合)}
+    _columns_cache: Dict[str, tuple] = {}
+    # 表排序键缓存：{表名: (加载时间, 排序键列表)}
+    _sorting_key_cache: Dict[str, tuple] = {}
+    # 表结构缓存有效期（秒），迁移后最迟在此时间内生效
+    COLUMNS_CACHE_TTL = 300
+    # 流式导出时每次读取的字节数
+    STREAM_CHUNK_SIZE = 64 * 1024
+    # 执行中的查询：{查询键: _InFlightQuery}，相同的SQL模板和参数只执行一次
+    _inflight: Dict[str, _InFlightQuery] = {}
+    _inflight_lock = threading.Lock()
+    # 事件循环内执行中的查询：{(事件循环id, 查询键): Future}
+    _inflight_async: Dict[tuple, asyncio.Future] = {}
+    # 查询计数：executed为实际执行次数，coalesced为合并到其他执行的次数
+    query_stats: Dict[str, int] = {"executed": 0, "coalesced": 0}
 
     @classmethod
     def get_client(cls):
@@ -21,7 +56,9 @@ class ClickHouseDB:
                     port=config.get('port', 8123),  # HTTP接口端口
                     username=config.get('username', 'default'),
                     password=config.get('password', ''),
-                    database=config.get('database', 'default')
+                    database=config.get('database', 'default'),
+                    # 不使用会话，多个线程可以同时在同一个客户端上查询
+                    autogenerate_session_id=False
                 )
                 logger.info("成功创建ClickHouse客户端连接")
             except Exception as e:
@@ -38,26 +75,285 @@ class ClickHouseDB:
             cls._client = None
             logger.info("ClickHouse客户端连接已关闭")
 
+    @staticmethod
+    def _query_key(query: str, params: Optional[Dict], array_columns: Optional[Iterable[str]],
+                   settings: Optional[Dict[str, Any]]) -> str:
+        """合并查询的键，SQL模板、参数、数组解码列和查询设置都相同才视为同一查询"""
+        return cache_key(query, {
+            "params": params or {},
+            "array_columns": None if array_columns is None else sorted(array_columns),
+            "settings": settings or {},
+        })
+
+    @staticmethod
+    def _copy_rows(rows: List[Dict]) -> List[Dict]:
+        """合并的调用各自拿到一份结果，行字典和其中的列表（如解码后的数组列）都复制，调用方修改结果互不影响"""
+        return [
+            {k: copy.deepcopy(v) if isinstance(v, (list, dict)) else v for k, v in row.items()}
+            for row in rows
+        ]
+
+    @staticmethod
+    def is_read_query(query: str) -> bool:
+        """是否为SELECT/WITH只读查询，DDL和INSERT等语句不合并执行"""
+        return _READ_QUERY.match(query) is not None
+
     @classmethod
-    def execute(cls, query: str, params: Optional[Dict] = None) -> List[Dict]:
-        """执行ClickHouse查询并返回结果"""
+    def execute(cls, query: str, params: Optional[Dict] = None,
+                array_columns: Optional[Iterable[str]] = None,
+                settings: Optional[Dict[str, Any]] = None) -> List[Dict]:
+        """执行ClickHouse查询并返回结果
+
+        多个线程同时执行相同的只读查询时只访问一次ClickHouse，其余调用等待并共享结果；
+        ALTER、INSERT等非只读语句每次调用都执行
+
+        Args:
+            query: SQL
+            params: 查询参数
+            array_columns: 需要解码为列表的字符串数组列（如"['985','211']"），默认不解码；
+                原生Array列直接返回列表，不做处理
+            settings: 查询级别的ClickHouse设置，如optimize_read_in_order
+        """
+        if not cls.is_read_query(query):
+            with cls._inflight_lock:
+                cls.query_stats["executed"] += 1
+            return cls._execute(query, params, array_columns, settings)
+
+        key = cls._query_key(query, params, array_columns, settings)
+        with cls._inflight_lock:
+            inflight = cls._inflight.get(key)
+            if inflight is None:
+                inflight = cls._inflight[key] = _InFlightQuery()
+                leader = True
+            else:
+                inflight.waiters += 1
+                cls.query_stats["coalesced"] += 1
+                leader = False
+        if not leader:
+            inflight.done.wait()
+            if inflight.error is not None:
+                raise inflight.error
+            return cls._copy_rows(inflight.result)
+
+        try:
+            inflight.result = cls._execute(query, params, array_columns, settings)
+            # 等待者从inflight.result复制，先发起的调用同样返回副本
+            return cls._copy_rows(inflight.result)
+        except Exception as e:
+            inflight.error = e
+            raise
+        finally:
+            with cls._inflight_lock:
+                cls._inflight.pop(key, None)
+                cls.query_stats["executed"] += 1
+                if inflight.waiters:
+                    logger.debug(f"合并了{inflight.waiters}个相同的ClickHouse查询")
+            inflight.done.set()
+
+    @classmethod
+    async def execute_async(cls, query: str, params: Optional[Dict] = None,
+                            array_columns: Optional[Iterable[str]] = None,
+                            settings: Optional[Dict[str, Any]] = None) -> List[Dict]:
+        """在线程池中执行查询，不阻塞事件循环
+
+        同一事件循环内相同的只读查询只提交一次，其余协程等待同一个结果；参数同execute
+        """
+        if not cls.is_read_query(query):
+            return await asyncio.to_thread(cls.execute, query, params, array_columns, settings)
+        loop = asyncio.get_running_loop()
+        key = (id(loop), cls._query_key(query, params, array_columns, settings))
+        future = cls._inflight_async.get(key)
+        if future is not None:
+            with cls._inflight_lock:
+                cls.query_stats["coalesced"] += 1
+            try:
+                return cls._copy_rows(await asyncio.shield(future))
+            except asyncio.CancelledError:
+                if not future.cancelled():
+                    raise
+                # 先发起的协程被取消，由当前协程重新执行
+                return await cls.execute_async(query, params, array_columns, settings)
+
+        future = loop.create_future()
+        cls._inflight_async[key] = future
+        try:
+            rows = await asyncio.to_thread(cls.execute, query, params, array_columns, settings)
+            future.set_result(rows)
+            return cls._copy_rows(rows)
+        except asyncio.CancelledError:
+            future.cancel()
+            raise
+        except Exception as e:
+            future.set_exception(e)
+            # 没有等待者时避免"exception was never retrieved"警告
+            future.exception()
+            raise
+        finally:
+            cls._inflight_async.pop(key, None)
+
+    @classmethod
+    def get_query_stats(cls) -> Dict[str, int]:
+        """查询合并的统计，coalesced / (executed + coalesced)即合并比例"""
+        return dict(cls.query_stats)
+
+    @classmethod
+    def _execute(cls, query: str, params: Optional[Dict], array_columns: Optional[Iterable[str]],
+                 settings: Optional[Dict[str, Any]]) -> List[Dict]:
         client = cls.get_client()
         try:
             # 使用clickhouse_connect的查询方法
-            query_result = client.query(query, parameters=params or {})
+            if settings:
+                query_result = client.query(query, parameters=params or {}, settings=settings)
+            else:
+                query_result = client.query(query, parameters=params or {})
             # 获取结果的行和列名
             rows = query_result.result_rows
             column_names = query_result.column_names
             
             # 将结果转换为字典列表
-            result_dicts = []
-            for row in rows:
-                row_dict = {}
-                for i, value in enumerate(row):
-                    row_dict[column_names[i]] = value
-                result_dicts.append(row_dict)
-            
+            result_dicts = [dict(zip(column_names, row)) for row in rows]
+            if array_columns:
+                cls._decode_arrays(result_dicts, column_names, getattr(query_result, "column_types", None),
+                                   set(array_columns))
             return result_dicts
         except Exception as e:
             logger.error(f"执行ClickHouse查询失败: {str(e)}, 查询: {query}")
-            raise Exception(f"执行查询失败: {str(e)}") 
\ No newline at end of file
+            raise Exception(f"执行查询失败: {str(e)}")
+
+    @classmethod
+    def stream_raw(cls, query: str, params: Optional[Dict] = None, fmt: str = "CSVWithNames",
+                   settings: Optional[Dict[str, Any]] = None,
+                   chunk_size: int = STREAM_CHUNK_SIZE) -> Iterator[bytes]:
+        """以ClickHouse原生输出格式流式读取查询结果
+
+        请求在调用时立即发出，查询错误在返回前抛出；结果按块读取，不解析为行，
+        内存占用与结果大小无关。迭代结束或中途关闭时释放HTTP连接。
+        客户端不使用会话（autogenerate_session_id=False），导出期间其他查询不会因会话被占用而失败；
+        调用会阻塞到收到响应头，异步代码中应放到线程池执行。
+
+        Args:
+            query: SQL，不含FORMAT子句
+            params: 查询参数
+            fmt: 输出格式，如CSVWithNames、Parquet
+            settings: 查询级别的ClickHouse设置
+            chunk_size: 每块字节数
+
+        Returns:
+            字节块迭代器
+        """
+        client = cls.get_client()
+        try:
+            stream = client.raw_stream(query, parameters=params or {}, settings=settings, fmt=fmt)
+        except Exception as e:
+            logger.error(f"执行ClickHouse流式查询失败: {str(e)}, 查询: {query}")
+            raise Exception(f"执行查询失败: {str(e)}")
+        return cls._iter_stream(stream, chunk_size)
+
+    @staticmethod
+    def _iter_stream(stream, chunk_size: int) -> Iterator[bytes]:
+        try:
+            while True:
+                chunk = stream.read(chunk_size)
+                if not chunk:
+                    break
+                yield chunk
+        except Exception as e:
+            logger.error(f"读取ClickHouse流式结果中断: {str(e)}")
+            raise
+        finally:
+            stream.close()
+
+    @staticmethod
+    def _decode_arrays(records: List[Dict], column_names, column_types, array_columns: Set[str]):
+        """将以字符串形式返回的数组列解码为列表，按列判断一次类型，不逐行判断"""
+        targets = []
+        for i, name in enumerate(column_names):
+            if name not in array_columns:
+                continue
+            type_name = getattr(column_types[i], "name", "") if column_types else ""
+            if type_name.startswith("Array"):
+                continue
+            targets.append(name)
+        for name in targets:
+            for record in records:
+                value = record[name]
+                if isinstance(value, str):
+                    record[name] = parse_string_array(value)
+                elif value is None:
+                    record[name] = []
+
+    @classmethod
+    def get_table_columns(cls, table: str) -> Set[str]:
+        """获取表的列名集合（带缓存），用于判断表结构演进后的新列是否已存在
+
+        Args:
+            table: 表名，支持"库名.表名"格式
+
+        Returns:
+            列名集合，查询失败时返回空集合
+        """
+        cached = cls._columns_cache.get(table)
+        if cached and time.time() - cached[0] < cls.COLUMNS_CACHE_TTL:
+            return cached[1]
+
+        if "." in table:
+            database, name = table.split(".", 1)
+            query = "SELECT name FROM system.columns WHERE database = {database:String} AND table = {table:String}"
+            params = {"database": database, "table": name}
+        else:
+            query = "SELECT name FROM system.columns WHERE database = currentDatabase() AND table = {table:String}"
+            params = {"table": table}
+
+        try:
+            columns = {row["name"] for row in cls.execute(query, params)}
+        except Exception as e:
+            logger.warning(f"获取表结构失败，按无新列处理: {table}, {str(e)}")
+            columns = set()
+        cls._columns_cache[table] = (time.time(), columns)
+        return columns
+
+    @classmethod
+    def get_sorting_key(cls, table: str) -> List[str]:
+        """获取MergeTree表的排序键（带缓存），用于判断ORDER BY能否按存储顺序读取
+
+        Args:
+            table: 表名，支持"库名.表名"格式
+
+        Returns:
+            排序键表达式列表，查询失败或不是MergeTree表时返回空列表
+        """
+        cached = cls._sorting_key_cache.get(table)
+        if cached and time.time() - cached[0] < cls.COLUMNS_CACHE_TTL:
+            return cached[1]
+
+        if "." in table:
+            database, name = table.split(".", 1)
+            query = "SELECT sorting_key FROM system.tables WHERE database = {database:String} AND name = {table:String}"
+            params = {"database": database, "table": name}
+        else:
+            query = "SELECT sorting_key FROM system.tables WHERE database = currentDatabase() AND name = {table:String}"
+            params = {"table": table}
+
+        try:
+            rows = cls.execute(query, params)
+            sorting_key = [k.strip() for k in rows[0]["sorting_key"].split(",") if k.strip()] if rows else []
+        except Exception as e:
+            logger.warning(f"获取表排序键失败: {table}, {str(e)}")
+            sorting_key = []
+        cls._sorting_key_cache[table] = (time.time(), sorting_key)
+        return sorting_key
+
+    @classmethod
+    def has_column(cls, table: str, column: str) -> bool:
+        """判断表中是否存在指定列"""
+        return column in cls.get_table_columns(table)
+
+    @classmethod
+    def invalidate_table_columns(cls, table: Optional[str] = None):
+        """清除表结构缓存，table为None时清除全部"""
+        if table is None:
+            cls._columns_cache.clear()
+            cls._sorting_key_cache.clear()
+        else:
+            cls._columns_cache.pop(table, None)
+            cls._sorting_key_cache.pop(table, None)
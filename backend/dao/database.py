@@ -4,6 +4,8 @@ from utils.config_utils import get_postgresql_config
 
 class Database:
     _pool: Optional[asyncpg.Pool] = None
+    # LangGraph检查点使用的psycopg连接池，与asyncpg连接池连接同一个数据库
+    _checkpoint_pool = None
 
     @classmethod
     async def get_pool(cls) -> asyncpg.Pool:
@@ -29,4 +31,45 @@ class Database:
         """关闭数据库连接池"""
         if cls._pool:
             await cls._pool.close()
-            cls._pool = None 
\ No newline at end of file
+            cls._pool = None
+
+    @classmethod
+    async def get_checkpoint_pool(cls):
+        """获取psycopg异步连接池，供LangGraph的AsyncPostgresSaver使用
+
+        Raises:
+            ImportError: 未安装psycopg或psycopg-pool
+        """
+        if cls._checkpoint_pool is None:
+            from psycopg.conninfo import make_conninfo
+            from psycopg.rows import dict_row
+            from psycopg_pool import AsyncConnectionPool
+            config = get_postgresql_config()
+            conninfo = make_conninfo(
+                user=config['user'],
+                password=config['password'],
+                dbname=config['database'],
+                host=config['host'],
+                port=config['port']
+            )
+            pool = AsyncConnectionPool(
+                conninfo,
+                min_size=1,
+                max_size=10,
+                # AsyncPostgresSaver要求自动提交和字典行
+                kwargs={"autocommit": True, "prepare_threshold": 0, "row_factory": dict_row},
+                open=False
+            )
+            try:
+                await pool.open()
+            except Exception as e:
+                raise Exception(f"无法创建检查点连接池: {str(e)}")
+            cls._checkpoint_pool = pool
+        return cls._checkpoint_pool
+
+    @classmethod
+    async def close_checkpoint_pool(cls):
+        """关闭检查点连接池"""
+        if cls._checkpoint_pool is not None:
+            await cls._checkpoint_pool.close()
+            cls._checkpoint_pool = None
@@ -0,0 +1,147 @@
+from typing import Dict, List, Any, Optional, Tuple
+from dao.clickhouse_db import ClickHouseDB
+from dao.query_builder import QueryBuilder
+from dao.specialist_schema import SPECIALIST_VERSION_TABLE
+
+COLLEGE_TABLE = "qihang.dwd_youzy_college_info"
+
+
+class FacetField:
+    """分面字段：列名、元素类型，以及是否为数组列"""
+
+    def __init__(self, column: str, type_: str = "String", array: bool = False):
+        self.column = column
+        self.type_ = type_
+        self.array = array
+
+
+# 院校筛选面板的分面
+COLLEGE_FACETS: Dict[str, FacetField] = {
+    "province_name": FacetField("province_name"),
+    "nature_type": FacetField("nature_type"),
+    "categories": FacetField("categories", array=True),
+    "features": FacetField("features", array=True),
+}
+
+# 专业版本筛选面板的分面
+PROFESSION_VERSION_FACETS: Dict[str, FacetField] = {
+    "province": FacetField("province"),
+    "bus_year": FacetField("bus_year", "UInt16"),
+    "batch": FacetField("batch"),
+    "profession_category": FacetField("profession_category"),
+    "profession_type": FacetField("profession_type"),
+    "subject_category": FacetField("subject_category"),
+    "college_type": FacetField("college_type"),
+    "nature_type": FacetField("nature_type"),
+    "city_level": FacetField("city_level"),
+    "education_level": FacetField("education_level"),
+}
+
+
+def build_facet_query(
+    table: str,
+    facets: Dict[str, FacetField],
+    selected: Dict[str, List[Any]],
+    q: Optional[QueryBuilder] = None
+) -> Tuple[str, Dict[str, Any]]:
+    """
+    生成一次扫描计算全部分面计数的查询
+
+    每个分面按"除自身以外的全部已选分面"计数（多选分面的常规语义），
+    用sumMapIf在同一次扫描中分别累加；非分面的筛选条件（如名称搜索）放在WHERE中。
+
+    Args:
+        table: 表名
+        facets: 分面定义
+        selected: {分面名: 已选取值列表}
+        q: 已包含非分面筛选条件的QueryBuilder
+
+    Returns:
+        (SQL, 参数)
+    """
+    q = q or QueryBuilder()
+    conditions: Dict[str, str] = {}
+    for name, values in selected.items():
+        values = [v for v in values or [] if v not in (None, "")]
+        if name not in facets or not values:
+            continue
+        field = facets[name]
+        placeholder = q.param(values, f"Array({field.type_})", name)
+        conditions[name] = (
+            f"hasAny({field.column}, {placeholder})" if field.array else f"has({placeholder}, {field.column})"
+        )
+
+    def combined(exclude: Optional[str] = None) -> Optional[str]:
+        parts = [c for name, c in conditions.items() if name != exclude]
+        return " AND ".join(parts) if parts else None
+
+    columns = []
+    all_condition = combined()
+    columns.append(f"countIf({all_condition}) AS total" if all_condition else "count() AS total")
+    for name, field in facets.items():
+        if field.array:
+            # 同一行中重复的值只计一次，与hasAny筛选命中的行数一致
+            keys = f"arrayDistinct({field.column})"
+            counts = f"arrayWithConstant(length({keys}), toUInt64(1))"
+        else:
+            keys = f"[ifNull(toString({field.column}), '')]"
+            counts = "[toUInt64(1)]"
+        condition = combined(exclude=name)
+        if condition:
+            columns.append(f"sumMapIf({keys}, {counts}, {condition}) AS facet_{name}")
+        else:
+            columns.append(f"sumMap({keys}, {counts}) AS facet_{name}")
+
+    select_sql = ",\n        ".join(columns)
+    sql = f"""
+    SELECT
+        {select_sql}
+    FROM {table}
+    {q.where_sql()}
+    """
+    return sql, q.params
+
+
+def _to_buckets(value) -> List[Dict[str, Any]]:
+    """将sumMap结果(键数组, 计数数组)转为按计数降序的取值列表"""
+    if not value:
+        return []
+    keys, counts = value
+    buckets = [{"value": k, "count": int(c)} for k, c in zip(keys, counts) if k not in (None, "") and c]
+    buckets.sort(key=lambda b: (-b["count"], str(b["value"])))
+    return buckets
+
+
+async def run_facet_query(sql: str, params: Dict[str, Any], facets: Dict[str, FacetField]) -> Dict[str, Any]:
+    """执行分面查询并整理结果"""
+    rows = await ClickHouseDB.execute_async(sql, params)
+    row = rows[0] if rows else {}
+    return {
+        "total": int(row.get("total") or 0),
+        "facets": {name: _to_buckets(row.get(f"facet_{name}")) for name in facets}
+    }
+
+
+def college_facet_query(selected: Dict[str, List[Any]], cn_name: Optional[str] = None) -> Tuple[str, Dict[str, Any]]:
+    """院校分面查询，cn_name为非分面筛选"""
+    q = QueryBuilder()
+    if cn_name:
+        q.contains("cn_name", cn_name)
+    return build_facet_query(COLLEGE_TABLE, COLLEGE_FACETS, selected, q)
+
+
+def profession_version_facet_query(
+    selected: Dict[str, List[Any]],
+    college_name: Optional[str] = None,
+    profession_name: Optional[str] = None,
+    college_code: Optional[str] = None
+) -> Tuple[str, Dict[str, Any]]:
+    """专业版本分面查询，院校、专业名称和院校代码为非分面筛选"""
+    q = QueryBuilder()
+    if college_code:
+        q.eq("college_code", college_code)
+    if college_name:
+        q.contains("college_name", college_name)
+    if profession_name:
+        q.contains("profession_name", profession_name)
+    return build_facet_query(SPECIALIST_VERSION_TABLE, PROFESSION_VERSION_FACETS, selected, q)
@@ -1,6 +1,7 @@
 from typing import Optional, Dict, Any, List, Tuple
 import asyncpg
 from .database import Database
+from .profile_dao import ProfileDAO
 import uuid
 from langchain_core.messages import BaseMessage, HumanMessage, AIMessage
 from langchain.schema import BaseChatMessageHistory
@@ -200,6 +201,44 @@ class ChatHistoryDAO:
         
         return history, connection
     
+    @staticmethod
+    async def save_turn(connection: asyncpg.Connection, topic_id: int, user_id: int,
+                        messages: List[Tuple[str, str]],
+                        profile_changes: Optional[Dict[str, Any]] = None) -> Optional[Dict[str, Any]]:
+        """在一个事务中保存一轮对话：批量写入消息、更新话题时间，并写入档案中变化的字段
+
+        Args:
+            connection: 对话期间持有的数据库连接
+            topic_id: 话题ID
+            user_id: 用户ID
+            messages: [(消息类型, 内容)]，按先后顺序
+            profile_changes: 档案中变化的字段，为空时不更新档案
+
+        Returns:
+            更新后的档案，未更新档案时返回None
+        """
+        profile = None
+        async with connection.transaction():
+            if messages:
+                await connection.executemany(
+                    """
+                    INSERT INTO messages (topic_id, user_id, message_type, content)
+                    VALUES ($1, $2, $3, $4)
+                    """,
+                    [(topic_id, user_id, message_type, content) for message_type, content in messages]
+                )
+                await connection.execute(
+                    """
+                    UPDATE topics
+                    SET updated_at = CURRENT_TIMESTAMP
+                    WHERE topic_id = $1
+                    """,
+                    topic_id
+                )
+            if profile_changes:
+                profile = await ProfileDAO.update_profile_with(connection, user_id, **profile_changes)
+        return profile
+
     @staticmethod
     async def release_connection(connection: asyncpg.Connection):
         """释放数据库连接回连接池"""
@@ -1,5 +1,7 @@
 from typing import Dict, List, Any, Optional
 from dao.clickhouse_db import ClickHouseDB
+from dao.query_builder import QueryBuilder, identifier
+from dao.sort_planner import SortPlanner
 from utils.logger_utils import setup_logger
 
 logger = setup_logger(name="profession_dao")
@@ -8,6 +10,25 @@ class ProfessionDAO:
     """专业数据访问对象，处理与专业数据相关的数据库操作"""
     
     TABLE_NAME = "qihang.dwd_profession_category_info"
+
+    # 筛选列中不是String的列
+    FILTER_TYPES = {"establishment_year": "UInt16"}
+    
+    # 允许的排序字段，专业表较小，不需要延迟物化
+    SORT = SortPlanner(
+        TABLE_NAME,
+        fields={
+            name: name for name in [
+                "profession_code",
+                "profession_name",
+                "profession_category",
+                "profession_type",
+                "degree_category",
+                "duration",
+                "establishment_year",
+            ]
+        }
+    )
     
     @classmethod
     async def get_profession_list(
@@ -47,39 +68,37 @@ class ProfessionDAO:
             """
             
             # 条件部分
-            where_clauses = []
-            params = {}
+            q = QueryBuilder()
+            fixed_columns = []
             
             if filters:
                 for key, value in filters.items():
                     if key == "profession_name":
-                        where_clauses.append("lower(profession_name) LIKE lower(%(profession_name)s)")
-                        params["profession_name"] = f"%{value}%"
+                        q.contains("profession_name", value)
                     else:
-                        where_clauses.append(f"{key} = %({key})s")
-                        params[key] = value
+                        q.eq(identifier(key), value, cls.FILTER_TYPES.get(key, "String"))
+                        fixed_columns.append(key)
+            plan = cls.SORT.plan(sort_by, sort_order, fixed_columns)
             
             # 拼接WHERE子句
-            if where_clauses:
-                base_query += " WHERE " + " AND ".join(where_clauses)
+            base_query += " " + q.where_sql()
             
             # 获取总数
             count_query = f"SELECT COUNT(*) as total FROM ({base_query})"
-            count_result = ClickHouseDB.execute(count_query, params)
+            count_result = await ClickHouseDB.execute_async(count_query, q.params)
             total = count_result[0]['total'] if count_result else 0
             
             # 排序
-            if sort_by:
-                base_query += f" ORDER BY {sort_by} {sort_order}"
+            base_query += " " + plan.order_by_sql
             
             # 分页
             offset = (page - 1) * page_size
-            base_query += f" LIMIT {page_size} OFFSET {offset}"
+            base_query += " " + q.limit_sql(page_size, offset)
             
             # 执行查询
             print("[SQL]", base_query)
-            print("[PARAMS]", params)
-            records = ClickHouseDB.execute(base_query, params)
+            print("[PARAMS]", q.params)
+            records = await ClickHouseDB.execute_async(base_query, q.params)
             
             # 返回结果
             return {
@@ -92,4 +111,22 @@ class ProfessionDAO:
             
         except Exception as e:
             logger.error(f"获取专业列表失败: {str(e)}")
-            raise Exception(f"获取专业列表失败: {str(e)}") 
\ No newline at end of file
+            raise Exception(f"获取专业列表失败: {str(e)}")
+
+    @classmethod
+    async def get_profession_names(cls) -> List[Dict[str, Any]]:
+        """
+        获取全部专业的代码、名称和门类，用于构建名称检索索引
+        
+        Returns:
+            包含profession_code、profession_name、profession_category的字典列表
+        """
+        try:
+            query = f"""
+            SELECT DISTINCT profession_code, profession_name, profession_category
+            FROM {cls.TABLE_NAME}
+            """
+            return await ClickHouseDB.execute_async(query)
+        except Exception as e:
+            logger.error(f"获取专业名称失败: {str(e)}")
+            raise Exception(f"获取专业名称失败: {str(e)}")
@@ -0,0 +1,117 @@
+from typing import List
+from dao.clickhouse_db import ClickHouseDB
+from dao.specialist_schema import SPECIALIST_VERSION_TABLE, SUBJECT_MASK_COLUMN
+from utils.subject_utils import clickhouse_mask_expr
+
+# 专业组预聚合表（AggregatingMergeTree）和写入它的物化视图，由tools/migrate_profession_group_view.py创建
+PROFESSION_GROUP_TABLE = "qihang.agg_profession_group"
+PROFESSION_GROUP_VIEW = "qihang.mv_profession_group"
+# 全量重算时写入的临时表和写入它的物化视图，写完后临时表与预聚合表交换，视图改名为PROFESSION_GROUP_VIEW
+PROFESSION_GROUP_STAGING_TABLE = "qihang.agg_profession_group_staging"
+PROFESSION_GROUP_STAGING_VIEW = "qihang.mv_profession_group_staging"
+
+# 分组键，包含省份和城市等级，按更少的键分组时在预聚合结果上再合并一次
+GROUP_KEYS = [
+    "province",
+    "college_code",
+    "college_name",
+    "profession_group_code",
+    "profession_group_plan_num",
+    "subject_requirements",
+    "college_tags",
+    "city_level",
+]
+
+# 取最小值的历年录取数据
+MIN_COLUMNS = [
+    "last_1_year_min_rank",
+    "last_1_year_min_score",
+    "last_2_year_min_rank",
+    "last_2_year_min_score",
+    "last_3_year_min_rank",
+    "last_3_year_min_score",
+]
+
+
+def aggregate_select() -> str:
+    """
+    从专业版本宽表计算预聚合行的SELECT，物化视图、建表和回填共用
+
+    聚合列使用SimpleAggregateFunction，读取时直接用min/any合并。
+    选科要求由subject_requirements决定，subject_requirements_clean和位掩码随分组取any。
+    """
+    mins = ",\n            ".join(f"minSimpleState({c}) AS {c}" for c in MIN_COLUMNS)
+    return f"""
+        SELECT
+            {", ".join(GROUP_KEYS)},
+            anySimpleState(subject_requirements_clean) AS subject_requirements_clean,
+            anySimpleState({clickhouse_mask_expr('subject_requirements_clean')}) AS {SUBJECT_MASK_COLUMN},
+            {mins}
+        FROM {SPECIALIST_VERSION_TABLE}
+        GROUP BY {", ".join(GROUP_KEYS)}
+    """
+
+
+def migration_statements(backfill: bool = True) -> List[str]:
+    """
+    生成预聚合表和物化视图的创建语句
+
+    先建物化视图再回填，回填期间写入宽表的新数据由视图写入，不会丢失；
+    视图只处理新插入的数据，宽表整体重写后应使用rebuild_statements重建。
+
+    Args:
+        backfill: 是否回填存量数据
+
+    Returns:
+        按执行顺序排列的SQL列表
+    """
+    statements = [
+        f"CREATE TABLE IF NOT EXISTS {PROFESSION_GROUP_TABLE} "
+        f"ENGINE = AggregatingMergeTree ORDER BY ({', '.join(GROUP_KEYS)}) "
+        f"SETTINGS allow_nullable_key = 1 "
+        f"EMPTY AS {aggregate_select()}",
+        _create_view_statement(),
+    ]
+    if backfill:
+        statements.append(f"INSERT INTO {PROFESSION_GROUP_TABLE} {aggregate_select()}")
+    return statements
+
+
+def _create_view_statement(view: str = PROFESSION_GROUP_VIEW, table: str = PROFESSION_GROUP_TABLE) -> str:
+    return f"CREATE MATERIALIZED VIEW IF NOT EXISTS {view} TO {table} AS {aggregate_select()}"
+
+
+def rebuild_statements() -> List[str]:
+    """
+    全量重算预聚合表，可作为夜间任务在宽表重新导入后执行
+
+    先写入结构相同的临时表，写完后用EXCHANGE TABLES原子交换，
+    重算期间查询仍读取旧数据，不会读到空表。
+
+    回填前先为临时表建物化视图，重算期间写入宽表的数据同时进入新旧两张表；
+    与回填重复的行在min/any合并后结果不变。Atomic数据库中物化视图按UUID引用目标表，
+    交换后临时表的视图写入新的预聚合表，原视图写入换下来的旧表，
+    因此先删除原视图，再把临时表的视图改名为PROFESSION_GROUP_VIEW，最后删除旧表，
+    任何时刻都有视图写入新的预聚合表。
+    """
+    return [
+        f"DROP VIEW IF EXISTS {PROFESSION_GROUP_STAGING_VIEW}",
+        f"DROP TABLE IF EXISTS {PROFESSION_GROUP_STAGING_TABLE}",
+        f"CREATE TABLE {PROFESSION_GROUP_STAGING_TABLE} AS {PROFESSION_GROUP_TABLE}",
+        _create_view_statement(PROFESSION_GROUP_STAGING_VIEW, PROFESSION_GROUP_STAGING_TABLE),
+        f"INSERT INTO {PROFESSION_GROUP_STAGING_TABLE} {aggregate_select()}",
+        f"EXCHANGE TABLES {PROFESSION_GROUP_TABLE} AND {PROFESSION_GROUP_STAGING_TABLE}",
+        f"DROP VIEW IF EXISTS {PROFESSION_GROUP_VIEW}",
+        f"RENAME TABLE {PROFESSION_GROUP_STAGING_VIEW} TO {PROFESSION_GROUP_VIEW}",
+        f"DROP TABLE {PROFESSION_GROUP_STAGING_TABLE}",
+    ]
+
+
+def available() -> bool:
+    """预聚合表是否已创建"""
+    return ClickHouseDB.has_column(PROFESSION_GROUP_TABLE, MIN_COLUMNS[0])
+
+
+def group_source() -> str:
+    """专业组聚合查询的数据来源，预聚合表存在时使用预聚合表，否则使用宽表"""
+    return PROFESSION_GROUP_TABLE if available() else SPECIALIST_VERSION_TABLE
@@ -47,29 +47,34 @@ class ProfileDAO:
         """更新用户档案"""
         pool = await Database.get_pool()
         async with pool.acquire() as conn:
-            # 构建更新字段
-            update_fields = []
-            values = []
-            valid_fields = ['gender', 'province', 'exam_year', 'subject_choice', 'score', 'requirement', 'rank', 'batch']
-            
-            for key, value in kwargs.items():
-                if value is not None and key in valid_fields:
-                    update_fields.append(f"{key} = ${len(values) + 2}")
-                    values.append(value)
-            
-            if not update_fields:
-                return None
+            return await ProfileDAO.update_profile_with(conn, user_id, **kwargs)
 
-            query = f"""
-                UPDATE user_profiles
-                SET {', '.join(update_fields)}
-                WHERE user_id = $1
-                RETURNING user_id, gender, province, exam_year, subject_choice, score, requirement, rank, batch, updated_at
-            """
-            values.insert(0, user_id)
-            
-            try:
-                profile = await conn.fetchrow(query, *values)
-                return format_datetime(dict(profile)) if profile else None
-            except asyncpg.ForeignKeyViolationError:
-                raise ValueError("用户ID不存在") 
\ No newline at end of file
+    @staticmethod
+    async def update_profile_with(conn: asyncpg.Connection, user_id: int, **kwargs) -> Optional[Dict[str, Any]]:
+        """在给定连接上更新用户档案，调用方可以把它和其他写入放在同一个事务中"""
+        # 构建更新字段
+        update_fields = []
+        values = []
+        valid_fields = ['gender', 'province', 'exam_year', 'subject_choice', 'score', 'requirement', 'rank', 'batch']
+        
+        for key, value in kwargs.items():
+            if value is not None and key in valid_fields:
+                update_fields.append(f"{key} = ${len(values) + 2}")
+                values.append(value)
+        
+        if not update_fields:
+            return None
+
+        query = f"""
+            UPDATE user_profiles
+            SET {', '.join(update_fields)}
+            WHERE user_id = $1
+            RETURNING user_id, gender, province, exam_year, subject_choice, score, requirement, rank, batch, updated_at
+        """
+        values.insert(0, user_id)
+        
+        try:
+            profile = await conn.fetchrow(query, *values)
+            return format_datetime(dict(profile)) if profile else None
+        except asyncpg.ForeignKeyViolationError:
+            raise ValueError("用户ID不存在")
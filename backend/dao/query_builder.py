@@ -0,0 +1,132 @@
+import re
+import hashlib
+from typing import Dict, List, Any, Optional, Iterable, Tuple
+import orjson
+
+_IDENTIFIER = re.compile(r"^[A-Za-z_][A-Za-z0-9_]*(\.[A-Za-z_][A-Za-z0-9_]*)?$")
+_PARAM_NAME = re.compile(r"[^A-Za-z0-9_]")
+
+
+def identifier(name: str) -> str:
+    """
+    校验列名或"库名.表名"，只允许字母、数字和下划线
+
+    Raises:
+        ValueError: 名称不合法
+    """
+    if not isinstance(name, str) or not _IDENTIFIER.match(name):
+        raise ValueError(f"非法的字段名: {name}")
+    return name
+
+
+def string_literal(value: str) -> str:
+    """生成ClickHouse字符串字面量，转义反斜杠和单引号"""
+    return "'" + str(value).replace("\\", "\\\\").replace("'", "\\'") + "'"
+
+
+def cache_key(sql: str, params: Optional[Dict[str, Any]] = None) -> str:
+    """
+    查询结果缓存键，由SQL模板和参数共同决定
+
+    Returns:
+        十六进制摘要
+    """
+    digest = hashlib.sha1(sql.encode("utf-8"))
+    if params:
+        digest.update(orjson.dumps(params, option=orjson.OPT_SORT_KEYS | orjson.OPT_NON_STR_KEYS, default=str))
+    return digest.hexdigest()
+
+
+class QueryBuilder:
+    """
+    ClickHouse查询条件构造器
+
+    所有值都以服务端参数{name:Type}绑定，SQL文本只与筛选条件的组合有关、与取值无关，
+    IN列表写作has({p:Array(String)}, column)，元素个数不同SQL文本也相同。
+    参数名由列名生成，同一列多次出现时追加序号。
+    """
+
+    def __init__(self):
+        self.params: Dict[str, Any] = {}
+        self._where: List[str] = []
+        self._having: List[str] = []
+
+    def param(self, value: Any, type_: str, name: str = "p") -> str:
+        """
+        登记参数并返回占位符
+
+        Args:
+            value: 参数值
+            type_: ClickHouse类型，如String、UInt32、Array(String)
+            name: 参数名前缀，通常为列名
+
+        Returns:
+            {name:Type}形式的占位符
+        """
+        base = _PARAM_NAME.sub("_", name) or "p"
+        key = base
+        n = 1
+        while key in self.params:
+            key = f"{base}_{n}"
+            n += 1
+        self.params[key] = value
+        return f"{{{key}:{type_}}}"
+
+    def where(self, condition: str) -> "QueryBuilder":
+        """添加已含占位符的条件，占位符由param生成"""
+        self._where.append(condition)
+        return self
+
+    def having(self, condition: str) -> "QueryBuilder":
+        self._having.append(condition)
+        return self
+
+    def eq(self, column: str, value: Any, type_: str = "String", name: Optional[str] = None) -> "QueryBuilder":
+        """column = 值，column为表达式时可用name指定参数名"""
+        return self.where(f"{column} = {self.param(value, type_, name or _column_name(column))}")
+
+    def isin(self, column: str, values: Iterable[Any], type_: str = "String") -> "QueryBuilder":
+        """column取值为列表中任一值"""
+        placeholder = self.param(list(values), f"Array({type_})", _column_name(column))
+        return self.where(f"has({placeholder}, {column})")
+
+    def has_any(self, column: str, values: Iterable[Any], type_: str = "String") -> "QueryBuilder":
+        """数组列包含列表中任一值"""
+        placeholder = self.param(list(values), f"Array({type_})", _column_name(column))
+        return self.where(f"hasAny({column}, {placeholder})")
+
+    def has_all(self, column: str, values: Iterable[Any], type_: str = "String") -> "QueryBuilder":
+        """数组列包含列表中全部值"""
+        placeholder = self.param(list(values), f"Array({type_})", _column_name(column))
+        return self.where(f"hasAll({column}, {placeholder})")
+
+    def contains(self, column: str, value: str, case_insensitive: bool = True) -> "QueryBuilder":
+        """column包含子串，与LIKE '%x%'一致但不受%和_影响"""
+        func = "positionCaseInsensitiveUTF8" if case_insensitive else "positionUTF8"
+        return self.where(f"{func}({column}, {self.param(value, 'String', _column_name(column))}) > 0")
+
+    def between(self, column: str, low: Any, high: Any, type_: str = "Int64", having: bool = False) -> "QueryBuilder":
+        name = _column_name(column)
+        condition = f"{column} BETWEEN {self.param(low, type_, name + '_min')} AND {self.param(high, type_, name + '_max')}"
+        return self.having(condition) if having else self.where(condition)
+
+    def where_sql(self) -> str:
+        """WHERE子句，没有条件时为空字符串"""
+        return "WHERE " + " AND ".join(self._where) if self._where else ""
+
+    def having_sql(self) -> str:
+        """HAVING子句，没有条件时为空字符串"""
+        return "HAVING " + " AND ".join(self._having) if self._having else ""
+
+    def limit_sql(self, limit: int, offset: int = 0) -> str:
+        """参数化的LIMIT/OFFSET，翻页时SQL文本不变"""
+        return f"LIMIT {self.param(int(limit), 'UInt64', 'limit')} OFFSET {self.param(int(offset), 'UInt64', 'offset')}"
+
+    def build(self, sql: str) -> Tuple[str, Dict[str, Any]]:
+        """返回(SQL, 参数)，便于直接传给ClickHouseDB.execute"""
+        return sql, dict(self.params)
+
+
+def _column_name(expr: str) -> str:
+    """由列名或表达式生成参数名前缀"""
+    return _PARAM_NAME.sub("_", expr.split(".")[-1])[:32].strip("_") or "p"
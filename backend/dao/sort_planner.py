@@ -0,0 +1,138 @@
+from typing import Dict, List, Optional, Iterable, Tuple
+from dao.clickhouse_db import ClickHouseDB
+
+
+class SortPlan:
+    """排序计划：ORDER BY子句，以及是否走前N行延迟物化"""
+
+    def __init__(self, terms: List[Tuple[str, str]], read_in_order: bool, late_materialize: bool):
+        """
+        Args:
+            terms: [(列表达式, ASC/DESC)]
+            read_in_order: 排序与表的排序键一致，ClickHouse默认按存储顺序读取（optimize_read_in_order），读够LIMIT即停止
+            late_materialize: 需要对大结果集全量排序，先只排序行位置取前N行，再读取完整行
+        """
+        self.terms = terms
+        self.read_in_order = read_in_order
+        self.late_materialize = late_materialize
+
+    @property
+    def order_by_sql(self) -> str:
+        if not self.terms:
+            return ""
+        return "ORDER BY " + ", ".join(f"{expr} {direction}" for expr, direction in self.terms)
+
+
+class SortPlanner:
+    """
+    排序规划器
+
+    只允许按登记的字段排序，字段映射为列表达式；首个排序列是表排序键的前缀
+    （被等值条件固定的键列可以跳过）时ClickHouse按存储顺序读取。
+    显式指定了不在排序键上的字段、且结果集较大时，改为先排序行位置(_part, _part_offset)
+    取前N行，再回表读取完整行；默认排序和小结果集直接排序，避免两次读表。
+    """
+
+    # 结果集行数不低于此值时才使用延迟物化
+    LATE_MATERIALIZE_MIN_ROWS = 100000
+
+    def __init__(
+        self,
+        table: str,
+        fields: Dict[str, str],
+        default: Optional[List[Tuple[str, str]]] = None,
+        late_materialize: bool = False
+    ):
+        """
+        Args:
+            table: 表名
+            fields: {排序字段名: 列表达式}
+            default: 未指定排序时的默认排序，[(字段名, ASC/DESC)]
+            late_materialize: 不能按存储顺序读取时是否使用延迟物化
+        """
+        self.table = table
+        self.fields = fields
+        self.default = default or []
+        self.late_materialize = late_materialize
+
+    @property
+    def sortable_fields(self) -> List[str]:
+        return list(self.fields.keys())
+
+    def validate(self, sort_by: Optional[str]):
+        """
+        Raises:
+            ValueError: 字段不允许排序
+        """
+        if sort_by and sort_by not in self.fields:
+            raise ValueError(f"不支持按{sort_by}排序，可选字段: {', '.join(self.sortable_fields)}")
+
+    def plan(self, sort_by: Optional[str] = None, sort_order: str = "DESC",
+             fixed_columns: Iterable[str] = (), total_rows: Optional[int] = None) -> SortPlan:
+        """
+        生成排序计划
+
+        Args:
+            sort_by: 排序字段名，None表示使用默认排序
+            sort_order: ASC或DESC
+            fixed_columns: WHERE中以等值条件固定的列
+            total_rows: 满足筛选条件的行数，未知时为None，此时不使用延迟物化
+
+        Returns:
+            SortPlan
+
+        Raises:
+            ValueError: 字段不允许排序
+        """
+        self.validate(sort_by)
+        if sort_by:
+            direction = "ASC" if str(sort_order).upper() == "ASC" else "DESC"
+            terms = [(self.fields[sort_by], direction)]
+        else:
+            terms = [(self.fields[name], direction) for name, direction in self.default]
+        if not terms:
+            return SortPlan([], read_in_order=False, late_materialize=False)
+        read_in_order = self._leads_sorting_key(terms[0][0], set(fixed_columns))
+        late_materialize = (self.late_materialize and sort_by is not None and not read_in_order
+                            and total_rows is not None and total_rows >= self.LATE_MATERIALIZE_MIN_ROWS)
+        return SortPlan(terms, read_in_order, late_materialize)
+
+    def _leads_sorting_key(self, expr: str, fixed: set) -> bool:
+        """
+        首个排序列是否为排序键中第一个未被等值条件固定的列
+
+        满足时ClickHouse可以按存储顺序读取，后续排序列只需在首列相同的行内补充排序
+        """
+        for key in ClickHouseDB.get_sorting_key(self.table):
+            if key == expr:
+                return True
+            if key not in fixed:
+                return False
+        return False
+
+    def top_n_query(self, columns_sql: str, where_sql: str, plan: SortPlan, limit_sql: str) -> str:
+        """
+        延迟物化的前N行查询：子查询只读取排序列和行位置完成排序和分页，
+        外层按行位置回表读取完整行，避免对宽行做全量排序
+
+        Args:
+            columns_sql: 外层SELECT的列
+            where_sql: WHERE子句
+            plan: 排序计划
+            limit_sql: LIMIT/OFFSET子句
+
+        Returns:
+            SQL
+        """
+        return f"""
+            SELECT {columns_sql}
+            FROM {self.table}
+            WHERE (_part, _part_offset) IN (
+                SELECT _part, _part_offset
+                FROM {self.table}
+                {where_sql}
+                {plan.order_by_sql}
+                {limit_sql}
+            )
+            {plan.order_by_sql}
+        """
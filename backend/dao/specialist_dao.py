@@ -1,16 +1,137 @@
 import json
-from typing import Dict, List, Any, Optional
+from typing import Dict, List, Any, Optional, Iterator
 import logging
 from dao.clickhouse_db import ClickHouseDB
 from dao.database import Database
+from dao.specialist_schema import SPECIALIST_TABLE, json_field_expr
+from dao.specialist_schema import SPECIALIST_VERSION_TABLE, SUBJECT_MASK_COLUMN
+from dao import profession_group_view
+from dao.query_builder import QueryBuilder, identifier, string_literal
+from dao.sort_planner import SortPlanner
+from utils import json_utils
+from utils.subject_utils import parse_requirement, EITHER_OF_PATTERN
 
 # 配置日志
 logger = logging.getLogger("specialist_dao")
 
+# 院校表中可能以字符串字面量存储的数组列，查询院校时解码为列表
+COLLEGE_ARRAY_COLUMNS = ["categories", "features"]
+
+# 大学列表返回的字段
+COLLEGE_LIST_COLUMNS = [
+    "id",
+    "num_id",
+    "code",
+    "gb_code",
+    "cn_name",
+    "logo_url",
+    "province_name",
+    "city_name",
+    "nature_type",
+    "edu_level",
+    "categories",
+    "features",
+    "introduction",
+    "en_name",
+    "short_name",
+    "motto",
+    "number_of_stu",
+    "male_rate_of_stu",
+    "female_rate_of_stu",
+    "rate_of_baoyan",
+    "star",
+    "ranking_of_wsl",
+    "ranking_of_rk",
+    "ranking_of_xyh",
+    "ranking_of_us_news",
+    "ranking_of_qs",
+    "ranking_of_edu",
+    "web_site",
+    "zhao_ban_wz",
+    "zhao_ban_dh",
+    "updated_at",
+]
+
+# 专业版本筛选列中不是String的列
+PROFESSION_VERSION_FILTER_TYPES = {"bus_year": "UInt16"}
+
+# 专业版本列表返回的字段
+PROFESSION_VERSION_COLUMNS = [
+    "bus_year",
+    "college_code",
+    "college_name",
+    "profession_group_code",
+    "profession_enroll_code",
+    "profession_name",
+    "profession_type",
+    "profession_category",
+    "batch",
+    "subject_category",
+    "subject_requirements",
+    "plan_num",
+    "study_duration",
+    "tuition",
+    "last_4_year_avg_rank",
+    "last_4_year_avg_score",
+    "last_3_year_avg_rank",
+    "last_3_year_avg_score",
+    "last_2_year_avg_rank",
+    "last_2_year_avg_score",
+    "last_1_year_avg_rank",
+    "last_1_year_avg_score",
+    "profession_standard",
+    "profession_evaluation",
+    "doctoral_program",
+    "master_program",
+    "rk_rank",
+    "rk_rating",
+    "baoyan_rate",
+    "nature_type",
+    "college_location",
+    "city_level",
+    "province",
+    "education_level",
+    "college_type",
+    "college_ranking",
+    "college_tags",
+    "college_level",
+    "belong_to",
+]
+
+# 专业版本列表允许的排序字段，college_tags等宽字段不允许排序
+PROFESSION_VERSION_SORT = SortPlanner(
+    SPECIALIST_VERSION_TABLE,
+    fields={
+        name: name for name in [
+            "bus_year",
+            "college_code",
+            "college_name",
+            "profession_group_code",
+            "profession_enroll_code",
+            "profession_name",
+            "plan_num",
+            "tuition",
+            "last_1_year_avg_rank",
+            "last_1_year_avg_score",
+            "last_2_year_avg_rank",
+            "last_2_year_avg_score",
+            "last_3_year_avg_rank",
+            "last_3_year_avg_score",
+            "last_4_year_avg_rank",
+            "last_4_year_avg_score",
+            "rk_rank",
+            "baoyan_rate",
+            "college_ranking",
+        ]
+    },
+    default=[("bus_year", "DESC"), ("college_code", "ASC")],
+    late_materialize=True
+)
+
 class SpecialistDAO:
     """专家数据访问对象，处理与专家数据相关的数据库操作"""
     
-    TABLE_NAME = "qihang.dwd_tszh_specialist_fat"
+    TABLE_NAME = SPECIALIST_TABLE
     
     @classmethod
     async def get_specialists(
@@ -19,7 +140,9 @@ class SpecialistDAO:
         page_size: int = 10,
         filters: Optional[Dict[str, Any]] = None,
         sort_by: Optional[str] = None,
-        sort_order: str = "DESC"
+        sort_order: str = "DESC",
+        fields: Optional[List[str]] = None,
+        raw: bool = False
     ) -> Dict[str, Any]:
         """
         获取专家列表数据
@@ -30,15 +153,30 @@ class SpecialistDAO:
             filters: 筛选条件，键值对
             sort_by: 排序字段
             sort_order: 排序方向，ASC升序，DESC降序
+            fields: 只返回record_value中的指定字段，由ClickHouse用JSONExtractRaw提取
+            raw: 为True时不在Python中解析record_value，直接以orjson.Fragment透传
             
         Returns:
             包含数据列表和分页信息的字典
         """
         try:
+            q = QueryBuilder()
+            if fields:
+                # 字段投影：服务端只提取需要的字段，避免传输和解析整个JSON
+                projections = []
+                for i, field in enumerate(fields):
+                    projections.append(f"JSONExtractRaw(record_value, {q.param(field, 'String', f'field_{i}')}) AS field_{i}")
+                value_columns = ",\n                ".join(projections)
+            elif raw:
+                # 透传模式：由ClickHouse校验JSON合法性，合法行无需在Python中解析
+                value_columns = "record_value,\n                (isValidJSON(record_value) AND JSONType(record_value) = 'Object') AS valid_json"
+            else:
+                value_columns = "record_value"
+
             # 基础查询
             base_query = f"""
             SELECT 
-                record_value,
+                {value_columns},
                 dt,
                 file_name,
                 province_name
@@ -47,9 +185,6 @@ class SpecialistDAO:
             """
             
             # 条件部分
-            where_clauses = []
-            params = {}
-            
             if filters:
                 # 提取province_name进行特殊处理
                 province_name = filters.pop('province_name', None)
@@ -58,24 +193,19 @@ class SpecialistDAO:
                 for key, value in filters.items():
                     # 对JSON字段内的值处理
                     if value is not None and value != "":
-                        # 添加JSON字段条件，使用JSONExtractString函数
-                        param_name = f"param_{len(params)}"
-                        where_clauses.append(f"JSONExtractString(record_value, '{key}') = {{{param_name}:String}}")
-                        params[param_name] = str(value)
+                        # 添加JSON字段条件，已提升为物化列的字段直接使用物化列
+                        q.eq(json_field_expr(key), str(value), name=f"json_{key}")
                 
                 # 处理province_name作为表字段
                 if province_name is not None and province_name != "":
-                    param_name = f"param_{len(params)}"
-                    where_clauses.append(f"province_name = {{{param_name}:String}}")
-                    params[param_name] = str(province_name)
+                    q.eq("province_name", str(province_name))
             
             # 拼接WHERE子句
-            if where_clauses:
-                base_query += " WHERE " + " AND ".join(where_clauses)
+            base_query += " " + q.where_sql()
             
             # 获取总数
             count_query = f"SELECT COUNT(*) as total FROM ({base_query})"
-            count_result = ClickHouseDB.execute(count_query, params)
+            count_result = await ClickHouseDB.execute_async(count_query, q.params)
             total = count_result[0]['total'] if count_result else 0
             
             # 排序
@@ -84,41 +214,53 @@ class SpecialistDAO:
                 if "." in sort_by:
                     field_parts = sort_by.split(".")
                     if len(field_parts) == 2:
-                        sort_clause = f"JSONExtractString(record_value, '{field_parts[1]}')"
+                        sort_clause = json_field_expr(field_parts[1])
                     else:
                         # 多层嵌套
                         parent = field_parts[0]
                         for i in range(1, len(field_parts) - 1):
-                            parent = f"JSONExtractRaw(record_value, '{parent}')"
-                        sort_clause = f"JSONExtractString({parent}, '{field_parts[-1]}')"
+                            parent = f"JSONExtractRaw(record_value, {string_literal(parent)})"
+                        sort_clause = f"JSONExtractString({parent}, {string_literal(field_parts[-1])})"
                 else:
                     # 非JSON字段直接排序
-                    sort_clause = sort_by
+                    sort_clause = identifier(sort_by)
                 
-                base_query += f" ORDER BY {sort_clause} {sort_order}"
+                base_query += f" ORDER BY {sort_clause} {'ASC' if sort_order == 'ASC' else 'DESC'}"
             else:
                 # 默认排序
                 base_query += f" ORDER BY dt DESC"
             
             # 分页
             offset = (page - 1) * page_size
-            base_query += f" LIMIT {page_size} OFFSET {offset}"
+            base_query += " " + q.limit_sql(page_size, offset)
             
             # 执行查询
-            records = ClickHouseDB.execute(base_query, params)
+            records = await ClickHouseDB.execute_async(base_query, q.params)
             
             # 处理结果，将JSON字符串转为字典
             specialists = []
             for record in records:
+                base_fields = {
+                    'dt': record['dt'].isoformat() if record['dt'] else None,
+                    'file_name': record['file_name'],
+                    'province_name': record['province_name']
+                }
+                if fields:
+                    record_data = {
+                        field: json_utils.loads(record[f"field_{i}"]) if record[f"field_{i}"] else None
+                        for i, field in enumerate(fields)
+                    }
+                    record_data.update(base_fields)
+                    specialists.append(record_data)
+                    continue
+                if raw and record['valid_json']:
+                    specialists.append(json_utils.merge_raw(record['record_value'], base_fields))
+                    continue
                 try:
                     # 解析JSON并与基础数据合并
-                    record_data = json.loads(record['record_value'])
+                    record_data = json_utils.loads(record['record_value'])
                     # 添加非JSON字段
-                    record_data.update({
-                        'dt': record['dt'].isoformat() if record['dt'] else None,
-                        'file_name': record['file_name'],
-                        'province_name': record['province_name']
-                    })
+                    record_data.update(base_fields)
                     specialists.append(record_data)
                 except json.JSONDecodeError as e:
                     logger.error(f"JSON解析错误: {str(e)}, record_value: {record['record_value']}")
@@ -163,21 +305,22 @@ class SpecialistDAO:
             专家详情数据
         """
         try:
+            q = QueryBuilder()
             # 处理特殊表字段
             if field_name == "province_name":
-                where_clause = f"province_name = {{value:String}}"
+                q.eq("province_name", field_value, name="value")
             # 判断是否是JSON内部字段
             elif "." in field_name:
                 # JSON内部字段，使用JSONExtractString
                 parts = field_name.split(".")
                 if len(parts) == 2:
-                    where_clause = f"JSONExtractString(record_value, '{parts[1]}') = {{value:String}}"
+                    q.eq(json_field_expr(parts[1]), field_value, name="value")
                 else:
                     # 先不处理过于复杂的嵌套结构
                     raise Exception(f"不支持超过2级的嵌套JSON字段: {field_name}")
             else:
                 # 普通字段或JSON第一级字段
-                where_clause = f"JSONExtractString(record_value, '{field_name}') = {{value:String}}"
+                q.eq(json_field_expr(field_name), field_value, name="value")
             
             query = f"""
             SELECT 
@@ -187,13 +330,11 @@ class SpecialistDAO:
                 province_name
             FROM 
                 {cls.TABLE_NAME}
-            WHERE
-                {where_clause}
+            {q.where_sql()}
             LIMIT 1
             """
             
-            params = {'value': field_value}
-            records = ClickHouseDB.execute(query, params)
+            records = await ClickHouseDB.execute_async(query, q.params)
             
             if not records:
                 raise Exception(f"未找到{field_name}为 {field_value} 的专家数据")
@@ -201,7 +342,7 @@ class SpecialistDAO:
             record = records[0]
             try:
                 # 解析JSON并与基础数据合并
-                record_data = json.loads(record['record_value'])
+                record_data = json_utils.loads(record['record_value'])
                 # 添加非JSON字段
                 record_data.update({
                     'dt': record['dt'].isoformat() if record['dt'] else None,
@@ -242,25 +383,18 @@ class SpecialistDAO:
             分数排名数据
         """
         try:
-            query = """
+            q = QueryBuilder().eq("province_name", province_name).eq("year", year, "UInt16").eq("batch", batch)
+            query = f"""
             SELECT 
                 ranks,
                 province_name,
                 batch
             FROM dwd_youzy_score_rank_chunk 
-            WHERE province_name = %(province_name)s 
-            AND year = %(year)s 
-            AND batch = %(batch)s
+            {q.where_sql()}
             LIMIT 1
             """
             
-            params = {
-                "province_name": province_name,
-                "year": year,
-                "batch": batch
-            }
-            
-            result = ClickHouseDB.execute(query, params)
+            result = await ClickHouseDB.execute_async(query, q.params)
             if not result or len(result) == 0:
                 return None
                 
@@ -287,6 +421,25 @@ class SpecialistDAO:
             logger.error(f"从数据库获取分数排名数据失败: {str(e)}")
             raise Exception(f"从数据库获取分数排名数据失败: {str(e)}")
 
+    @staticmethod
+    async def get_score_rank_keys() -> List[Dict[str, Any]]:
+        """
+        获取一分一段表中已有的(省份, 批次, 年份)组合
+        
+        Returns:
+            包含province_name、batch、year的字典列表
+        """
+        try:
+            query = """
+            SELECT DISTINCT province_name, batch, year
+            FROM dwd_youzy_score_rank_chunk
+            ORDER BY province_name, batch, year
+            """
+            return await ClickHouseDB.execute_async(query)
+        except Exception as e:
+            logger.error(f"获取一分一段表组合失败: {str(e)}")
+            raise Exception(f"获取一分一段表组合失败: {str(e)}")
+
     @staticmethod
     async def get_college_list(
         page: int = 1,
@@ -299,99 +452,46 @@ class SpecialistDAO:
     ) -> Dict[str, Any]:
         """获取大学列表，支持多条件筛选"""
         try:
-            where_clauses = []
-            params = {}
+            q = QueryBuilder()
             # cn_name模糊搜索
             if cn_name:
-                where_clauses.append("lower(cn_name) LIKE lower(%(cn_name)s)")
-                params["cn_name"] = f"%{cn_name}%"
+                q.contains("cn_name", cn_name)
             # province_name多选
             if province_name:
                 province_list = [p for p in province_name if p]
                 if province_list:
-                    province_sql = ','.join([f"'{p}'" for p in province_list])
-                    where_clauses.append(f"province_name IN ({province_sql})")
+                    q.isin("province_name", province_list)
             # nature_type多选
             if nature_type:
                 nature_list = [n for n in nature_type if n]
                 if nature_list:
-                    nature_sql = ','.join([f"'{n}'" for n in nature_list])
-                    where_clauses.append(f"nature_type IN ({nature_sql})")
+                    q.isin("nature_type", nature_list)
             # categories数组筛选（hasAny实现）
             if categories:
-                where_clauses.append("hasAny(categories, %(categories_any)s)")
-                params["categories_any"] = categories
+                q.has_any("categories", categories)
             # features数组筛选（hasAny实现）
             if features:
-                where_clauses.append("hasAny(features, %(features_any)s)")
-                params["features_any"] = features
-            # 拼接where
-            where_sql = ""
-            if where_clauses:
-                where_sql = "WHERE " + " AND ".join(where_clauses)
+                q.has_any("features", features)
+            where_sql = q.where_sql()
             # 统计总数
             count_query = f"SELECT count(*) as total FROM qihang.dwd_youzy_college_info {where_sql}"
-            count_result = ClickHouseDB.execute(count_query, params)
+            count_result = await ClickHouseDB.execute_async(count_query, q.params)
             total = count_result[0]['total'] if count_result else 0
             # 分页数据
             offset = (page - 1) * page_size
             query = f"""
-            SELECT 
-                id,
-                num_id,
-                code,
-                gb_code,
-                cn_name,
-                logo_url,
-                province_name,
-                city_name,
-                nature_type,
-                edu_level,
-                categories,
-                features,
-                introduction,
-                en_name,
-                short_name,
-                motto,
-                number_of_stu,
-                male_rate_of_stu,
-                female_rate_of_stu,
-                rate_of_baoyan,
-                star,
-                ranking_of_wsl,
-                ranking_of_rk,
-                ranking_of_xyh,
-                ranking_of_us_news,
-                ranking_of_qs,
-                ranking_of_edu,
-                web_site,
-                zhao_ban_wz,
-                zhao_ban_dh,
-                updated_at
+            SELECT {', '.join(COLLEGE_LIST_COLUMNS)}
             FROM qihang.dwd_youzy_college_info
             {where_sql}
             ORDER BY updated_at DESC
-            LIMIT {page_size} OFFSET {offset}
+            {q.limit_sql(page_size, offset)}
             """
             print("[SQL]", query)
-            print("[PARAMS]", params)
-            records = ClickHouseDB.execute(query, params)
-            colleges = []
-            for record in records:
-                if 'categories' in record and isinstance(record['categories'], str):
-                    try:
-                        record['categories'] = eval(record['categories'])
-                    except:
-                        record['categories'] = []
-                if 'features' in record and isinstance(record['features'], str):
-                    try:
-                        record['features'] = eval(record['features'])
-                    except:
-                        record['features'] = []
-                colleges.append(dict(record))
+            print("[PARAMS]", q.params)
+            records = await ClickHouseDB.execute_async(query, q.params, array_columns=COLLEGE_ARRAY_COLUMNS)
             return {
                 "total": total,
-                "items": colleges
+                "items": records
             }
         except Exception as e:
             logger.error(f"获取大学列表失败: {str(e)}")
@@ -401,30 +501,81 @@ class SpecialistDAO:
     async def get_college_detail(code: str) -> Dict[str, Any]:
         """根据code获取院校详情"""
         try:
-            query = """
-            SELECT * FROM qihang.dwd_youzy_college_info WHERE code = %(code)s LIMIT 1
+            q = QueryBuilder().eq("code", code)
+            query = f"""
+            SELECT * FROM qihang.dwd_youzy_college_info {q.where_sql()} LIMIT 1
             """
-            params = {"code": code}
-            records = ClickHouseDB.execute(query, params)
+            records = await ClickHouseDB.execute_async(query, q.params, array_columns=COLLEGE_ARRAY_COLUMNS)
             if not records:
                 return {}
-            record = records[0]
-            # 处理数组类型字段
-            if 'categories' in record and isinstance(record['categories'], str):
-                try:
-                    record['categories'] = eval(record['categories'])
-                except:
-                    record['categories'] = []
-            if 'features' in record and isinstance(record['features'], str):
-                try:
-                    record['features'] = eval(record['features'])
-                except:
-                    record['features'] = []
-            return dict(record)
+            return records[0]
         except Exception as e:
             logger.error(f"获取院校详情失败: {str(e)}")
             raise Exception(f"获取院校详情失败: {str(e)}")
 
+    @staticmethod
+    async def get_college_catalog_version() -> Optional[str]:
+        """
+        获取院校表的数据版本，取最大updated_at和总行数，用于判断院校目录缓存是否需要刷新
+
+        Returns:
+            版本字符串，表为空时返回None
+        """
+        query = """
+        SELECT toString(max(updated_at)) AS max_updated_at, count() AS total
+        FROM qihang.dwd_youzy_college_info
+        """
+        result = await ClickHouseDB.execute_async(query)
+        if not result or not result[0]["total"]:
+            return None
+        return f"{result[0]['max_updated_at']}#{result[0]['total']}"
+
+    @staticmethod
+    async def get_college_catalog() -> List[Dict[str, Any]]:
+        """
+        获取全部院校记录，按updated_at降序，与get_college_list的排序一致
+
+        Returns:
+            院校记录列表
+        """
+        try:
+            query = """
+            SELECT * FROM qihang.dwd_youzy_college_info ORDER BY updated_at DESC
+            """
+            return await ClickHouseDB.execute_async(query, array_columns=COLLEGE_ARRAY_COLUMNS)
+        except Exception as e:
+            logger.error(f"获取院校目录失败: {str(e)}")
+            raise Exception(f"获取院校目录失败: {str(e)}")
+
+    @staticmethod
+    def _use_subject_mask(requirement: str) -> bool:
+        """选科要求能解析为位掩码且表中已有subject_mask列"""
+        return (parse_requirement(requirement) is not None
+                and ClickHouseDB.has_column(SPECIALIST_VERSION_TABLE, SUBJECT_MASK_COLUMN))
+
+    @staticmethod
+    def _profession_version_filters(filters: Optional[Dict[str, Any]]):
+        """
+        专业版本列表和导出共用的筛选条件
+
+        Returns:
+            (QueryBuilder, 以等值条件固定的列)，排序时可以跳过排序键中的这些列
+        """
+        q = QueryBuilder()
+        fixed_columns = []
+        for key, value in (filters or {}).items():
+            if key in ["college_name", "profession_name"]:
+                q.contains(key, value)
+            elif key == "subject_requirements" and SpecialistDAO._use_subject_mask(value):
+                # 选科要求按位掩码比较，与科目书写顺序无关；
+                # "任选其一"的行与"全部要求"的行掩码相同，需要排除
+                q.eq(SUBJECT_MASK_COLUMN, parse_requirement(value), "UInt16")
+                q.where(f"NOT match(subject_requirements, {q.param(EITHER_OF_PATTERN, 'String', 'either_of')})")
+            else:
+                q.eq(identifier(key), value, PROFESSION_VERSION_FILTER_TYPES.get(key, "String"))
+                fixed_columns.append(key)
+        return q, fixed_columns
+
     @staticmethod
     async def get_profession_version_list(
         page: int,
@@ -437,74 +588,30 @@ class SpecialistDAO:
         获取专业版本列表
         """
         try:
-            query = """
-                SELECT 
-                    bus_year,
-                    college_code,
-                    college_name,
-                    profession_group_code,
-                    profession_enroll_code,
-                    profession_name,
-                    profession_type,
-                    profession_category,
-                    batch,
-                    subject_category,
-                    subject_requirements,
-                    plan_num,
-                    study_duration,
-                    tuition,
-                    last_4_year_avg_rank,
-                    last_4_year_avg_score,
-                    last_3_year_avg_rank,
-                    last_3_year_avg_score,
-                    last_2_year_avg_rank,
-                    last_2_year_avg_score,
-                    last_1_year_avg_rank,
-                    last_1_year_avg_score,
-                    profession_standard,
-                    profession_evaluation,
-                    doctoral_program,
-                    master_program,
-                    rk_rank,
-                    rk_rating,
-                    baoyan_rate,
-                    nature_type,
-                    college_location,
-                    city_level,
-                    province,
-                    education_level,
-                    college_type,
-                    college_ranking,
-                    college_tags,
-                    college_level,
-                    belong_to
-                FROM qihang.dwm_tszh_specialistversion_fat
-                WHERE 1=1
-            """
-            params = []
-            if filters:
-                for key, value in filters.items():
-                    if key in ["college_name", "profession_name"]:
-                        query += f" AND {key} LIKE %s"
-                        params.append(f"%{value}%")
-                    else:
-                        query += f" AND {key} = %s"
-                        params.append(value)
-            # 打印SQL和参数
-            print("[ProfessionVersion SQL]", query)
-            print("[ProfessionVersion PARAMS]", params)
-            count_query = f"SELECT COUNT(*) as total FROM ({query}) as t"
-            total_result = ClickHouseDB.execute(count_query, params)
+            q, fixed_columns = SpecialistDAO._profession_version_filters(filters)
+            PROFESSION_VERSION_SORT.validate(sort_by)
+            where_sql = q.where_sql()
+            count_query = f"SELECT COUNT(*) as total FROM {SPECIALIST_VERSION_TABLE} {where_sql}"
+            total_result = await ClickHouseDB.execute_async(count_query, q.params)
             total = total_result[0]["total"] if total_result else 0
-            if sort_by:
-                query += f" ORDER BY {sort_by} {sort_order}"
-            else:
-                query += " ORDER BY bus_year DESC, college_code ASC"
+            plan = PROFESSION_VERSION_SORT.plan(sort_by, sort_order, fixed_columns, total_rows=total)
             offset = (page - 1) * page_size
-            query += f" LIMIT {page_size} OFFSET {offset}"
-            # 再次打印最终SQL
-            print("[ProfessionVersion SQL FINAL]", query)
-            items = ClickHouseDB.execute(query, params)
+            columns_sql = ", ".join(PROFESSION_VERSION_COLUMNS)
+            if plan.late_materialize:
+                # 排序列不在排序键上，先只对行位置排序取当前页，再读取完整行
+                query = PROFESSION_VERSION_SORT.top_n_query(columns_sql, where_sql, plan, q.limit_sql(page_size, offset))
+            else:
+                query = f"""
+                SELECT {columns_sql}
+                FROM {SPECIALIST_VERSION_TABLE}
+                {where_sql}
+                {plan.order_by_sql}
+                {q.limit_sql(page_size, offset)}
+                """
+            # 打印SQL和参数
+            print("[ProfessionVersion SQL]", query)
+            print("[ProfessionVersion PARAMS]", q.params)
+            items = await ClickHouseDB.execute_async(query, q.params)
             return {
                 "total": total,
                 "items": items,
@@ -522,6 +629,37 @@ class SpecialistDAO:
                 "pages": 0
             }
 
+    @staticmethod
+    def export_profession_versions(
+        filters: Dict[str, Any],
+        fmt: str,
+        sort_by: Optional[str] = None,
+        sort_order: str = "DESC"
+    ) -> Iterator[bytes]:
+        """
+        按列表接口的筛选条件导出全部专业版本
+
+        由ClickHouse直接输出CSV/Parquet并按块转发，不解析为行，内存占用与结果大小无关
+
+        Args:
+            filters: 筛选条件，同get_profession_version_list
+            fmt: ClickHouse输出格式，如CSVWithNames、Parquet
+            sort_by: 排序字段
+            sort_order: 排序方向
+
+        Returns:
+            字节块迭代器
+        """
+        q, fixed_columns = SpecialistDAO._profession_version_filters(filters)
+        plan = PROFESSION_VERSION_SORT.plan(sort_by, sort_order, fixed_columns)
+        query = f"""
+            SELECT {", ".join(PROFESSION_VERSION_COLUMNS)}
+            FROM {SPECIALIST_VERSION_TABLE}
+            {q.where_sql()}
+            {plan.order_by_sql}
+        """
+        return ClickHouseDB.stream_raw(query, q.params, fmt=fmt)
+
     @staticmethod
     async def get_profession_group_list(
         page: int = 1,
@@ -534,20 +672,16 @@ class SpecialistDAO:
         聚合查询专业组信息，支持分页和基础筛选
         """
         try:
-            where_clauses = []
-            params = {}
+            q = QueryBuilder()
             if college_code:
-                where_clauses.append("college_code = %(college_code)s")
-                params["college_code"] = college_code
+                q.eq("college_code", college_code)
             if college_name:
-                where_clauses.append("college_name = %(college_name)s")
-                params["college_name"] = college_name
+                q.eq("college_name", college_name)
             if profession_group_code:
-                where_clauses.append("profession_group_code = %(profession_group_code)s")
-                params["profession_group_code"] = profession_group_code
-            where_sql = ""
-            if where_clauses:
-                where_sql = "WHERE " + " AND ".join(where_clauses)
+                q.eq("profession_group_code", profession_group_code)
+            where_sql = q.where_sql()
+            # 预聚合表存在时从预聚合表读取，在预聚合结果上按更少的键再合并一次
+            source = profession_group_view.group_source()
             # 聚合SQL
             base_query = f'''
                 SELECT  college_code,
@@ -562,20 +696,20 @@ class SpecialistDAO:
                         min(last_2_year_min_score) as last_2_year_min_score,
                         min(last_3_year_min_rank) as last_3_year_min_rank,
                         min(last_3_year_min_score) as last_3_year_min_score
-                FROM qihang.dwm_tszh_specialistversion_fat
+                FROM {source}
                 {where_sql}
                 GROUP BY college_code, college_name, profession_group_code, profession_group_plan_num, subject_requirements, college_tags
             '''
             # 统计总数
-            count_query = f"SELECT count() as total FROM (SELECT 1 FROM qihang.dwm_tszh_specialistversion_fat {where_sql} GROUP BY college_code, college_name, profession_group_code, profession_group_plan_num, subject_requirements, college_tags)"
-            count_result = ClickHouseDB.execute(count_query, params)
+            count_query = f"SELECT count() as total FROM (SELECT 1 FROM {source} {where_sql} GROUP BY college_code, college_name, profession_group_code, profession_group_plan_num, subject_requirements, college_tags)"
+            count_result = await ClickHouseDB.execute_async(count_query, q.params)
             total = count_result[0]["total"] if count_result else 0
             # 分页
             offset = (page - 1) * page_size
-            query = base_query + f" LIMIT {page_size} OFFSET {offset}"
+            query = base_query + " " + q.limit_sql(page_size, offset)
             print("[ProfessionGroup SQL]", query)
-            print("[ProfessionGroup PARAMS]", params)
-            items = ClickHouseDB.execute(query, params)
+            print("[ProfessionGroup PARAMS]", q.params)
+            items = await ClickHouseDB.execute_async(query, q.params)
             return {
                 "total": total,
                 "items": items,
@@ -1,29 +1,39 @@
 from typing import List, Optional, Dict, Any
 from dao.clickhouse_db import ClickHouseDB
+from dao.query_builder import QueryBuilder
+from dao.specialist_schema import SPECIALIST_VERSION_TABLE, SUBJECT_MASK_COLUMN
+from dao import profession_group_view
+from utils.subject_utils import encode_subjects
 
-def get_recommendation_groups(
+
+def subject_condition(subjects: List[str], q: QueryBuilder, table: str = SPECIALIST_VERSION_TABLE) -> str:
+    """
+    生成"选科要求包含全部科目"的筛选条件
+
+    已有subject_mask列且科目都能编码时使用一次按位与，否则使用hasAll
+    """
+    mask = encode_subjects(subjects)
+    if mask is not None and ClickHouseDB.has_column(table, SUBJECT_MASK_COLUMN):
+        placeholder = q.param(mask, "UInt16", "subject_mask")
+        return f"bitAnd({SUBJECT_MASK_COLUMN}, {placeholder}) = {placeholder}"
+    return f"hasAll(subject_requirements_clean, {q.param(list(subjects), 'Array(String)', 'subjects')})"
+
+async def get_recommendation_groups(
     rank: Optional[int] = None,
     province_name: Optional[str] = None,
     subjects: Optional[List[str]] = None,
     limit: int = 1000
 ) -> List[Dict[str, Any]]:
-    where_clauses = []
-    params = {}
+    # 预聚合表存在时从预聚合表读取，分组和合并方式不变
+    source = profession_group_view.group_source()
+    q = QueryBuilder()
     if subjects:
-        where_clauses.append("hasAll(subject_requirements_clean, %(subjects)s)")
-        params["subjects"] = list(subjects)
+        q.where(subject_condition(subjects, q, source))
     if province_name:
-        where_clauses.append("province = %(province_name)s")
-        params["province_name"] = province_name
-    where_sql = ""
-    if where_clauses:
-        where_sql = "WHERE " + " AND ".join(where_clauses)
-    having_sql = ""
+        q.eq("province", province_name)
     if rank is not None:
         # 默认区间：rank-2000 ~ rank+10000
-        having_sql = "HAVING last_2_year_min_rank BETWEEN %(rank_2_min)s AND %(rank_2_max)s"
-        params["rank_2_min"] = rank - 2000
-        params["rank_2_max"] = rank + 10000
+        q.between("last_2_year_min_rank", rank - 2000, rank + 10000, having=True)
     sql = f"""
         SELECT
             college_code,
@@ -39,8 +49,8 @@ def get_recommendation_groups(
             min(last_2_year_min_score) as last_2_year_min_score,
             min(last_3_year_min_rank) as last_3_year_min_rank,
             min(last_3_year_min_score) as last_3_year_min_score
-        FROM qihang.dwm_tszh_specialistversion_fat
-        {where_sql}
+        FROM {source}
+        {q.where_sql()}
         GROUP BY college_code,
                  college_name,
                  profession_group_code,
@@ -48,9 +58,49 @@ def get_recommendation_groups(
                  subject_requirements,
                  college_tags,
                  city_level
-        {having_sql}
-        LIMIT {limit}
+        {q.having_sql()}
+        LIMIT {q.param(int(limit), 'UInt64', 'limit')}
     """
     print("[SQL]", sql)
-    print("[PARAMS]", params)
-    return ClickHouseDB.execute(sql, params) 
\ No newline at end of file
+    print("[PARAMS]", q.params)
+    return await ClickHouseDB.execute_async(sql, q.params)
+
+def get_profession_group_snapshot(province_name: str) -> List[Dict[str, Any]]:
+    """
+    获取一个省份的全部专业组聚合数据，不带位次区间和条数限制，供推荐引擎加载到内存
+
+    Args:
+        province_name: 省份名称
+
+    Returns:
+        专业组聚合数据，字段与get_recommendation_groups一致，另含subject_requirements_clean
+    """
+    source = profession_group_view.group_source()
+    q = QueryBuilder().eq("province", province_name)
+    sql = f"""
+        SELECT
+            college_code,
+            college_name,
+            profession_group_code,
+            profession_group_plan_num,
+            subject_requirements,
+            college_tags,
+            city_level,
+            any(subject_requirements_clean) as subject_requirements_clean,
+            min(last_1_year_min_rank) as last_1_year_min_rank,
+            min(last_1_year_min_score) as last_1_year_min_score,
+            min(last_2_year_min_rank) as last_2_year_min_rank,
+            min(last_2_year_min_score) as last_2_year_min_score,
+            min(last_3_year_min_rank) as last_3_year_min_rank,
+            min(last_3_year_min_score) as last_3_year_min_score
+        FROM {source}
+        {q.where_sql()}
+        GROUP BY college_code,
+                 college_name,
+                 profession_group_code,
+                 profession_group_plan_num,
+                 subject_requirements,
+                 college_tags,
+                 city_level
+    """
+    return ClickHouseDB.execute(sql, q.params)
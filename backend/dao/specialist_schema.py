@@ -0,0 +1,96 @@
+from typing import Dict, List, Optional
+from dao.clickhouse_db import ClickHouseDB
+from dao.query_builder import string_literal
+
+# 专家宽表
+SPECIALIST_TABLE = "qihang.dwd_tszh_specialist_fat"
+# 专业版本宽表
+SPECIALIST_VERSION_TABLE = "qihang.dwm_tszh_specialistversion_fat"
+# 选科要求位掩码列，由tools/migrate_subject_mask.py创建
+SUBJECT_MASK_COLUMN = "subject_mask"
+
+# 提升为物化列的JSON高频筛选字段
+# key: record_value中的JSON字段名
+# column: 物化列名
+# index: 跳数索引定义，None表示不建索引
+PROMOTED_JSON_KEYS: Dict[str, Dict[str, Optional[str]]] = {
+    "id": {
+        "column": "json_id",
+        "index": "bloom_filter(0.01) GRANULARITY 4",
+    },
+    "name": {
+        "column": "json_name",
+        "index": "bloom_filter(0.01) GRANULARITY 4",
+    },
+}
+
+
+def promoted_column(key: str) -> Optional[str]:
+    """
+    获取JSON字段对应的物化列名
+
+    只有当字段已登记且迁移已在表上完成（列真实存在）时才返回列名，
+    这样迁移前后查询都能正常执行。
+
+    Args:
+        key: JSON字段名
+
+    Returns:
+        物化列名，未提升时返回None
+    """
+    spec = PROMOTED_JSON_KEYS.get(key)
+    if not spec:
+        return None
+    column = spec["column"]
+    if not ClickHouseDB.has_column(SPECIALIST_TABLE, column):
+        return None
+    return column
+
+
+def json_field_expr(key: str, source: str = "record_value") -> str:
+    """
+    生成读取JSON第一级字段的SQL表达式，已提升的字段自动改写为物化列
+
+    Args:
+        key: JSON字段名
+        source: JSON来源表达式，默认record_value
+
+    Returns:
+        SQL表达式
+    """
+    if source == "record_value":
+        column = promoted_column(key)
+        if column:
+            return column
+    return f"JSONExtractString({source}, {string_literal(key)})"
+
+
+def migration_statements(keys: Optional[List[str]] = None) -> List[str]:
+    """
+    生成将JSON字段提升为物化列的迁移语句
+
+    Args:
+        keys: 需要提升的字段，None表示全部已登记字段
+
+    Returns:
+        按执行顺序排列的ALTER语句列表
+    """
+    statements = []
+    for key in keys or list(PROMOTED_JSON_KEYS.keys()):
+        spec = PROMOTED_JSON_KEYS.get(key)
+        if not spec:
+            raise ValueError(f"字段 {key} 未在PROMOTED_JSON_KEYS中登记")
+        column = spec["column"]
+        statements.append(
+            f"ALTER TABLE {SPECIALIST_TABLE} ADD COLUMN IF NOT EXISTS {column} String "
+            f"MATERIALIZED JSONExtractString(record_value, {string_literal(key)})"
+        )
+        # 存量数据的物化列需要显式回填
+        statements.append(f"ALTER TABLE {SPECIALIST_TABLE} MATERIALIZE COLUMN {column}")
+        if spec.get("index"):
+            index_name = f"idx_{column}"
+            statements.append(
+                f"ALTER TABLE {SPECIALIST_TABLE} ADD INDEX IF NOT EXISTS {index_name} {column} TYPE {spec['index']}"
+            )
+            statements.append(f"ALTER TABLE {SPECIALIST_TABLE} MATERIALIZE INDEX {index_name}")
+    return statements
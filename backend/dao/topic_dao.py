@@ -1,4 +1,4 @@
-from typing import Optional, Dict, Any, List
+from typing import Optional, Dict, Any, List, Tuple
 import asyncpg
 from .database import Database
 from datetime import datetime
@@ -39,6 +39,56 @@ class TopicDAO:
             )
             return format_datetime_list([dict(topic) for topic in topics])
 
+    @staticmethod
+    async def get_user_topics_page(user_id: int, limit: int, after: Optional[Tuple[datetime, int]] = None,
+                                   preview_length: int = 100) -> List[Dict[str, Any]]:
+        """
+        按更新时间倒序分页获取用户话题，附带最后一条消息的摘要和消息数
+
+        走(user_id, updated_at DESC, topic_id DESC)索引定位一页话题，
+        每个话题的最后一条消息和消息数在同一个LATERAL子查询中取得
+
+        Args:
+            user_id: 用户ID
+            limit: 返回条数
+            after: 游标，上一页最后一个话题的(updated_at, topic_id)，为None时从第一页开始
+            preview_length: 消息摘要的最大字符数
+
+        Returns:
+            话题列表，updated_at保留datetime类型，供调用方生成游标
+        """
+        after_updated_at, after_topic_id = after if after else (None, None)
+        pool = await Database.get_pool()
+        async with pool.acquire() as conn:
+            topics = await conn.fetch(
+                """
+                SELECT t.topic_id, t.user_id, t.topic, t.started_at, t.updated_at,
+                       lm.last_message, lm.last_message_type, lm.last_message_at,
+                       COALESCE(lm.message_count, 0) AS message_count
+                FROM (
+                    SELECT topic_id, user_id, topic, started_at, updated_at
+                    FROM topics
+                    WHERE user_id = $1
+                      AND ($2::timestamp IS NULL OR (updated_at, topic_id) < ($2::timestamp, $3::int))
+                    ORDER BY updated_at DESC, topic_id DESC
+                    LIMIT $4
+                ) t
+                LEFT JOIN LATERAL (
+                    SELECT LEFT(m.content, $5) AS last_message,
+                           m.message_type::text AS last_message_type,
+                           m.created_at AS last_message_at,
+                           (SELECT COUNT(*) FROM messages c WHERE c.topic_id = t.topic_id) AS message_count
+                    FROM messages m
+                    WHERE m.topic_id = t.topic_id
+                    ORDER BY m.message_id DESC
+                    LIMIT 1
+                ) lm ON TRUE
+                ORDER BY t.updated_at DESC, t.topic_id DESC
+                """,
+                user_id, after_updated_at, after_topic_id, limit, preview_length
+            )
+            return [dict(topic) for topic in topics]
+
     @staticmethod
     async def update_topic(topic_id: int, topic: str) -> Optional[Dict[str, Any]]:
         """更新话题"""
@@ -0,0 +1,67 @@
+from typing import Dict, Any, List, Optional
+from services.recommendation_engine import RecommendationEngine
+from utils.logger_utils import setup_logger
+
+# 配置日志
+logger = setup_logger(name="candidate_retrieval")
+
+# 每档注入提示词的候选数量
+CANDIDATES_PER_TIER = 8
+NO_CANDIDATES = "暂无（缺少省份或位次信息，或没有匹配的历年录取数据）"
+
+
+def retrieve_candidates(user_info: Dict[str, Any], k: int = CANDIDATES_PER_TIER) -> Dict[str, List[Dict[str, Any]]]:
+    """
+    根据考生省份、位次和选科检索冲/稳/保候选专业组
+
+    Args:
+        user_info: 包含province、rank、subjects的用户信息
+        k: 每档候选数量
+
+    Returns:
+        {"冲": [...], "稳": [...], "保": [...]}，缺少信息或检索失败时返回空字典
+    """
+    province = user_info.get("province")
+    rank = user_info.get("rank")
+    if not province or not rank:
+        return {}
+    try:
+        return RecommendationEngine.recommend_tiered(
+            province_name=province,
+            rank=int(rank),
+            k=k,
+            eligible_subjects=user_info.get("subjects") or None
+        )
+    except Exception as e:
+        logger.error(f"检索候选专业组失败: {str(e)}")
+        return {}
+
+
+def _format_rank(value: Optional[float]) -> str:
+    return str(int(value)) if value is not None else "-"
+
+
+def format_candidates(tiers: Dict[str, List[Dict[str, Any]]]) -> str:
+    """
+    将候选专业组压缩为竖线分隔的表格，减少提示词token
+
+    Returns:
+        表格文本，没有候选时返回提示文字
+    """
+    lines = []
+    for tier, groups in tiers.items():
+        for group in groups:
+            history = "/".join(
+                _format_rank(group.get(f"last_{year}_year_min_rank")) for year in (1, 2, 3)
+            )
+            lines.append("|".join([
+                tier,
+                str(group.get("college_name") or ""),
+                str(group.get("profession_group_code") or ""),
+                str(group.get("subject_requirements") or "不限"),
+                history,
+                f"{group['admission_probability']:.0%}",
+            ]))
+    if not lines:
+        return NO_CANDIDATES
+    return "档位|院校|专业组|选科要求|近1/2/3年最低位次|录取概率\n" + "\n".join(lines)
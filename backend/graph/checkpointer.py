@@ -0,0 +1,91 @@
+import asyncio
+from typing import Any, Dict, Optional
+from dao.database import Database
+from utils.logger_utils import setup_logger
+
+# langgraph-checkpoint-postgres为可选依赖，未安装时不使用检查点，每轮从消息表重建状态
+try:
+    from langgraph.checkpoint.postgres.aio import AsyncPostgresSaver
+except ImportError:
+    AsyncPostgresSaver = None
+
+# 配置日志
+logger = setup_logger(name="checkpointer")
+
+# AsyncPostgresSaver.setup()创建的、按thread_id存储的表
+CHECKPOINT_TABLES = ["checkpoints", "checkpoint_blobs", "checkpoint_writes"]
+
+
+class GraphCheckpointer:
+    """
+    对话图的检查点
+
+    每个话题一个线程（configurable.thread_id = topic_id），每轮对话结束后保存图状态，
+    下一轮只需读取最新的一个检查点，不再逐条加载历史消息
+    """
+
+    _saver = None
+    _lock: Optional[asyncio.Lock] = None
+    # 初始化失败后不再重试，避免每轮对话都等待连接超时
+    _disabled = False
+
+    @classmethod
+    async def get_saver(cls):
+        """
+        获取AsyncPostgresSaver，首次调用时建表
+
+        Returns:
+            AsyncPostgresSaver，未安装依赖或初始化失败时返回None
+        """
+        if cls._saver is not None or cls._disabled:
+            return cls._saver
+        if AsyncPostgresSaver is None:
+            logger.warning("未安装langgraph-checkpoint-postgres，对话状态从消息表重建")
+            cls._disabled = True
+            return None
+        if cls._lock is None:
+            cls._lock = asyncio.Lock()
+        async with cls._lock:
+            if cls._saver is None and not cls._disabled:
+                try:
+                    saver = AsyncPostgresSaver(await Database.get_checkpoint_pool())
+                    await saver.setup()
+                    cls._saver = saver
+                    logger.info("对话图检查点已启用")
+                except Exception as e:
+                    logger.error(f"初始化对话图检查点失败，对话状态从消息表重建: {str(e)}")
+                    cls._disabled = True
+        return cls._saver
+
+    @staticmethod
+    def thread_config(topic_id: Any, user_id: int) -> Dict[str, Any]:
+        """话题对应的图配置，thread_id取话题ID"""
+        return {
+            "configurable": {
+                "thread_id": str(topic_id),
+                "topic_id": topic_id,
+                "user_id": user_id
+            }
+        }
+
+    @classmethod
+    async def has_checkpoint(cls, graph, config: Dict[str, Any]) -> bool:
+        """话题是否已有检查点，没有时需要用消息表中的历史消息初始化"""
+        snapshot = await graph.aget_state(config)
+        return bool(snapshot and snapshot.values and snapshot.values.get("messages"))
+
+    @classmethod
+    async def delete_thread(cls, topic_id: Any):
+        """删除话题的全部检查点，清除消息后调用，避免下一轮对话从检查点恢复已清除的历史"""
+        saver = await cls.get_saver()
+        if saver is None:
+            return
+        if hasattr(saver, "adelete_thread"):
+            await saver.adelete_thread(str(topic_id))
+        else:
+            # 当前固定的langgraph-checkpoint-postgres版本没有adelete_thread，直接删除检查点表中该线程的行
+            pool = await Database.get_checkpoint_pool()
+            async with pool.connection() as conn:
+                for table in CHECKPOINT_TABLES:
+                    await conn.execute(f"DELETE FROM {table} WHERE thread_id = %s", (str(topic_id),))
+        logger.info(f"已删除话题{topic_id}的对话图检查点")
@@ -12,6 +12,7 @@ import os
 import yaml
 from dotenv import load_dotenv
 from lib.deepseek_chatopenai import DeepseekChatOpenAI
+from graph.candidate_retrieval import retrieve_candidates, format_candidates
 
 # 加载环境变量
 load_dotenv()
@@ -28,6 +29,7 @@ config = load_config()
 class UserInfo(TypedDict):
     province: str
     score: int
+    rank: int | None
     subjects: list[str]
     requirement: str
     
@@ -129,6 +131,9 @@ def recommender(state: State, config: RunnableConfig):
                     "1. 用户分数与院校录取分数线的匹配度\n"
                     "2. 用户科目与专业要求的匹配度\n"
                     "3. 用户需求与院校特点的匹配度\n"
+                    "下面是根据历年录取位次筛选出的候选专业组，录取概率已经计算好，"
+                    "请优先从候选中挑选，直接引用表中的录取概率，不要自行估算：\n"
+                    "{candidates}\n\n"
                     "请给出3-5个推荐选项，每个选项包含院校名称、专业名称、录取概率和推荐理由。\n\n"
                     "历史对话：\n{messages}"
                 )
@@ -138,6 +143,8 @@ def recommender(state: State, config: RunnableConfig):
     )
     
     user_info = state["user_info"]
+    # 先检索候选专业组，让模型基于数据推荐
+    candidates = format_candidates(retrieve_candidates(user_info))
     from lib.chat_openai_reasoning import ChatOpenAIReasoning
     llm = ChatOpenAIReasoning(
         model="DeepSeek-R1",
@@ -150,6 +157,7 @@ def recommender(state: State, config: RunnableConfig):
         "score": user_info["score"],
         "subjects": ", ".join(user_info["subjects"]),
         "requirement": user_info["requirement"],
+        "candidates": candidates,
         "messages": state["messages"]
     })
     
@@ -186,7 +194,13 @@ def chitchat(state: State, config: RunnableConfig):
     state["messages"].append({"role": "assistant", "content": response})
     return state
 
-def getGraph():
+def getGraph(checkpointer=None):
+    """
+    构建对话图
+
+    Args:
+        checkpointer: LangGraph检查点，传入时按configurable.thread_id保存和恢复图状态
+    """
     graph = StateGraph(State)
     
     graph.add_node("requirement_analysis", requirement_analysis)
@@ -213,4 +227,4 @@ def getGraph():
     graph.add_edge("recommender", END)
     
     # 使用streaming=True参数编译图，确保支持异步迭代
-    return graph.compile()
\ No newline at end of file
+    return graph.compile(checkpointer=checkpointer)
\ No newline at end of file
@@ -55,4 +55,8 @@ CREATE TABLE topics (
 );
 
 
+-- 话题列表按用户分页，按更新时间倒序，topic_id作为游标的第二列
+CREATE INDEX idx_topics_user_updated ON topics (user_id, updated_at DESC, topic_id DESC);
 
+-- 按话题查询最后一条消息和消息数
+CREATE INDEX idx_messages_topic_message ON messages (topic_id, message_id DESC);
@@ -4,23 +4,29 @@ from fastapi.responses import FileResponse
 from fastapi.middleware.cors import CORSMiddleware
 import uvicorn
 import os
+import asyncio
 from datetime import datetime
 from contextlib import asynccontextmanager
 
 from utils.logger_utils import setup_logger
 from utils.config_utils import get_jwt_config, get_postgresql_config, get_logging_config, get_clickhouse_config
+from utils.config_utils import get_response_cache_config
 from dao import Database
 from api.auth_api import router as auth_router
 from api.topic_api import router as topic_router
 from api.profile_api import router as profile_router
 from api.specialist_api import router as specialist_router
 from api.speech_api import router as speech_router
+from api.cache_middleware import ResponseCacheMiddleware
+from services.score_conversion import ScoreConversion
+from services.recommendation_engine import RecommendationEngine
 
 # 获取配置
 jwt_config = get_jwt_config()
 postgresql_config = get_postgresql_config()
 logging_config = get_logging_config()
 clickhouse_config = get_clickhouse_config()
+response_cache_config = get_response_cache_config()
 
 # 创建目录
 os.makedirs("logs", exist_ok=True)
@@ -29,24 +35,43 @@ os.makedirs("static", exist_ok=True)
 # 配置日志
 logger = setup_logger(name="qihang_ai")
 
-# @asynccontextmanager
-# async def lifespan(app: FastAPI):
-#     # 启动时执行
-#     logger.info("XXAI服务启动")
-#     await Database.get_pool()
-#     yield
-#     # 关闭时执行
-#     logger.info("XXAI服务关闭")
-#     await Database.close_pool()
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # 启动时执行
+    logger.info("XXAI服务启动")
+    # 加载等位分转换表清单，请求中不再读取磁盘
+    ScoreConversion.load()
+    # 定期刷新推荐引擎的省份快照
+    refresh_task = asyncio.create_task(RecommendationEngine.run_refresh_loop())
+    # await Database.get_pool()
+    yield
+    # 关闭时执行
+    logger.info("XXAI服务关闭")
+    refresh_task.cancel()
+    await Database.close_checkpoint_pool()
+    # await Database.close_pool()
 
 # 创建FastAPI应用
 app = FastAPI(
     title="XXAI服务",
     description="XXAI后端服务API",
     version="1.0.0",
-    # lifespan=lifespan
+    lifespan=lifespan
 )
 
+# 配置只读数据接口的响应缓存，在CORS中间件内层，缓存的响应同样带CORS头
+if response_cache_config.get("enabled", True):
+    app.add_middleware(
+        ResponseCacheMiddleware,
+        prefixes=response_cache_config.get("prefixes", ["/api/data/specialist"]),
+        exclude=response_cache_config.get("exclude", []),
+        ttl=response_cache_config.get("ttl", 3600),
+        max_bytes=response_cache_config.get("max_bytes", 64 * 1024 * 1024),
+        max_entry_bytes=response_cache_config.get("max_entry_bytes", 2 * 1024 * 1024),
+        client_max_age=response_cache_config.get("client_max_age", 60),
+        shared=response_cache_config.get("shared") or None,
+    )
+
 # 配置CORS中间件
 app.add_middleware(
     CORSMiddleware,
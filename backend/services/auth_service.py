@@ -1,6 +1,7 @@
 from typing import Dict, Any, Optional
-import hashlib
 from dao.auth_dao import AuthDAO
+from services.password_hasher import PasswordHasher, needs_rehash
+from services.token_cache import TokenCache
 from services.profile_service import ProfileService
 from utils.logger_utils import setup_logger
 
@@ -25,7 +26,7 @@ class AuthService:
             Dict[str, Any]: 创建的用户信息
         """
         # 对密码进行哈希处理
-        password_hash = AuthService._hash_password(password)
+        password_hash = await PasswordHasher.hash(password)
         user = await AuthDAO.create_user(username, password_hash, email, phone_number)
         
         # 创建用户后自动初始化一个空的用户档案
@@ -85,9 +86,13 @@ class AuthService:
         """
         # 如果包含password字段，需要对密码进行哈希处理
         if 'password' in kwargs:
-            kwargs['password_hash'] = AuthService._hash_password(kwargs.pop('password'))
-        
-        return await AuthDAO.update_user(user_id, **kwargs)
+            kwargs['password_hash'] = await PasswordHasher.hash(kwargs.pop('password'))
+
+        user = await AuthDAO.update_user(user_id, **kwargs)
+        # 修改密码后此前签发的令牌全部失效
+        if user and kwargs.get('password_hash'):
+            TokenCache.revoke_user(user_id)
+        return user
     
     @staticmethod
     async def authenticate(username: str, password: str) -> Optional[Dict[str, Any]]:
@@ -105,34 +110,17 @@ class AuthService:
             return None
         
         # 验证密码
-        if AuthService._verify_password(password, user['password_hash']):
-            # 返回用户信息，但不包含密码哈希
-            user.pop('password_hash', None)
-            return user
-        
-        return None
-    
-    @staticmethod
-    def _hash_password(password: str) -> str:
-        """对密码进行哈希处理
-        
-        Args:
-            password: 密码（明文）
-            
-        Returns:
-            str: 密码哈希
-        """
-        return hashlib.sha256(password.encode()).hexdigest()
-    
-    @staticmethod
-    def _verify_password(password: str, password_hash: str) -> bool:
-        """验证密码
-        
-        Args:
-            password: 密码（明文）
-            password_hash: 密码哈希
-            
-        Returns:
-            bool: 密码是否匹配
-        """
-        return AuthService._hash_password(password) == password_hash 
\ No newline at end of file
+        if not await PasswordHasher.verify(password, user['password_hash']):
+            return None
+
+        # 旧版SHA-256哈希在登录成功后升级为当前算法，失败不影响本次登录
+        if needs_rehash(user['password_hash']):
+            try:
+                await AuthDAO.update_user(user['user_id'], password_hash=await PasswordHasher.hash(password))
+                logger.info(f"已升级用户{user['user_id']}的密码哈希")
+            except Exception as e:
+                logger.error(f"升级用户{user['user_id']}的密码哈希失败: {str(e)}")
+
+        # 返回用户信息，但不包含密码哈希
+        user.pop('password_hash', None)
+        return user
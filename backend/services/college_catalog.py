@@ -0,0 +1,188 @@
+import time
+import asyncio
+import hashlib
+import threading
+from typing import Dict, Any, List, Optional, Set
+from dao.specialist_dao import SpecialistDAO, COLLEGE_LIST_COLUMNS
+from utils.logger_utils import setup_logger
+
+# 配置日志
+logger = setup_logger(name="college_catalog")
+
+# 建立二级索引的字段，数组字段按元素建索引
+INDEXED_FIELDS = ["province_name", "nature_type"]
+INDEXED_ARRAY_FIELDS = ["categories", "features"]
+
+
+class CollegeCatalogSnapshot:
+    """院校表的内存快照，按code索引，并对省份、性质、类别、特色建立倒排索引"""
+
+    def __init__(self, version: Optional[str], records: List[Dict[str, Any]]):
+        """
+        Args:
+            version: 数据版本
+            records: 全部院校记录，按updated_at降序
+        """
+        self.version = version
+        self.etag = '"' + hashlib.md5(str(version).encode("utf-8")).hexdigest() + '"'
+        self.loaded_at = time.time()
+        self.checked_at = self.loaded_at
+        self.records = records
+        self.list_items = [{k: record.get(k) for k in COLLEGE_LIST_COLUMNS} for record in records]
+        self.by_code: Dict[str, int] = {}
+        # {字段: {值: 行号集合}}
+        self.indexes: Dict[str, Dict[Any, Set[int]]] = {field: {} for field in INDEXED_FIELDS + INDEXED_ARRAY_FIELDS}
+        self.lower_names = [(record.get("cn_name") or "").lower() for record in records]
+        for i, record in enumerate(records):
+            # 与LIMIT 1一致，code重复时取第一条
+            self.by_code.setdefault(record.get("code"), i)
+            for field in INDEXED_FIELDS:
+                self.indexes[field].setdefault(record.get(field), set()).add(i)
+            for field in INDEXED_ARRAY_FIELDS:
+                for value in record.get(field) or []:
+                    self.indexes[field].setdefault(value, set()).add(i)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def _lookup(self, field: str, values: List[Any]) -> Set[int]:
+        """取字段值为任一values的行，对数组字段等价于hasAny"""
+        index = self.indexes[field]
+        result: Set[int] = set()
+        for value in values:
+            result |= index.get(value, set())
+        return result
+
+    def filter(
+        self,
+        cn_name: Optional[str] = None,
+        province_name: Optional[List[str]] = None,
+        categories: Optional[List[str]] = None,
+        features: Optional[List[str]] = None,
+        nature_type: Optional[List[str]] = None
+    ) -> List[int]:
+        """
+        按条件筛选，语义与get_college_list的SQL一致
+
+        Returns:
+            满足条件的行号，保持updated_at降序
+        """
+        candidates: Optional[Set[int]] = None
+        for field, values in (
+            ("province_name", province_name),
+            ("nature_type", nature_type),
+            ("categories", categories),
+            ("features", features),
+        ):
+            values = [v for v in values or [] if v]
+            if not values:
+                continue
+            matched = self._lookup(field, values)
+            candidates = matched if candidates is None else candidates & matched
+            if not candidates:
+                return []
+
+        rows = range(len(self)) if candidates is None else sorted(candidates)
+        if cn_name:
+            keyword = cn_name.lower()
+            rows = [i for i in rows if keyword in self.lower_names[i]]
+        return list(rows)
+
+
+class CollegeCatalog:
+    """院校目录缓存，全表常驻内存，列表、筛选和详情都不访问ClickHouse"""
+
+    # 检查数据版本的间隔（秒），版本变化（updated_at或行数变化）时重新加载
+    CHECK_INTERVAL = 300
+
+    _snapshot: Optional[CollegeCatalogSnapshot] = None
+    _lock = threading.Lock()
+    # 检查版本和重新加载的协程锁，同一时间只有一个请求检查或加载，其余请求等待后使用新快照
+    _reload_lock: Optional[asyncio.Lock] = None
+
+    @classmethod
+    async def get_snapshot(cls) -> CollegeCatalogSnapshot:
+        """
+        获取院校目录快照，超过检查间隔时对比数据版本，版本变化时重新加载
+
+        Returns:
+            CollegeCatalogSnapshot
+        """
+        snapshot = cls._snapshot
+        if snapshot is not None and time.time() - snapshot.checked_at < cls.CHECK_INTERVAL:
+            return snapshot
+        if cls._reload_lock is None:
+            cls._reload_lock = asyncio.Lock()
+        async with cls._reload_lock:
+            # 等待期间其他请求可能已经完成检查或加载
+            snapshot = cls._snapshot
+            now = time.time()
+            if snapshot is not None and now - snapshot.checked_at < cls.CHECK_INTERVAL:
+                return snapshot
+            try:
+                version = await SpecialistDAO.get_college_catalog_version()
+            except Exception as e:
+                if snapshot is not None:
+                    logger.warning(f"检查院校目录版本失败，继续使用旧快照: {str(e)}")
+                    snapshot.checked_at = now
+                    return snapshot
+                raise
+            if snapshot is not None and snapshot.version == version:
+                snapshot.checked_at = now
+                return snapshot
+            return await cls.load(version)
+
+    @classmethod
+    async def load(cls, version: Optional[str] = None) -> CollegeCatalogSnapshot:
+        """从ClickHouse加载全部院校并替换快照"""
+        start = time.perf_counter()
+        records = await SpecialistDAO.get_college_catalog()
+        snapshot = CollegeCatalogSnapshot(version, records)
+        with cls._lock:
+            cls._snapshot = snapshot
+        logger.info(f"加载院校目录: 共{len(snapshot)}所院校，版本{version}，耗时{(time.perf_counter() - start) * 1000:.0f}ms")
+        return snapshot
+
+    @classmethod
+    def invalidate(cls):
+        """清除快照，下次访问时重新加载"""
+        with cls._lock:
+            cls._snapshot = None
+
+    @classmethod
+    async def etag(cls) -> str:
+        """当前快照的ETag，数据版本不变时保持不变"""
+        return (await cls.get_snapshot()).etag
+
+    @classmethod
+    async def get_college_list(
+        cls,
+        page: int = 1,
+        page_size: int = 10,
+        cn_name: str = None,
+        province_name: list = None,
+        categories: list = None,
+        features: list = None,
+        nature_type: list = None
+    ) -> Dict[str, Any]:
+        """获取大学列表，返回格式与SpecialistDAO.get_college_list一致"""
+        snapshot = await cls.get_snapshot()
+        rows = snapshot.filter(
+            cn_name=cn_name,
+            province_name=province_name,
+            categories=categories,
+            features=features,
+            nature_type=nature_type
+        )
+        offset = (page - 1) * page_size
+        return {
+            "total": len(rows),
+            "items": [dict(snapshot.list_items[i]) for i in rows[offset:offset + page_size]]
+        }
+
+    @classmethod
+    async def get_college_detail(cls, code: str) -> Dict[str, Any]:
+        """根据code获取院校详情，不存在时返回空字典"""
+        snapshot = await cls.get_snapshot()
+        i = snapshot.by_code.get(code)
+        return dict(snapshot.records[i]) if i is not None else {}
@@ -0,0 +1,89 @@
+import time
+from typing import Dict, Any, List, Optional
+from dao import facet_dao
+from dao.query_builder import cache_key
+from utils.logger_utils import setup_logger
+
+# 配置日志
+logger = setup_logger(name="facet_service")
+
+
+class FacetService:
+    """筛选面板的分面计数，按筛选条件签名（SQL模板+参数）缓存"""
+
+    # 缓存有效期（秒）
+    TTL = 600
+    # 缓存条数上限，超出时淘汰最早写入的条目
+    MAX_ENTRIES = 1000
+
+    # {签名: (写入时间, 结果)}
+    _cache: Dict[str, tuple] = {}
+
+    @classmethod
+    async def _query(cls, sql: str, params: Dict[str, Any], facets) -> Dict[str, Any]:
+        key = cache_key(sql, params)
+        cached = cls._cache.get(key)
+        if cached and time.time() - cached[0] < cls.TTL:
+            return cached[1]
+        start = time.perf_counter()
+        result = await facet_dao.run_facet_query(sql, params, facets)
+        logger.info(f"计算分面计数，耗时{(time.perf_counter() - start) * 1000:.0f}ms")
+        if len(cls._cache) >= cls.MAX_ENTRIES:
+            # dict按插入顺序排列，第一个即最早写入的条目
+            cls._cache.pop(next(iter(cls._cache)))
+        cls._cache[key] = (time.time(), result)
+        return result
+
+    @classmethod
+    def invalidate(cls):
+        """清除全部分面缓存"""
+        cls._cache.clear()
+
+    @classmethod
+    async def get_college_facets(
+        cls,
+        cn_name: Optional[str] = None,
+        province_name: Optional[List[str]] = None,
+        nature_type: Optional[List[str]] = None,
+        categories: Optional[List[str]] = None,
+        features: Optional[List[str]] = None
+    ) -> Dict[str, Any]:
+        """
+        院校筛选面板的分面计数
+
+        Returns:
+            {"total": 满足全部筛选的院校数, "facets": {分面名: [{"value", "count"}]}}
+        """
+        selected = {
+            "province_name": province_name,
+            "nature_type": nature_type,
+            "categories": categories,
+            "features": features,
+        }
+        sql, params = facet_dao.college_facet_query(selected, cn_name=cn_name)
+        return await cls._query(sql, params, facet_dao.COLLEGE_FACETS)
+
+    @classmethod
+    async def get_profession_version_facets(
+        cls,
+        selected: Dict[str, List[Any]],
+        college_name: Optional[str] = None,
+        profession_name: Optional[str] = None,
+        college_code: Optional[str] = None
+    ) -> Dict[str, Any]:
+        """
+        专业版本筛选面板的分面计数
+
+        Args:
+            selected: {分面名: 已选取值列表}，分面名见facet_dao.PROFESSION_VERSION_FACETS
+
+        Returns:
+            {"total": 满足全部筛选的专业数, "facets": {分面名: [{"value", "count"}]}}
+        """
+        sql, params = facet_dao.profession_version_facet_query(
+            selected,
+            college_name=college_name,
+            profession_name=profession_name,
+            college_code=college_code
+        )
+        return await cls._query(sql, params, facet_dao.PROFESSION_VERSION_FACETS)
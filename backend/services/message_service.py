@@ -1,7 +1,14 @@
+import copy
 from typing import Tuple, List, Dict, Any, Optional
 import asyncpg
 from langchain_core.messages import BaseMessage
 from dao.message_dao import ChatHistoryDAO, ChatMessageHistory, MessageDAO
+from graph.checkpointer import GraphCheckpointer
+from services.profile_service import ProfileService
+from utils.logger_utils import setup_logger
+
+# 配置日志
+logger = setup_logger(name="message_service")
 
 class MessageService:
     """消息服务，提供消息和聊天历史相关的业务逻辑"""
@@ -115,7 +122,7 @@ class MessageService:
         return await history.get_messages()
     
     @staticmethod
-    async def stream_process_user_message(user_message: str, topic_id: str, user_info: Dict[str, Any], user_id: int = None):
+    async def stream_process_user_message(user_message: str, topic_id: int, user_info: Dict[str, Any], user_id: int = None):
         """
         以流的方式处理用户消息，返回AI响应的生成器
         
@@ -140,48 +147,99 @@ class MessageService:
         # 从数据库获取聊天历史记录并放入state中
         print("topic_id", topic_id, "user_id", user_id)
         chat_history, connection = await MessageService.get_chat_history(topic_id, user_id)
-        history_messages = await MessageService.get_history_messages(chat_history)
-        # 拼接用户消息
-        history_messages.append({"role": "user", "content": user_message})
-        inputs = {
-            "messages": history_messages,
-            "user_info": user_info,
-            "intent": None
-        }
-        
-        # 确保这里的配置一定包含user_id
-        config = {
-            "configurable": {
-                "topic_id": topic_id,
-                "user_id": user_id  
+        try:
+            # 有检查点时图状态从检查点恢复，否则用消息表中的历史消息初始化
+            saver = await GraphCheckpointer.get_saver()
+            graph = getGraph(checkpointer=saver)
+            config = GraphCheckpointer.thread_config(topic_id, user_id)
+            if saver is not None and await GraphCheckpointer.has_checkpoint(graph, config):
+                messages = [{"role": "user", "content": user_message}]
+            else:
+                messages = await MessageService.get_history_messages(chat_history)
+                messages.append({"role": "user", "content": user_message})
+            # 图中的节点会直接修改user_info，保留一份对话前的副本用于比较
+            loaded_user_info = copy.deepcopy(user_info)
+            # user_info每轮取最新档案，覆盖检查点中的旧值
+            inputs = {
+                "messages": messages,
+                "user_info": user_info,
+                "intent": None
             }
-        }
-        
-        # 获取图谱并调用流式处理
-        graph = getGraph()
-        
-        # 使用流式模式获取结果
-        for msg, metadata in graph.stream(
-            inputs, 
-            config,
-            stream_mode="messages"
-        ):
-            if metadata and metadata.get("langgraph_node") in ["recommender", "chitchat"]:
-                if msg.additional_kwargs and msg.additional_kwargs.get("reasoning_content"):
-                    reasoning_content = msg.additional_kwargs.get("reasoning_content")
-                    if reasoning_content and reasoning_content.strip():
-                        yield f"data: {json.dumps({'content': reasoning_content, 'type': 'reasoning'},ensure_ascii=False)}\n\n" 
-                elif msg.content:
-                    yield f"data: {json.dumps({'content': msg.content, 'type': 'answer'}, ensure_ascii=False)}\n\n"
-        
-        # 释放数据库连接
-        await MessageService.release_connection(connection)
+            
+            # 同时订阅消息流和状态，状态用于对话结束后同步档案
+            final_state = inputs
+            answer_parts = []
+            async for mode, chunk in graph.astream(
+                inputs, 
+                config,
+                stream_mode=["messages", "values"]
+            ):
+                if mode == "values":
+                    final_state = chunk
+                    continue
+                msg, metadata = chunk
+                if metadata and metadata.get("langgraph_node") in ["recommender", "chitchat"]:
+                    if msg.additional_kwargs and msg.additional_kwargs.get("reasoning_content"):
+                        reasoning_content = msg.additional_kwargs.get("reasoning_content")
+                        if reasoning_content and reasoning_content.strip():
+                            yield f"data: {json.dumps({'content': reasoning_content, 'type': 'reasoning'},ensure_ascii=False)}\n\n" 
+                    elif msg.content:
+                        answer_parts.append(msg.content)
+                        yield f"data: {json.dumps({'content': msg.content, 'type': 'answer'}, ensure_ascii=False)}\n\n"
+
+            saved = await MessageService.sync_turn(
+                chat_history,
+                user_message,
+                "".join(answer_parts),
+                loaded_user_info,
+                final_state.get("user_info") or user_info
+            )
+            if not saved:
+                yield f"data: {json.dumps({'content': '本轮对话保存失败，刷新后可能丢失', 'type': 'error'}, ensure_ascii=False)}\n\n"
+        finally:
+            # 释放数据库连接
+            await MessageService.release_connection(connection)
+
+    @staticmethod
+    async def sync_turn(history: ChatMessageHistory, user_message: str, answer: str,
+                        loaded_user_info: Dict[str, Any], final_user_info: Dict[str, Any]) -> bool:
+        """
+        对话结束后的状态同步：在对话持有的连接上用一个事务写入本轮的用户消息和AI回复，
+        以及图中修改过的档案字段（如requirement_analysis更新的需求）
+
+        Args:
+            history: 聊天历史对象，提供话题、用户和连接
+            user_message: 用户消息
+            answer: AI回复
+            loaded_user_info: 对话前从档案加载的user_info
+            final_user_info: 图执行结束时的user_info
+
+        Returns:
+            是否保存成功，失败时已记录日志，由调用方通知前端
+        """
+        messages = [("user", user_message)]
+        if answer.strip():
+            messages.append(("ai", answer))
+        changes = ProfileService.diff_user_info(loaded_user_info, final_user_info)
+        try:
+            profile = await ChatHistoryDAO.save_turn(
+                history.connection, history.topic_id, history.user_id, messages, changes
+            )
+        except Exception as e:
+            logger.error(f"保存话题{history.topic_id}的对话失败: {str(e)}")
+            return False
+        if profile:
+            ProfileService.update_cache(history.user_id, profile)
+            logger.info(f"已同步用户(ID:{history.user_id})档案字段: {list(changes.keys())}")
+        return True
     
     @staticmethod
     async def clear_history(history: ChatMessageHistory) -> None:
-        """清除聊天历史
+        """清除聊天历史，同时删除话题的对话图检查点
         
         Args:
             history: 聊天历史对象
         """
-        await history.clear() 
\ No newline at end of file
+        await history.clear()
+        if history.topic_id:
+            await GraphCheckpointer.delete_thread(history.topic_id) 
\ No newline at end of file
@@ -0,0 +1,99 @@
+import time
+from typing import Dict, Any, List, Optional
+from dao.profession_dao import ProfessionDAO
+from services.college_catalog import CollegeCatalog
+from utils.search_utils import NameSearchIndex
+from utils.logger_utils import setup_logger
+
+# 配置日志
+logger = setup_logger(name="name_search")
+
+SEARCH_COLLEGE = "college"
+SEARCH_PROFESSION = "profession"
+SEARCH_TYPES = [SEARCH_COLLEGE, SEARCH_PROFESSION]
+
+
+class NameSearch:
+    """院校和专业名称检索，索引常驻内存，院校索引随院校目录版本重建"""
+
+    # 专业索引的刷新周期（秒）
+    PROFESSION_REFRESH_INTERVAL = 6 * 3600
+
+    # {类型: (数据版本或加载时间, NameSearchIndex)}
+    _indexes: Dict[str, tuple] = {}
+
+    @classmethod
+    async def get_college_index(cls) -> NameSearchIndex:
+        """获取院校名称索引，院校目录版本变化时重建"""
+        snapshot = await CollegeCatalog.get_snapshot()
+        cached = cls._indexes.get(SEARCH_COLLEGE)
+        if cached and cached[0] == snapshot.version:
+            return cached[1]
+        start = time.perf_counter()
+        index = NameSearchIndex(
+            (
+                {
+                    "type": SEARCH_COLLEGE,
+                    "code": record.get("code"),
+                    "name": record.get("cn_name"),
+                    "short_name": record.get("short_name"),
+                    "province_name": record.get("province_name"),
+                }
+                for record in snapshot.records
+            ),
+            aliases_field="short_name"
+        )
+        cls._indexes[SEARCH_COLLEGE] = (snapshot.version, index)
+        logger.info(f"构建院校名称索引: 共{len(index)}条，耗时{(time.perf_counter() - start) * 1000:.0f}ms")
+        return index
+
+    @classmethod
+    async def get_profession_index(cls) -> NameSearchIndex:
+        """获取专业名称索引，超过刷新周期时重建"""
+        cached = cls._indexes.get(SEARCH_PROFESSION)
+        if cached and time.time() - cached[0] < cls.PROFESSION_REFRESH_INTERVAL:
+            return cached[1]
+        start = time.perf_counter()
+        rows = await ProfessionDAO.get_profession_names()
+        index = NameSearchIndex(
+            {
+                "type": SEARCH_PROFESSION,
+                "code": row.get("profession_code"),
+                "name": row.get("profession_name"),
+                "profession_category": row.get("profession_category"),
+            }
+            for row in rows
+        )
+        cls._indexes[SEARCH_PROFESSION] = (time.time(), index)
+        logger.info(f"构建专业名称索引: 共{len(index)}条，耗时{(time.perf_counter() - start) * 1000:.0f}ms")
+        return index
+
+    @classmethod
+    def invalidate(cls, search_type: Optional[str] = None):
+        """清除索引，search_type为None时清除全部"""
+        if search_type is None:
+            cls._indexes.clear()
+        else:
+            cls._indexes.pop(search_type, None)
+
+    @classmethod
+    async def suggest(cls, query: str, search_type: Optional[str] = None, limit: int = 10) -> List[Dict[str, Any]]:
+        """
+        名称联想
+
+        Args:
+            query: 检索词，支持汉字、简称、全拼和拼音首字母
+            search_type: college或profession，None表示都检索
+            limit: 返回条数
+
+        Returns:
+            条目列表，院校包含code、name、short_name、province_name，专业包含code、name、profession_category
+        """
+        types = [search_type] if search_type else SEARCH_TYPES
+        matches = []
+        for t in types:
+            index = await (cls.get_college_index() if t == SEARCH_COLLEGE else cls.get_profession_index())
+            matches += index.search(query, limit)
+        if len(types) > 1:
+            matches.sort(key=lambda m: (m[0], len(m[1]["name"])))
+        return [dict(entry) for _, entry in matches[:limit]]
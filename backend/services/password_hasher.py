@@ -0,0 +1,125 @@
+import os
+import hmac
+import base64
+import asyncio
+import hashlib
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+from utils.logger_utils import setup_logger
+
+# 配置日志
+logger = setup_logger(name="password_hasher")
+
+# scrypt参数：约16MB内存，单次哈希几十毫秒
+SCRYPT_N = 2 ** 14
+SCRYPT_R = 8
+SCRYPT_P = 1
+# OpenSSL不支持scrypt时改用PBKDF2
+PBKDF2_ITERATIONS = 600000
+SALT_BYTES = 16
+KEY_BYTES = 32
+
+
+def _b64encode(data: bytes) -> str:
+    return base64.b64encode(data).decode("ascii").rstrip("=")
+
+
+def _b64decode(text: str) -> bytes:
+    return base64.b64decode(text + "=" * (-len(text) % 4))
+
+
+def _scrypt(password: str, salt: bytes, n: int, r: int, p: int) -> bytes:
+    return hashlib.scrypt(password.encode("utf-8"), salt=salt, n=n, r=r, p=p,
+                          maxmem=256 * n * r * p, dklen=KEY_BYTES)
+
+
+def _pbkdf2(password: str, salt: bytes, iterations: int) -> bytes:
+    return hashlib.pbkdf2_hmac("sha256", password.encode("utf-8"), salt, iterations, dklen=KEY_BYTES)
+
+
+def hash_password(password: str) -> str:
+    """
+    计算密码哈希，同步执行，会占用CPU几十毫秒
+
+    Returns:
+        "scrypt$n$r$p$盐$哈希"，或"pbkdf2_sha256$迭代次数$盐$哈希"
+    """
+    salt = os.urandom(SALT_BYTES)
+    if hasattr(hashlib, "scrypt"):
+        key = _scrypt(password, salt, SCRYPT_N, SCRYPT_R, SCRYPT_P)
+        return f"scrypt${SCRYPT_N}${SCRYPT_R}${SCRYPT_P}${_b64encode(salt)}${_b64encode(key)}"
+    key = _pbkdf2(password, salt, PBKDF2_ITERATIONS)
+    return f"pbkdf2_sha256${PBKDF2_ITERATIONS}${_b64encode(salt)}${_b64encode(key)}"
+
+
+def verify_password(password: str, password_hash: str) -> bool:
+    """
+    校验密码，支持scrypt、PBKDF2和旧版无盐SHA-256十六进制哈希
+
+    Returns:
+        密码是否匹配，哈希格式无法识别时返回False
+    """
+    try:
+        parts = password_hash.split("$")
+        if parts[0] == "scrypt" and len(parts) == 6:
+            n, r, p = int(parts[1]), int(parts[2]), int(parts[3])
+            key = _scrypt(password, _b64decode(parts[4]), n, r, p)
+            return hmac.compare_digest(key, _b64decode(parts[5]))
+        if parts[0] == "pbkdf2_sha256" and len(parts) == 4:
+            key = _pbkdf2(password, _b64decode(parts[2]), int(parts[1]))
+            return hmac.compare_digest(key, _b64decode(parts[3]))
+        if is_legacy_hash(password_hash):
+            legacy = hashlib.sha256(password.encode()).hexdigest()
+            return hmac.compare_digest(legacy, password_hash.lower())
+    except (ValueError, TypeError) as e:
+        logger.warning(f"密码哈希格式错误: {str(e)}")
+    return False
+
+
+def is_legacy_hash(password_hash: str) -> bool:
+    """是否为旧版无盐SHA-256哈希"""
+    return len(password_hash) == 64 and all(c in "0123456789abcdefABCDEF" for c in password_hash)
+
+
+def needs_rehash(password_hash: str) -> bool:
+    """哈希是否需要按当前算法和参数重新计算：旧版SHA-256，或参数低于当前设置"""
+    parts = password_hash.split("$")
+    if hasattr(hashlib, "scrypt"):
+        return parts[:4] != ["scrypt", str(SCRYPT_N), str(SCRYPT_R), str(SCRYPT_P)]
+    return parts[:2] != ["pbkdf2_sha256", str(PBKDF2_ITERATIONS)]
+
+
+class PasswordHasher:
+    """
+    密码哈希服务
+
+    KDF在有界线程池中执行，hashlib的scrypt和PBKDF2计算期间释放GIL，
+    并发登录只占用线程池，不会阻塞事件循环上的流式对话
+    """
+
+    MAX_WORKERS = min(4, os.cpu_count() or 1)
+    _executor: Optional[ThreadPoolExecutor] = None
+
+    @classmethod
+    def get_executor(cls) -> ThreadPoolExecutor:
+        if cls._executor is None:
+            cls._executor = ThreadPoolExecutor(max_workers=cls.MAX_WORKERS, thread_name_prefix="password-kdf")
+        return cls._executor
+
+    @classmethod
+    async def hash(cls, password: str) -> str:
+        """在线程池中计算密码哈希"""
+        return await asyncio.get_running_loop().run_in_executor(cls.get_executor(), hash_password, password)
+
+    @classmethod
+    async def verify(cls, password: str, password_hash: str) -> bool:
+        """在线程池中校验密码"""
+        return await asyncio.get_running_loop().run_in_executor(
+            cls.get_executor(), verify_password, password, password_hash
+        )
+
+    @classmethod
+    def shutdown(cls):
+        if cls._executor is not None:
+            cls._executor.shutdown(wait=False)
+            cls._executor = None
@@ -28,7 +28,11 @@ class ProfessionService:
             
         Returns:
             Dict包含分页信息和数据列表
+            
+        Raises:
+            ValueError: 排序字段不允许排序
         """
+        ProfessionDAO.SORT.validate(sort_by)
         try:
             # 参数验证
             if page < 1:
@@ -1,12 +1,88 @@
-from typing import Dict, Any, List, Optional
+import time
+import threading
+from collections import OrderedDict
+from typing import Dict, Any, List, Optional, Tuple
 from dao.profile_dao import ProfileDAO
 from utils.logger_utils import setup_logger
 
 # 配置日志
 logger = setup_logger(name="profile_service")
 
+# 对话状态中的user_info字段与档案列的对应关系，对话结束后按此同步回档案；
+# rank为按分数换算的等效位次，不写回
+USER_INFO_PROFILE_FIELDS = {
+    "province": "province",
+    "score": "score",
+    "subjects": "subject_choice",
+    "requirement": "requirement",
+}
+
 class ProfileService:
-    """用户档案服务，提供用户档案相关的业务逻辑"""
+    """
+    用户档案服务，提供用户档案相关的业务逻辑
+
+    档案按用户缓存在进程内，对话每一轮读取档案不再访问数据库；
+    经本服务的创建和更新直接写入缓存，其他进程或直接改库的修改最迟在CACHE_TTL后生效
+    """
+
+    CACHE_TTL = 300
+    MAX_ENTRIES = 10000
+    # {用户ID: (加载时间, 档案)}
+    _cache: "OrderedDict[int, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+    _lock = threading.Lock()
+
+    @classmethod
+    def _cache_get(cls, user_id: int) -> Optional[Dict[str, Any]]:
+        with cls._lock:
+            entry = cls._cache.get(user_id)
+            if entry is None:
+                return None
+            if time.time() - entry[0] >= cls.CACHE_TTL:
+                del cls._cache[user_id]
+                return None
+            cls._cache.move_to_end(user_id)
+            # 返回副本，调用方修改不影响缓存
+            return dict(entry[1])
+
+    @classmethod
+    def _cache_put(cls, user_id: int, profile: Optional[Dict[str, Any]]):
+        with cls._lock:
+            if profile is None:
+                cls._cache.pop(user_id, None)
+                return
+            cls._cache[user_id] = (time.time(), dict(profile))
+            cls._cache.move_to_end(user_id)
+            while len(cls._cache) > cls.MAX_ENTRIES:
+                cls._cache.popitem(last=False)
+
+    @classmethod
+    def update_cache(cls, user_id: int, profile: Dict[str, Any]):
+        """写入在其他事务中更新后的档案"""
+        cls._cache_put(user_id, profile)
+
+    @staticmethod
+    def diff_user_info(before: Dict[str, Any], after: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        比较对话前后的user_info
+
+        Returns:
+            {档案列: 新值}，只包含发生变化且不为空的字段
+        """
+        changes = {}
+        for field, column in USER_INFO_PROFILE_FIELDS.items():
+            value = after.get(field)
+            if value is not None and value != before.get(field):
+                changes[column] = value
+        return changes
+
+    @classmethod
+    def invalidate(cls, user_id: Optional[int] = None):
+        """清除档案缓存，user_id为None时清除全部"""
+        with cls._lock:
+            if user_id is None:
+                cls._cache.clear()
+            else:
+                cls._cache.pop(user_id, None)
     
     @staticmethod
     async def create_profile(user_id: int, gender: str = 'other', province: Optional[str] = None,
@@ -34,6 +110,7 @@ class ProfileService:
                 user_id, gender, province, exam_year, subject_choice, score, rank, batch
             )
             logger.info(f"用户(ID:{user_id})档案创建成功")
+            ProfileService._cache_put(user_id, profile)
             return profile
         except ValueError as e:
             logger.error(f"创建用户(ID:{user_id})档案失败: {str(e)}")
@@ -49,10 +126,13 @@ class ProfileService:
         Returns:
             Optional[Dict[str, Any]]: 用户档案信息，如果档案不存在则返回None
         """
-        logger.info(f"获取用户(ID:{user_id})档案")
+        profile = ProfileService._cache_get(user_id)
+        if profile is not None:
+            return profile
+        logger.debug(f"从数据库加载用户(ID:{user_id})档案")
         profile = await ProfileDAO.get_profile(user_id)
         if profile:
-            logger.info(f"成功获取用户(ID:{user_id})档案")
+            ProfileService._cache_put(user_id, profile)
         else:
             logger.warning(f"未找到用户(ID:{user_id})档案")
         return profile
@@ -68,8 +148,9 @@ class ProfileService:
         Returns:
             Optional[Dict[str, Any]]: 更新后的用户档案信息，如果档案不存在则返回None
         """
-        logger.info(f"更新用户(ID:{user_id})档案: {kwargs}")
+        logger.info(f"更新用户(ID:{user_id})档案字段: {list(kwargs.keys())}")
         profile = await ProfileDAO.update_profile(user_id, **kwargs)
+        ProfileService._cache_put(user_id, profile)
         if profile:
             logger.info(f"用户(ID:{user_id})档案更新成功")
         else:
@@ -91,6 +172,7 @@ class ProfileService:
         # 由于ProfileDAO.update_profile不直接支持更新requirement字段，需要扩展DAO方法
         # 这里假设ProfileDAO.update_profile已经支持更新requirement字段
         profile = await ProfileDAO.update_profile(user_id, requirement=requirement)
+        ProfileService._cache_put(user_id, profile)
         if profile:
             logger.info(f"用户(ID:{user_id})需求更新成功")
         else:
@@ -0,0 +1,335 @@
+import time
+import asyncio
+import threading
+import warnings
+from typing import Dict, Any, List, Optional
+import numpy as np
+from dao.specialist_recommendation_dao import get_profession_group_snapshot
+from utils.logger_utils import setup_logger
+from utils.subject_utils import encode_subjects, normalize_subject
+
+# 配置日志
+logger = setup_logger(name="recommendation_engine")
+
+# 位次窗口：与get_recommendation_groups的HAVING条件一致
+RANK_WINDOW_BELOW = 2000
+RANK_WINDOW_ABOVE = 10000
+
+# 加载为数值列的字段
+NUMERIC_COLUMNS = [
+    "last_1_year_min_rank",
+    "last_1_year_min_score",
+    "last_2_year_min_rank",
+    "last_2_year_min_score",
+    "last_3_year_min_rank",
+    "last_3_year_min_score",
+]
+
+
+# 近三年最低位次的权重，越近的年份权重越高
+YEAR_WEIGHTS = np.array([0.5, 0.3, 0.2])
+# 近两年位次变化趋势计入预测的比例
+TREND_WEIGHT = 0.5
+# 位次波动的下限，按预测位次的比例计算，避免只有一年数据时过于确定
+MIN_VOLATILITY_RATIO = 0.1
+# 冲/稳/保的录取概率分界
+TIER_REACH = "冲"
+TIER_MATCH = "稳"
+TIER_SAFE = "保"
+REACH_MIN_PROBABILITY = 0.05
+MATCH_MIN_PROBABILITY = 0.4
+SAFE_MIN_PROBABILITY = 0.8
+# 稳档优先推荐的概率中心
+MATCH_TARGET_PROBABILITY = 0.6
+
+
+def _to_float(value) -> float:
+    return float(value) if value is not None else np.nan
+
+
+def admission_probability(history_ranks: np.ndarray, rank: int) -> np.ndarray:
+    """
+    根据近三年最低录取位次估算录取概率
+
+    以近三年最低位次的加权平均加上近两年的变化趋势作为今年最低位次的预测值，
+    以历年位次的标准差作为波动，考生位次不大于最低位次即可录取，
+    概率用正态分布函数的logistic近似计算。
+
+    Args:
+        history_ranks: 形状为(专业组数, 3)的数组，依次为近1、2、3年最低位次，缺失为NaN
+        rank: 考生位次
+
+    Returns:
+        各专业组的录取概率，没有任何历史位次的为NaN
+    """
+    available = ~np.isnan(history_ranks)
+    weights = np.where(available, YEAR_WEIGHTS, 0.0)
+    weight_sum = weights.sum(axis=1)
+    with np.errstate(invalid="ignore", divide="ignore"), warnings.catch_warnings():
+        # 全部缺失的行会触发nanstd的自由度警告，这些行最终置为NaN
+        warnings.simplefilter("ignore", RuntimeWarning)
+        expected = np.nansum(history_ranks * YEAR_WEIGHTS, axis=1) / weight_sum
+        trend = np.where(available[:, 0] & available[:, 1], history_ranks[:, 0] - history_ranks[:, 1], 0.0)
+        predicted = expected + TREND_WEIGHT * trend
+        volatility = np.where(available.sum(axis=1) > 1, np.nanstd(history_ranks, axis=1), 0.0)
+    volatility = np.maximum(volatility, np.abs(predicted) * MIN_VOLATILITY_RATIO) + 1.0
+    z = (predicted - rank) / volatility
+    probability = 1.0 / (1.0 + np.exp(-1.702 * z))
+    probability[weight_sum == 0] = np.nan
+    return probability
+
+
+def top_k(keys: np.ndarray, k: int) -> np.ndarray:
+    """
+    取keys最小的k个下标并按keys升序排列，使用argpartition避免全量排序
+
+    Returns:
+        下标数组
+    """
+    if len(keys) <= k:
+        return np.argsort(keys, kind="stable")
+    part = np.argpartition(keys, k - 1)[:k]
+    return part[np.argsort(keys[part], kind="stable")]
+
+
+class ProfessionGroupSnapshot:
+    """单个省份的专业组聚合快照，数值字段按列存为NumPy数组，原始行用于输出"""
+
+    def __init__(self, province_name: str, rows: List[Dict[str, Any]]):
+        """
+        Args:
+            province_name: 省份名称
+            rows: get_profession_group_snapshot返回的聚合行
+        """
+        self.province_name = province_name
+        self.loaded_at = time.time()
+        self.subject_sets = [frozenset(row.pop("subject_requirements_clean", None) or []) for row in rows]
+        # 选科要求位掩码，筛选时一次按位与即可完成
+        self.subject_masks = np.array(
+            [encode_subjects(subjects, strict=False) for subjects in self.subject_sets], dtype=np.uint16
+        )
+        # 含有位掩码无法表示的科目（如技术）的行，判断能否报考时按集合逐行判断：{行下标: 规范化后的科目集合}
+        self.unencodable_subjects = {
+            i: frozenset(normalize_subject(s) for s in subjects)
+            for i, subjects in enumerate(self.subject_sets)
+            if encode_subjects(subjects) is None
+        }
+        self.rows = rows
+        self.columns: Dict[str, np.ndarray] = {
+            name: np.array([_to_float(row.get(name)) for row in rows], dtype=np.float64)
+            for name in NUMERIC_COLUMNS
+        }
+
+    def __len__(self) -> int:
+        return len(self.rows)
+
+    def rank_mask(self, rank: int) -> np.ndarray:
+        """last_2_year_min_rank落在[rank - 2000, rank + 10000]内的专业组"""
+        ranks = self.columns["last_2_year_min_rank"]
+        # NaN参与比较结果为False，与SQL中NULL不满足BETWEEN一致
+        return (ranks >= rank - RANK_WINDOW_BELOW) & (ranks <= rank + RANK_WINDOW_ABOVE)
+
+    def subject_mask(self, subjects: List[str]) -> np.ndarray:
+        """选科要求包含全部指定科目的专业组，等价于hasAll(subject_requirements_clean, subjects)"""
+        required_mask = encode_subjects(subjects)
+        if required_mask is None:
+            # 含有位掩码无法表示的科目时按集合逐行判断
+            required = frozenset(subjects)
+            return np.fromiter((required <= s for s in self.subject_sets), dtype=bool, count=len(self))
+        required_mask = np.uint16(required_mask)
+        return (self.subject_masks & required_mask) == required_mask
+
+    def eligible_mask(self, subjects: List[str]) -> np.ndarray:
+        """考生选科满足选科要求的专业组，即选科要求是考生选科的子集"""
+        chosen_mask = np.uint16(encode_subjects(subjects, strict=False))
+        mask = (self.subject_masks & ~chosen_mask) == 0
+        if self.unencodable_subjects:
+            chosen = frozenset(normalize_subject(s) for s in subjects)
+            for i, required in self.unencodable_subjects.items():
+                mask[i] = required <= chosen
+        return mask
+
+    def history_ranks(self, indices: np.ndarray) -> np.ndarray:
+        """取指定行近1、2、3年的最低位次，形状为(行数, 3)"""
+        return np.stack([
+            self.columns["last_1_year_min_rank"][indices],
+            self.columns["last_2_year_min_rank"][indices],
+            self.columns["last_3_year_min_rank"][indices],
+        ], axis=1)
+
+    def select(self, rank: Optional[int] = None, subjects: Optional[List[str]] = None,
+               eligible_subjects: Optional[List[str]] = None) -> np.ndarray:
+        """
+        按位次和选科筛选
+
+        Args:
+            rank: 考生位次，按位次窗口筛选
+            subjects: 选科要求需包含的科目（hasAll语义）
+            eligible_subjects: 考生选科，只保留考生可以报考的专业组
+
+        Returns:
+            满足条件的行下标
+        """
+        mask = np.ones(len(self), dtype=bool)
+        if rank is not None:
+            mask &= self.rank_mask(rank)
+        if subjects:
+            mask &= self.subject_mask(subjects)
+        if eligible_subjects:
+            mask &= self.eligible_mask(eligible_subjects)
+        return np.flatnonzero(mask)
+
+
+class RecommendationEngine:
+    """
+    进程内专业组推荐引擎，按省份加载快照，查询不访问ClickHouse
+
+    省份快照在首次查询时加载；服务启动时创建的后台任务(run_refresh_loop)定期在线程池中刷新
+    已加载的快照，查询一般不会遇到过期快照。快照加载是同步查询，调用方需在线程池中调用
+    get_snapshot/recommend，不能在事件循环中直接调用。
+    """
+
+    # 快照刷新周期（秒）
+    REFRESH_INTERVAL = 6 * 3600
+
+    _snapshots: Dict[str, ProfessionGroupSnapshot] = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def get_snapshot(cls, province_name: str) -> ProfessionGroupSnapshot:
+        """
+        获取省份快照，不存在或超过刷新周期时重新加载
+
+        Args:
+            province_name: 省份名称
+
+        Returns:
+            ProfessionGroupSnapshot
+        """
+        snapshot = cls._snapshots.get(province_name)
+        if snapshot and time.time() - snapshot.loaded_at < cls.REFRESH_INTERVAL:
+            return snapshot
+        with cls._lock:
+            # 其他线程可能已经完成加载
+            snapshot = cls._snapshots.get(province_name)
+            if snapshot and time.time() - snapshot.loaded_at < cls.REFRESH_INTERVAL:
+                return snapshot
+            return cls.refresh(province_name)
+
+    @classmethod
+    def refresh(cls, province_name: str) -> ProfessionGroupSnapshot:
+        """从ClickHouse重新加载省份快照，加载失败时保留旧快照"""
+        start = time.perf_counter()
+        try:
+            rows = get_profession_group_snapshot(province_name)
+        except Exception as e:
+            old = cls._snapshots.get(province_name)
+            if old is not None:
+                logger.error(f"刷新专业组快照失败，继续使用旧快照: {province_name}, {str(e)}")
+                return old
+            raise
+        snapshot = ProfessionGroupSnapshot(province_name, rows)
+        cls._snapshots[province_name] = snapshot
+        logger.info(f"加载专业组快照: {province_name}，共{len(snapshot)}个专业组，耗时{(time.perf_counter() - start) * 1000:.0f}ms")
+        return snapshot
+
+    @classmethod
+    def refresh_all(cls):
+        """刷新全部已加载的省份快照，由run_refresh_loop定期调用"""
+        for province_name in list(cls._snapshots.keys()):
+            try:
+                cls.refresh(province_name)
+            except Exception as e:
+                logger.error(f"刷新专业组快照失败: {province_name}, {str(e)}")
+
+    @classmethod
+    async def run_refresh_loop(cls):
+        """
+        后台定期刷新快照，由服务启动时创建任务，关闭时取消
+
+        刷新间隔为刷新周期的一半，快照在过期前就已更新；加载在线程池中执行，不阻塞事件循环。
+        """
+        while True:
+            await asyncio.sleep(cls.REFRESH_INTERVAL / 2)
+            await asyncio.to_thread(cls.refresh_all)
+
+    @classmethod
+    def invalidate(cls, province_name: Optional[str] = None):
+        """清除快照，province_name为None时清除全部"""
+        if province_name is None:
+            cls._snapshots.clear()
+        else:
+            cls._snapshots.pop(province_name, None)
+
+    @classmethod
+    def recommend(
+        cls,
+        province_name: str,
+        rank: Optional[int] = None,
+        subjects: Optional[List[str]] = None,
+        limit: int = 1000
+    ) -> List[Dict[str, Any]]:
+        """
+        在内存中查询推荐专业组，结果与get_recommendation_groups一致
+
+        Args:
+            province_name: 省份名称
+            rank: 考生位次
+            subjects: 选科
+            limit: 返回条数上限
+
+        Returns:
+            专业组列表
+        """
+        snapshot = cls.get_snapshot(province_name)
+        indices = snapshot.select(rank=rank, subjects=subjects)[:limit]
+        return [dict(snapshot.rows[i]) for i in indices]
+
+    @classmethod
+    def recommend_tiered(
+        cls,
+        province_name: str,
+        rank: int,
+        subjects: Optional[List[str]] = None,
+        k: int = 10,
+        eligible_subjects: Optional[List[str]] = None
+    ) -> Dict[str, List[Dict[str, Any]]]:
+        """
+        按录取概率分为冲/稳/保三档，每档返回前k个专业组
+
+        - 冲：录取概率在[5%, 40%)，概率高的优先
+        - 稳：录取概率在[40%, 80%)，越接近60%越优先
+        - 保：录取概率不低于80%，概率低（院校层次高）的优先
+
+        Args:
+            province_name: 省份名称
+            rank: 考生位次
+            subjects: 选科要求需包含的科目（hasAll语义）
+            k: 每档返回条数
+            eligible_subjects: 考生选科，只保留考生可以报考的专业组
+
+        Returns:
+            {"冲": [...], "稳": [...], "保": [...]}，每个专业组附带admission_probability和tier
+        """
+        snapshot = cls.get_snapshot(province_name)
+        indices = snapshot.select(subjects=subjects, eligible_subjects=eligible_subjects)
+        probability = admission_probability(snapshot.history_ranks(indices), rank)
+
+        tiers = {
+            TIER_REACH: ((probability >= REACH_MIN_PROBABILITY) & (probability < MATCH_MIN_PROBABILITY), -probability),
+            TIER_MATCH: ((probability >= MATCH_MIN_PROBABILITY) & (probability < SAFE_MIN_PROBABILITY),
+                         np.abs(probability - MATCH_TARGET_PROBABILITY)),
+            TIER_SAFE: (probability >= SAFE_MIN_PROBABILITY, probability),
+        }
+        result = {}
+        for tier, (mask, keys) in tiers.items():
+            candidates = np.flatnonzero(mask)
+            chosen = candidates[top_k(keys[candidates], k)]
+            groups = []
+            for i in chosen:
+                group = dict(snapshot.rows[indices[i]])
+                group["admission_probability"] = round(float(probability[i]), 3)
+                group["tier"] = tier
+                groups.append(group)
+            result[tier] = groups
+        return result
@@ -0,0 +1,211 @@
+import os
+import json
+from datetime import datetime
+from typing import Dict, Any, List, Optional, Tuple
+import numpy as np
+from dao.specialist_dao import SpecialistDAO
+from services.score_rank_index import ScoreRankIndex, ScoreRankTable
+from utils.logger_utils import setup_logger
+
+# 配置日志
+logger = setup_logger(name="score_conversion")
+
+# 转换表目录，可通过环境变量覆盖；相对路径以backend目录为基准，与启动时的工作目录无关
+BACKEND_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_DIR = os.path.join(BACKEND_DIR, os.environ.get("SCORE_CONVERSION_DIR", os.path.join("data", "score_conversion")))
+MANIFEST_FILE = "manifest.json"
+
+
+def build_rank_matrix(tables: List[ScoreRankTable], score_min: int, score_max: int) -> np.ndarray:
+    """
+    计算整数分数网格上各年份的等效位次
+
+    Returns:
+        形状为(年份数, 分数个数)的int32数组，ranks[i, s]为第i个年份score_min + s分对应的位次
+    """
+    grid = np.arange(score_min, score_max + 1, dtype=np.float64)
+    return np.stack([table.ranks(grid) for table in tables]).astype(np.int32)
+
+
+def build_conversion_matrix(ranks: np.ndarray, score_min: int) -> np.ndarray:
+    """
+    由位次矩阵计算跨年份的等位分转换表
+
+    年份X的分数s先换算为位次r，再在年份Y中取位次不差于r的最低分数。
+    分数越高位次越小，因此位次在分数网格上单调不增，可以用二分查找。
+
+    Args:
+        ranks: build_rank_matrix的结果
+        score_min: 分数网格起点
+
+    Returns:
+        形状为(年份数, 年份数, 分数个数)的int16数组，conv[x, y, s]为年份x的score_min + s分在年份y的等位分
+    """
+    n_years, n_scores = ranks.shape
+    conv = np.empty((n_years, n_years, n_scores), dtype=np.int16)
+    for y in range(n_years):
+        # 取负后单调不减，满足searchsorted的要求
+        negated = -ranks[y]
+        for x in range(n_years):
+            idx = np.searchsorted(negated, -ranks[x], side="left")
+            conv[x, y] = score_min + np.minimum(idx, n_scores - 1)
+    return conv
+
+
+def _file_prefix(province_name: str, batch: str) -> str:
+    return f"{province_name}_{batch}"
+
+
+async def build_conversion_tables(output_dir: str = DATA_DIR, years: Optional[List[int]] = None) -> Dict[str, Any]:
+    """
+    从dwd_youzy_score_rank_chunk预计算全部(省份, 批次)的等位分转换表并写入磁盘
+
+    每个(省份, 批次)生成两个.npy文件：
+    - {省份}_{批次}.rank.npy: 位次矩阵，int32，(年份数, 分数个数)
+    - {省份}_{批次}.conv.npy: 转换矩阵，int16，(年份数, 年份数, 分数个数)
+    manifest.json记录每组文件对应的年份和分数网格。
+
+    Args:
+        output_dir: 输出目录
+        years: 只使用指定年份，None表示全部年份
+
+    Returns:
+        manifest内容
+    """
+    os.makedirs(output_dir, exist_ok=True)
+    groups: Dict[Tuple[str, str], List[int]] = {}
+    for row in await SpecialistDAO.get_score_rank_keys():
+        if years and row["year"] not in years:
+            continue
+        groups.setdefault((row["province_name"], row["batch"]), []).append(int(row["year"]))
+
+    manifest = {"built_at": datetime.now().isoformat(), "tables": {}}
+    for (province_name, batch), group_years in groups.items():
+        tables = []
+        for year in sorted(set(group_years)):
+            table = await ScoreRankIndex.load(province_name, year, batch)
+            if table is not None:
+                tables.append(table)
+        if not tables:
+            continue
+
+        score_min = int(np.floor(min(t.min_scores[0] for t in tables)))
+        score_max = int(np.ceil(max(t.max_scores[-1] for t in tables)))
+        ranks = build_rank_matrix(tables, score_min, score_max)
+        conv = build_conversion_matrix(ranks, score_min)
+
+        prefix = _file_prefix(province_name, batch)
+        np.save(os.path.join(output_dir, f"{prefix}.rank.npy"), ranks)
+        np.save(os.path.join(output_dir, f"{prefix}.conv.npy"), conv)
+        manifest["tables"][f"{province_name}|{batch}"] = {
+            "prefix": prefix,
+            "years": [t.year for t in tables],
+            "score_min": score_min,
+            "score_max": score_max
+        }
+        logger.info(f"生成等位分转换表: {province_name} {batch}，年份{[t.year for t in tables]}，分数{score_min}-{score_max}")
+
+    with open(os.path.join(output_dir, MANIFEST_FILE), "w", encoding="utf-8") as f:
+        json.dump(manifest, f, ensure_ascii=False, indent=2)
+    return manifest
+
+
+class ScoreConversion:
+    """
+    等位分转换表，以内存映射方式加载预计算的.npy文件，查询不访问ClickHouse
+
+    服务启动时加载清单。只有等位分查询接口使用转换表，推荐流程仍按位次计算，不使用转换表。
+    """
+
+    _data_dir: Optional[str] = None
+    _manifest: Optional[Dict[str, Any]] = None
+    # {"省份|批次": (年份列表, 分数下限, 位次矩阵, 转换矩阵)}
+    _tables: Dict[str, Tuple[List[int], int, np.ndarray, np.ndarray]] = {}
+
+    @classmethod
+    def load(cls, data_dir: str = DATA_DIR) -> bool:
+        """
+        加载转换表清单，数组文件在首次使用时以mmap方式打开
+
+        Returns:
+            转换表是否存在
+        """
+        manifest_path = os.path.join(data_dir, MANIFEST_FILE)
+        # 重新加载时丢弃已打开的数组，避免沿用旧目录或旧版本的文件
+        cls._tables = {}
+        cls._data_dir = data_dir
+        if not os.path.exists(manifest_path):
+            logger.warning(f"等位分转换表不存在: {manifest_path}，请先运行tools/build_score_conversion.py")
+            cls._manifest = {"tables": {}}
+            return False
+        with open(manifest_path, "r", encoding="utf-8") as f:
+            cls._manifest = json.load(f)
+        logger.info(f"加载等位分转换表清单，共{len(cls._manifest['tables'])}组，生成于{cls._manifest.get('built_at')}")
+        return True
+
+    @classmethod
+    def _get(cls, province_name: str, batch: str) -> Optional[Tuple[List[int], int, np.ndarray, np.ndarray]]:
+        if cls._manifest is None:
+            cls.load()
+        key = f"{province_name}|{batch}"
+        if key in cls._tables:
+            return cls._tables[key]
+        meta = cls._manifest["tables"].get(key)
+        if not meta:
+            return None
+        prefix = os.path.join(cls._data_dir, meta["prefix"])
+        entry = (
+            meta["years"],
+            meta["score_min"],
+            np.load(f"{prefix}.rank.npy", mmap_mode="r"),
+            np.load(f"{prefix}.conv.npy", mmap_mode="r")
+        )
+        cls._tables[key] = entry
+        return entry
+
+    @classmethod
+    def years(cls, province_name: str, batch: str = "本科") -> List[int]:
+        """获取转换表包含的年份"""
+        entry = cls._get(province_name, batch)
+        return list(entry[0]) if entry else []
+
+    @staticmethod
+    def _score_index(scores, score_min: int, n_scores: int) -> np.ndarray:
+        scores = np.atleast_1d(np.asarray(scores, dtype=np.float64))
+        return np.clip(np.floor(scores).astype(np.int64) - score_min, 0, n_scores - 1)
+
+    @classmethod
+    def convert(cls, province_name: str, batch: str, scores, from_year: int, to_year: int) -> Optional[np.ndarray]:
+        """
+        将from_year的分数换算为to_year的等位分（同位次对应的分数）
+
+        Args:
+            province_name: 省份名称
+            batch: 批次
+            scores: 分数，标量或数组
+            from_year: 分数所在年份
+            to_year: 目标年份
+
+        Returns:
+            等位分数组，缺少对应年份数据时返回None
+        """
+        entry = cls._get(province_name, batch)
+        if entry is None:
+            return None
+        years, score_min, _, conv = entry
+        if from_year not in years or to_year not in years:
+            return None
+        idx = cls._score_index(scores, score_min, conv.shape[2])
+        return np.asarray(conv[years.index(from_year), years.index(to_year), idx], dtype=np.int64)
+
+    @classmethod
+    def rank_of(cls, province_name: str, batch: str, scores, year: int) -> Optional[np.ndarray]:
+        """查询分数在指定年份的等效位次"""
+        entry = cls._get(province_name, batch)
+        if entry is None:
+            return None
+        years, score_min, ranks, _ = entry
+        if year not in years:
+            return None
+        idx = cls._score_index(scores, score_min, ranks.shape[1])
+        return np.asarray(ranks[years.index(year), idx], dtype=np.int64)
@@ -0,0 +1,213 @@
+import time
+from typing import Dict, Any, List, Optional, Tuple
+import numpy as np
+from dao.clickhouse_db import ClickHouseDB
+from dao.specialist_dao import SpecialistDAO
+from utils.logger_utils import setup_logger
+
+# 配置日志
+logger = setup_logger(name="score_rank_index")
+
+# 未指定年份时换算等效位次使用的基准年份
+DEFAULT_BASE_YEAR = 2024
+
+
+class ScoreRankTable:
+    """单个(省份, 年份, 批次)的一分一段表，按最低分升序存放为NumPy数组"""
+
+    def __init__(self, province_name: str, year: int, batch: str, ranks_data: list):
+        """
+        Args:
+            province_name: 省份名称
+            year: 年份
+            batch: 批次
+            ranks_data: dwd_youzy_score_rank_chunk.ranks解析后的分数段列表
+        """
+        self.province_name = province_name
+        self.year = year
+        self.batch = batch
+
+        segments = sorted(ranks_data, key=lambda x: x["minScore"])
+        self.min_scores = np.array([s["minScore"] for s in segments], dtype=np.float64)
+        self.max_scores = np.array([s["maxScore"] for s in segments], dtype=np.float64)
+        self.same_counts = np.array([s["sameCount"] for s in segments], dtype=np.int64)
+        self.lowest_ranks = np.array([s["lowestRank"] for s in segments], dtype=np.int64)
+        self.highest_ranks = np.array([s["highestRank"] for s in segments], dtype=np.int64)
+
+    def __len__(self) -> int:
+        return len(self.min_scores)
+
+    def locate(self, scores) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        批量定位分数所在的分数段
+
+        规则与原等效位次接口一致：
+        - 落在某个分数段内，取该分数段
+        - 高于最高分数段，取最高分数段
+        - 落在两个分数段之间的空隙，取较高的分数段
+        - 低于最低分数段，取最低分数段，并标记below（位次为highestRank + 1）
+
+        Args:
+            scores: 分数，标量或数组
+
+        Returns:
+            (分数段下标数组, 是否低于最低分数段的布尔数组)
+        """
+        scores = np.atleast_1d(np.asarray(scores, dtype=np.float64))
+        idx = np.searchsorted(self.min_scores, scores, side="right") - 1
+        below = idx < 0
+        idx = np.clip(idx, 0, len(self) - 1)
+        # 高于所在段最高分的落在空隙中，向上取较高的分数段
+        in_gap = (scores > self.max_scores[idx]) & ~below
+        idx = np.where(in_gap, np.minimum(idx + 1, len(self) - 1), idx)
+        return idx, below
+
+    def ranks(self, scores) -> np.ndarray:
+        """批量计算等效位次"""
+        idx, below = self.locate(scores)
+        return np.where(below, self.highest_ranks[idx] + 1, self.lowest_ranks[idx])
+
+    def equivalent_rank(self, score: float) -> Dict[str, Any]:
+        """计算单个分数的等效位次，返回格式与/equivalent-rank接口一致"""
+        idx, below = self.locate(score)
+        return self.segment_result(int(idx[0]), bool(below[0]))
+
+    def segment_result(self, i: int, below: bool) -> Dict[str, Any]:
+        """组装单个分数段的结果"""
+        rank = self.highest_ranks[i] + 1 if below else self.lowest_ranks[i]
+        # 分数在数组中以float64存储便于比较，返回时还原为原始数据中的整数分数
+        return {
+            "rank": int(rank),
+            "score_range": {
+                "min": int(self.min_scores[i]),
+                "max": int(self.max_scores[i])
+            },
+            "same_count": int(self.same_counts[i])
+        }
+
+
+class ScoreRankIndex:
+    """一分一段表的进程内索引，按(省份, 年份, 批次)懒加载，按TTL和数据版本失效"""
+
+    # 缓存有效期（秒），过期后先检查数据版本，版本未变则直接续期
+    TTL = 3600
+    SOURCE_TABLE = "dwd_youzy_score_rank_chunk"
+
+    # {(省份, 年份, 批次): (加载时间, 数据版本, ScoreRankTable或None)}
+    _tables: Dict[Tuple[str, int, str], Tuple[float, Optional[str], Optional[ScoreRankTable]]] = {}
+
+    @classmethod
+    async def data_version(cls) -> Optional[str]:
+        """
+        获取一分一段源表的数据版本，取活跃数据分片的最后修改时间
+
+        Returns:
+            版本字符串，查询失败时返回None
+        """
+        query = """
+        SELECT toString(max(modification_time)) AS version
+        FROM system.parts
+        WHERE database = currentDatabase() AND table = {table:String} AND active
+        """
+        try:
+            result = await ClickHouseDB.execute_async(query, {"table": cls.SOURCE_TABLE})
+            return result[0]["version"] if result else None
+        except Exception as e:
+            logger.warning(f"获取一分一段表数据版本失败: {str(e)}")
+            return None
+
+    @classmethod
+    async def get_table(cls, province_name: str, year: int, batch: str = "本科") -> Optional[ScoreRankTable]:
+        """
+        获取一分一段表，未加载或已失效时从ClickHouse加载
+
+        Args:
+            province_name: 省份名称
+            year: 年份
+            batch: 批次
+
+        Returns:
+            ScoreRankTable，源表中没有数据时返回None
+        """
+        key = (province_name, year, batch)
+        cached = cls._tables.get(key)
+        now = time.time()
+        if cached:
+            loaded_at, version, table = cached
+            if now - loaded_at < cls.TTL:
+                return table
+            current_version = await cls.data_version()
+            if current_version is not None and current_version == version:
+                cls._tables[key] = (now, version, table)
+                return table
+            logger.info(f"一分一段表数据版本变化，重新加载: {key}")
+
+        return await cls.load(province_name, year, batch)
+
+    @classmethod
+    async def load(cls, province_name: str, year: int, batch: str = "本科") -> Optional[ScoreRankTable]:
+        """从ClickHouse加载一分一段表并放入缓存"""
+        version = await cls.data_version()
+        result = await SpecialistDAO.get_score_rank(
+            province_name=province_name,
+            year=year,
+            batch=batch
+        )
+        table = None
+        if result and result.get("data"):
+            table = ScoreRankTable(province_name, year, batch, result["data"])
+            logger.info(f"加载一分一段表: {province_name} {year} {batch}，共{len(table)}个分数段")
+        cls._tables[(province_name, year, batch)] = (time.time(), version, table)
+        return table
+
+    @classmethod
+    def invalidate(cls, province_name: Optional[str] = None, year: Optional[int] = None,
+                   batch: Optional[str] = None):
+        """
+        使缓存失效，参数为None表示不限制该维度
+
+        Args:
+            province_name: 省份名称
+            year: 年份
+            batch: 批次
+        """
+        for key in list(cls._tables.keys()):
+            if ((province_name is None or key[0] == province_name)
+                    and (year is None or key[1] == year)
+                    and (batch is None or key[2] == batch)):
+                cls._tables.pop(key, None)
+
+    @classmethod
+    async def equivalent_rank(cls, province_name: str, year: int, batch: str, score: float) -> Optional[Dict[str, Any]]:
+        """
+        计算等效位次
+
+        Returns:
+            包含rank、score_range、same_count的字典，没有数据时返回None
+        """
+        table = await cls.get_table(province_name, year, batch)
+        if table is None:
+            return None
+        return table.equivalent_rank(score)
+
+    @classmethod
+    async def batch_ranks(cls, province_name: str, batch: str, scores: List[float],
+                          years: List[int]) -> Dict[int, Optional[List[int]]]:
+        """
+        批量计算多个分数在多个年份的等效位次，每个年份的一分一段表只加载一次
+
+        Args:
+            province_name: 省份名称
+            batch: 批次
+            scores: 分数列表
+            years: 年份列表
+
+        Returns:
+            {年份: 与scores一一对应的位次列表}，没有数据的年份为None
+        """
+        score_array = np.asarray(scores, dtype=np.float64)
+        results = {}
+        for year in dict.fromkeys(years):
+            table = await cls.get_table(province_name, year, batch)
+            results[year] = table.ranks(score_array).tolist() if table is not None else None
+        return results
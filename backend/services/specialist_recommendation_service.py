@@ -1,7 +1,9 @@
+import asyncio
 from typing import List, Optional, Dict, Any
 from dao.specialist_recommendation_dao import get_recommendation_groups
+from services.recommendation_engine import RecommendationEngine
 
-def get_recommendation_service(
+async def get_recommendation_service(
     rank: Optional[int] = None,
     province_name: Optional[str] = None,
     subjects: Optional[str] = None,
@@ -9,7 +11,17 @@ def get_recommendation_service(
 ) -> List[Dict[str, Any]]:
     try:
         subject_list = [s.strip() for s in subjects.split(',')] if subjects else None
-        return get_recommendation_groups(
+        if province_name:
+            # 指定省份时使用进程内推荐引擎，不再每次访问ClickHouse；
+            # 快照加载是同步查询，放到线程池中执行，同一省份的并发加载只执行一次
+            return await asyncio.to_thread(
+                RecommendationEngine.recommend,
+                province_name=province_name,
+                rank=rank,
+                subjects=subject_list,
+                limit=limit
+            )
+        return await get_recommendation_groups(
             rank=rank,
             province_name=province_name,
             subjects=subject_list,
@@ -17,4 +29,23 @@ def get_recommendation_service(
         )
     except Exception as e:
         print(f"[Service] 获取推荐列表失败: {str(e)}")
-        raise e 
\ No newline at end of file
+        raise e
+
+async def get_tiered_recommendation_service(
+    rank: int,
+    province_name: str,
+    subjects: Optional[str] = None,
+    top_k: int = 10
+) -> Dict[str, List[Dict[str, Any]]]:
+    try:
+        subject_list = [s.strip() for s in subjects.split(',')] if subjects else None
+        return await asyncio.to_thread(
+            RecommendationEngine.recommend_tiered,
+            province_name=province_name,
+            rank=rank,
+            subjects=subject_list,
+            k=top_k
+        )
+    except Exception as e:
+        print(f"[Service] 获取分档推荐列表失败: {str(e)}")
+        raise e
\ No newline at end of file
@@ -1,12 +1,20 @@
-import json
-from typing import Dict, List, Any, Optional
+import itertools
+from typing import Dict, List, Any, Optional, Iterator, Tuple
 import logging
-from dao.specialist_dao import SpecialistDAO
-from dao.clickhouse_db import ClickHouseDB
+from dao.specialist_dao import SpecialistDAO, PROFESSION_VERSION_SORT
+from services.college_catalog import CollegeCatalog
 
 # 配置日志
 logger = logging.getLogger("specialist_service")
 
+# 导出格式：{格式名: (ClickHouse输出格式, Content-Type, 文件扩展名)}
+EXPORT_FORMATS = {
+    "csv": ("CSVWithNames", "text/csv; charset=utf-8", "csv"),
+    "parquet": ("Parquet", "application/vnd.apache.parquet", "parquet"),
+}
+# CSV前置的UTF-8 BOM，Excel据此识别中文编码
+CSV_BOM = b"\xef\xbb\xbf"
+
 class SpecialistService:
     
     @staticmethod
@@ -19,7 +27,19 @@ class SpecialistService:
         features: list = None,
         nature_type: list = None
     ) -> Dict[str, Any]:
-        """获取大学列表，支持多条件筛选"""
+        """获取大学列表，支持多条件筛选，优先从院校目录缓存读取"""
+        try:
+            return await CollegeCatalog.get_college_list(
+                page=page,
+                page_size=page_size,
+                cn_name=cn_name,
+                province_name=province_name,
+                categories=categories,
+                features=features,
+                nature_type=nature_type
+            )
+        except Exception as e:
+            logger.warning(f"院校目录缓存不可用，直接查询: {str(e)}")
         try:
             return await SpecialistDAO.get_college_list(
                 page=page,
@@ -40,7 +60,9 @@ class SpecialistService:
         page_size: int = 10,
         filters: Optional[Dict[str, Any]] = None,
         sort_by: Optional[str] = None,
-        sort_order: str = "DESC"
+        sort_order: str = "DESC",
+        fields: Optional[List[str]] = None,
+        raw: bool = False
     ) -> Dict[str, Any]:
         """
         获取专家列表数据
@@ -51,6 +73,8 @@ class SpecialistService:
             filters: 筛选条件，键值对
             sort_by: 排序字段
             sort_order: 排序方向，ASC升序，DESC降序
+            fields: 只返回的JSON字段列表
+            raw: 是否以原始JSON片段透传记录
             
         Returns:
             包含数据列表和分页信息的字典
@@ -62,7 +86,9 @@ class SpecialistService:
                 page_size=page_size,
                 filters=filters,
                 sort_by=sort_by,
-                sort_order=sort_order
+                sort_order=sort_order,
+                fields=fields,
+                raw=raw
             )
             return result
         except Exception as e:
@@ -149,7 +175,11 @@ class SpecialistService:
 
     @staticmethod
     async def get_college_detail(code: str) -> Dict[str, Any]:
-        """根据code获取院校详情"""
+        """根据code获取院校详情，优先从院校目录缓存读取"""
+        try:
+            return await CollegeCatalog.get_college_detail(code)
+        except Exception as e:
+            logger.warning(f"院校目录缓存不可用，直接查询: {str(e)}")
         try:
             return await SpecialistDAO.get_college_detail(code)
         except Exception as e:
@@ -166,7 +196,11 @@ class SpecialistService:
     ) -> Dict[str, Any]:
         """
         获取专业版本列表（仅做参数校验和业务拼装，SQL查询交给DAO）
+        
+        Raises:
+            ValueError: 排序字段不允许排序
         """
+        PROFESSION_VERSION_SORT.validate(sort_by)
         try:
             # 直接调用DAO层
             return await SpecialistDAO.get_profession_version_list(
@@ -186,6 +220,31 @@ class SpecialistService:
                 "pages": 0
             } 
 
+    @staticmethod
+    def export_profession_versions(
+        filters: Dict[str, Any],
+        fmt: str = "csv",
+        sort_by: Optional[str] = None,
+        sort_order: str = "DESC"
+    ) -> Tuple[Iterator[bytes], str, str]:
+        """
+        流式导出专业版本
+
+        Returns:
+            (字节块迭代器, Content-Type, 文件扩展名)
+
+        Raises:
+            ValueError: 导出格式或排序字段不支持
+        """
+        if fmt not in EXPORT_FORMATS:
+            raise ValueError(f"不支持的导出格式: {fmt}，可选格式: {', '.join(EXPORT_FORMATS)}")
+        PROFESSION_VERSION_SORT.validate(sort_by)
+        clickhouse_format, media_type, extension = EXPORT_FORMATS[fmt]
+        chunks = SpecialistDAO.export_profession_versions(filters, clickhouse_format, sort_by, sort_order)
+        if fmt == "csv":
+            chunks = itertools.chain([CSV_BOM], chunks)
+        return chunks, media_type, extension
+
     @staticmethod
     async def get_profession_group_list(
         page: int = 1,
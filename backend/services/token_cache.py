@@ -0,0 +1,112 @@
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, Optional, Tuple
+from utils.logger_utils import setup_logger
+
+# 配置日志
+logger = setup_logger(name="token_cache")
+
+
+def token_hash(token: str) -> str:
+    """令牌摘要，缓存中不保存令牌原文"""
+    return hashlib.sha256(token.encode("utf-8")).hexdigest()
+
+
+class TokenCache:
+    """
+    已验证令牌的缓存
+
+    令牌签名验证通过后按摘要缓存用户ID，直到令牌过期，期间同一令牌的请求不再重复验证；
+    按LRU限制条目数。注销的令牌和按用户吊销的时间点保存在进程内，多进程部署时各自生效。
+    """
+
+    MAX_ENTRIES = 10000
+    # {令牌摘要: (用户ID, 过期时间戳, 签发时间戳)}
+    _entries: "OrderedDict[str, Tuple[int, float, Optional[float]]]" = OrderedDict()
+    # 已注销的令牌：{令牌摘要: 过期时间戳}，过期后自然失效，不再需要记录
+    _revoked: Dict[str, float] = {}
+    # 按用户吊销：{用户ID: 吊销时间戳}，此前签发的令牌全部失效
+    _revoked_before: Dict[int, float] = {}
+    _lock = threading.Lock()
+
+    @classmethod
+    def get(cls, token: str) -> Optional[int]:
+        """
+        获取已验证令牌的用户ID
+
+        Returns:
+            用户ID，未缓存、已过期或已吊销时返回None
+        """
+        key = token_hash(token)
+        with cls._lock:
+            entry = cls._entries.get(key)
+            if entry is None:
+                return None
+            user_id, expires_at, issued_at = entry
+            if time.time() >= expires_at:
+                del cls._entries[key]
+                return None
+            cls._entries.move_to_end(key)
+            return user_id
+
+    @classmethod
+    def put(cls, token: str, user_id: int, expires_at: float, issued_at: Optional[float] = None):
+        """
+        缓存验证通过的令牌
+
+        Args:
+            token: 令牌
+            user_id: 用户ID
+            expires_at: 令牌的exp
+            issued_at: 令牌的iat
+        """
+        with cls._lock:
+            cls._entries[token_hash(token)] = (user_id, expires_at, issued_at)
+            while len(cls._entries) > cls.MAX_ENTRIES:
+                cls._entries.popitem(last=False)
+
+    @classmethod
+    def is_revoked(cls, token: str, user_id: int, issued_at: Optional[float] = None) -> bool:
+        """
+        令牌是否已注销，或签发时间早于该用户的吊销时间
+
+        按浮点秒严格比较：吊销前同一秒内签发的令牌失效；create_access_token签发的iat带小数部分，
+        吊销后重新登录签发的令牌晚于吊销时间，仍然有效
+        """
+        revoked_before = cls._revoked_before.get(user_id)
+        if revoked_before is not None and (issued_at is None or issued_at < revoked_before):
+            return True
+        return token_hash(token) in cls._revoked
+
+    @classmethod
+    def revoke(cls, token: str, expires_at: float):
+        """注销单个令牌，如用户退出登录"""
+        key = token_hash(token)
+        now = time.time()
+        with cls._lock:
+            cls._entries.pop(key, None)
+            # 顺带清理已过期的注销记录
+            for revoked_key in [k for k, exp in cls._revoked.items() if exp <= now]:
+                del cls._revoked[revoked_key]
+            if expires_at > now:
+                cls._revoked[key] = expires_at
+        logger.info("令牌已注销")
+
+    @classmethod
+    def revoke_user(cls, user_id: int):
+        """吊销用户此前签发的全部令牌，如修改密码或禁用账号"""
+        now = time.time()
+        with cls._lock:
+            cls._revoked_before[user_id] = now
+            for key in [k for k, entry in cls._entries.items() if entry[0] == user_id]:
+                del cls._entries[key]
+        logger.info(f"已吊销用户{user_id}的全部令牌")
+
+    @classmethod
+    def clear(cls):
+        with cls._lock:
+            cls._entries.clear()
+            cls._revoked.clear()
+            cls._revoked_before.clear()
@@ -1,12 +1,21 @@
-from typing import List, Dict, Any, Optional
+import base64
+import binascii
+from datetime import datetime
+from typing import List, Dict, Any, Optional, Tuple
 from dao.topic_dao import TopicDAO
 from services.message_service import MessageService
 from graph.text_captioning import generate_text_caption
+from utils.format_utils import format_datetime_list
 from utils.logger_utils import setup_logger
 
 # 配置日志
 logger = setup_logger(name="topic_service")
 
+# 话题列表默认每页条数
+DEFAULT_PAGE_SIZE = 30
+# 最后一条消息摘要的最大字符数
+PREVIEW_LENGTH = 100
+
 class TopicService:
     """话题服务，提供话题相关的业务逻辑"""
     
@@ -86,6 +95,52 @@ class TopicService:
         """
         return await TopicDAO.get_user_topics(user_id)
     
+    @staticmethod
+    def encode_cursor(updated_at: datetime, topic_id: int) -> str:
+        """把一页最后一个话题的(updated_at, topic_id)编码为游标，保留微秒以免跳过同一秒内的话题"""
+        raw = f"{updated_at.isoformat()}|{topic_id}"
+        return base64.urlsafe_b64encode(raw.encode("utf-8")).decode("ascii").rstrip("=")
+
+    @staticmethod
+    def decode_cursor(cursor: str) -> Tuple[datetime, int]:
+        """
+        解析游标
+
+        Raises:
+            ValueError: 游标格式错误
+        """
+        try:
+            raw = base64.urlsafe_b64decode(cursor + "=" * (-len(cursor) % 4)).decode("utf-8")
+            updated_at, topic_id = raw.rsplit("|", 1)
+            return datetime.fromisoformat(updated_at), int(topic_id)
+        except (ValueError, UnicodeDecodeError, binascii.Error):
+            raise ValueError("无效的游标")
+
+    @staticmethod
+    async def get_user_topics_page(user_id: int, limit: int = DEFAULT_PAGE_SIZE,
+                                   cursor: Optional[str] = None) -> Dict[str, Any]:
+        """分页获取用户的话题，附带最后一条消息摘要和消息数
+        
+        Args:
+            user_id: 用户ID
+            limit: 每页条数
+            cursor: 上一页返回的next_cursor，为None时获取第一页
+            
+        Returns:
+            Dict[str, Any]: {"items": 话题列表, "next_cursor": 下一页游标，没有下一页时为None}
+            
+        Raises:
+            ValueError: 游标格式错误
+        """
+        after = TopicService.decode_cursor(cursor) if cursor else None
+        # 多取一条判断是否还有下一页
+        topics = await TopicDAO.get_user_topics_page(user_id, limit + 1, after, PREVIEW_LENGTH)
+        next_cursor = None
+        if len(topics) > limit:
+            topics = topics[:limit]
+            next_cursor = TopicService.encode_cursor(topics[-1]["updated_at"], topics[-1]["topic_id"])
+        return {"items": format_datetime_list(topics), "next_cursor": next_cursor}
+    
     @staticmethod
     async def update_topic(topic_id: int, topic: str) -> Optional[Dict[str, Any]]:
         """更新话题
@@ -0,0 +1,55 @@
+"""
+字符串数组解码的单元测试
+"""
+import os
+import sys
+from types import SimpleNamespace
+from unittest.mock import patch
+
+# 添加项目根目录到系统路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.array_utils import parse_string_array
+from dao.clickhouse_db import ClickHouseDB
+
+# 测试与eval结果一致
+def test_parse_matches_eval():
+    for text in ["['985','211']", "['985', '双一流']", "[]", '["综合", "理工"]', "['It\\'s', 'a\\\\b']"]:
+        assert parse_string_array(text) == list(eval(text))
+
+# 测试非法输入不会被执行
+def test_parse_rejects_code():
+    assert parse_string_array("__import__('os').system('echo 1')") == []
+    assert parse_string_array("['a', __import__('os')]") == []
+    assert parse_string_array(None) == []
+    # 缓存结果不会被调用方修改
+    result = parse_string_array("['985']")
+    result.append("211")
+    assert parse_string_array("['985']") == ["985"]
+
+# 测试查询结果按列类型解码
+def test_decode_arrays():
+    records = [
+        {"code": "1", "categories": "['综合']", "features": ["985"]},
+        {"code": "2", "categories": None, "features": ["211"]},
+    ]
+    column_types = [SimpleNamespace(name="String"), SimpleNamespace(name="String"), SimpleNamespace(name="Array(String)")]
+    ClickHouseDB._decode_arrays(records, ["code", "categories", "features"], column_types, {"categories", "features"})
+    assert records[0]["categories"] == ["综合"]
+    assert records[1]["categories"] == []
+    assert records[0]["features"] == ["985"]
+    assert records[0]["code"] == "1"
+
+# 测试只解码调用方指定的列，默认不解码
+def test_decode_arrays_opt_in():
+    result = SimpleNamespace(
+        result_rows=[("1", "['综合']", None)],
+        column_names=["code", "categories", "features"],
+        column_types=[SimpleNamespace(name="String")] * 3,
+    )
+    client = SimpleNamespace(query=lambda query, parameters: result)
+    with patch.object(ClickHouseDB, "get_client", return_value=client):
+        assert ClickHouseDB.execute("SELECT 1") == [{"code": "1", "categories": "['综合']", "features": None}]
+        assert ClickHouseDB.execute("SELECT 2", array_columns=["categories", "features"]) == [
+            {"code": "1", "categories": ["综合"], "features": []}
+        ]
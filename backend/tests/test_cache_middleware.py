@@ -0,0 +1,137 @@
+"""
+响应缓存中间件的单元测试
+"""
+import asyncio
+import pytest
+import httpx
+from unittest.mock import patch
+from fastapi import FastAPI, APIRouter, Depends
+import os
+import sys
+
+# 添加项目根目录到系统路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from api.auth_api import get_current_user_id, create_access_token
+from api.cache_middleware import ResponseCacheMiddleware
+from utils.cache_utils import MemoryLRU, CachedResponse, LocalSharedCache, normalize_query
+
+def make_app(calls, delay=0.0):
+    router = APIRouter(prefix="/api/data/specialist")
+
+    @router.get("/colleges")
+    async def colleges(province: str = None, page: int = 1):
+        calls.append(("colleges", province, page))
+        await asyncio.sleep(delay)
+        return {"code": 200, "message": "ok", "data": {"province": province, "page": page}}
+
+    @router.get("/professions")
+    async def professions(current_user_id: int = Depends(get_current_user_id)):
+        calls.append(("professions",))
+        return {"code": 200, "message": "ok", "data": []}
+
+    @router.get("/broken")
+    async def broken():
+        calls.append(("broken",))
+        return {"code": 500, "message": "失败", "data": None}
+
+    app = FastAPI()
+    app.include_router(router)
+    app.add_middleware(ResponseCacheMiddleware, prefixes=["/api/data/specialist"], shared="local")
+    return app
+
+def client(app):
+    return httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test")
+
+# 测试查询参数规范化
+def test_normalize_query():
+    assert normalize_query("page=1&province=%E5%8C%97%E4%BA%AC&empty=") == normalize_query("province=北京&page=1")
+    assert normalize_query("a=2&b=1&a=1") == "a=2&a=1&b=1"
+
+# 测试LRU按字节数淘汰
+def test_memory_lru_evicts_by_bytes():
+    lru = MemoryLRU(max_bytes=2000, max_entry_bytes=1500)
+    for key in ("a", "b", "c"):
+        lru.set(key, CachedResponse(200, [], b"x" * 600, '"e"', float("inf")))
+    assert lru.get("a") is None and lru.get("c") is not None
+    assert lru.bytes <= 2000
+    assert not lru.set("big", CachedResponse(200, [], b"x" * 1500, '"e"', float("inf")))
+
+# 测试命中缓存、ETag和304
+@pytest.mark.asyncio
+async def test_cache_hit_and_etag():
+    calls = []
+    async with client(make_app(calls)) as c:
+        first = await c.get("/api/data/specialist/colleges?province=北京&page=1")
+        second = await c.get("/api/data/specialist/colleges?page=1&province=北京")
+        assert first.headers["x-cache"] == "MISS" and second.headers["x-cache"] == "HIT"
+        assert first.json() == second.json()
+        assert len(calls) == 1
+        etag = first.headers["etag"]
+        not_modified = await c.get("/api/data/specialist/colleges?province=北京&page=1",
+                                   headers={"If-None-Match": etag})
+        assert not_modified.status_code == 304 and not_modified.headers["etag"] == etag
+        refreshed = await c.get("/api/data/specialist/colleges?province=北京&page=1",
+                                headers={"Cache-Control": "no-cache"})
+        assert refreshed.headers["x-cache"] == "MISS" and len(calls) == 2
+        # 业务失败的响应不缓存
+        await c.get("/api/data/specialist/broken")
+        await c.get("/api/data/specialist/broken")
+        assert calls.count(("broken",)) == 2
+
+# 测试并发的相同请求只访问一次后端
+@pytest.mark.asyncio
+async def test_single_flight():
+    calls = []
+    async with client(make_app(calls, delay=0.05)) as c:
+        responses = await asyncio.gather(*[c.get("/api/data/specialist/colleges?province=上海") for _ in range(5)])
+    assert all(r.status_code == 200 for r in responses)
+    assert len(calls) == 1
+
+# 测试需要登录的接口命中缓存时仍校验令牌
+@pytest.mark.asyncio
+async def test_protected_route_checks_token():
+    calls = []
+    token = create_access_token({"user_id": 1})
+    async with client(make_app(calls)) as c:
+        ok = await c.get("/api/data/specialist/professions", headers={"Authorization": f"Bearer {token}"})
+        assert ok.status_code == 200
+        denied = await c.get("/api/data/specialist/professions", headers={"Authorization": "Bearer bad"})
+        assert denied.status_code == 401
+        hit = await c.get("/api/data/specialist/professions", headers={"Authorization": f"Bearer {token}"})
+        assert hit.headers["x-cache"] == "HIT"
+    assert len(calls) == 1
+
+# 测试进程内共享缓存限制条目数，写入时清理过期条目
+@pytest.mark.asyncio
+async def test_local_shared_cache_bounded():
+    cache = LocalSharedCache(max_entries=3)
+    await cache.set("expired", b"x", -1)
+    for key in ("a", "b", "c"):
+        await cache.set(key, b"x", 60)
+    # 超出上限时先清理过期条目
+    assert len(cache) == 3 and await cache.get("expired") is None
+    await cache.set("d", b"x", 60)
+    # 仍超出时淘汰最早写入的条目
+    assert len(cache) == 3 and await cache.get("a") is None and await cache.get("d") == b"x"
+
+# 测试清空缓存接口清空所有中间件实例
+@pytest.mark.asyncio
+async def test_clear_endpoint():
+    from api.specialist_api import router as specialist_router
+    calls = []
+    app = make_app(calls)
+    app.include_router(specialist_router)
+    async with client(app) as c:
+        await c.get("/api/data/specialist/colleges?page=1")
+        with patch("api.specialist_api.get_response_cache_config", return_value={"admin_token": "secret"}):
+            assert (await c.post("/api/data/specialist/cache/clear")).status_code == 403
+            assert (await c.post("/api/data/specialist/cache/clear",
+                                 headers={"X-Admin-Token": "wrong"})).status_code == 403
+            response = await c.post("/api/data/specialist/cache/clear", headers={"X-Admin-Token": "secret"})
+            assert response.status_code == 200 and response.json()["data"]["response_caches"] >= 1
+        with patch("api.specialist_api.get_response_cache_config", return_value={}):
+            assert (await c.post("/api/data/specialist/cache/clear",
+                                 headers={"X-Admin-Token": ""})).status_code == 403
+        again = await c.get("/api/data/specialist/colleges?page=1")
+        assert again.headers["x-cache"] == "MISS" and len(calls) == 2
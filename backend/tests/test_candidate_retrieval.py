@@ -0,0 +1,51 @@
+"""
+候选专业组检索的单元测试
+"""
+from unittest.mock import patch
+import os
+import sys
+
+# 添加项目根目录到系统路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from graph.candidate_retrieval import retrieve_candidates, format_candidates, NO_CANDIDATES
+from services.recommendation_engine import RecommendationEngine
+
+# 测试按用户信息调用分档推荐
+def test_retrieve_candidates():
+    tiers = {"冲": [], "稳": [{"college_code": "A"}], "保": []}
+    with patch.object(RecommendationEngine, "recommend_tiered", return_value=tiers) as mock_tiered:
+        result = retrieve_candidates({"province": "北京", "rank": "5000", "subjects": ["物理", "化学"]}, k=3)
+    assert result == tiers
+    mock_tiered.assert_called_once_with(province_name="北京", rank=5000, k=3, eligible_subjects=["物理", "化学"])
+
+# 测试缺少省份或位次时不检索，检索失败时返回空字典
+def test_retrieve_candidates_missing_info():
+    with patch.object(RecommendationEngine, "recommend_tiered") as mock_tiered:
+        assert retrieve_candidates({"province": "北京", "rank": None}) == {}
+        assert retrieve_candidates({"province": "", "rank": 5000}) == {}
+        mock_tiered.assert_not_called()
+    with patch.object(RecommendationEngine, "recommend_tiered", side_effect=Exception("ClickHouse不可用")):
+        assert retrieve_candidates({"province": "北京", "rank": 5000}) == {}
+
+# 测试候选压缩为表格，缺失的位次和选科要求有占位
+def test_format_candidates():
+    tiers = {
+        "冲": [{
+            "college_name": "大学A", "profession_group_code": "01", "subject_requirements": "物理+化学",
+            "last_1_year_min_rank": 4000.0, "last_2_year_min_rank": 4200.0, "last_3_year_min_rank": None,
+            "admission_probability": 0.123,
+        }],
+        "稳": [{
+            "college_name": "大学B", "profession_group_code": "02", "subject_requirements": None,
+            "last_1_year_min_rank": 9000.0, "last_2_year_min_rank": None, "last_3_year_min_rank": None,
+            "admission_probability": 0.6,
+        }],
+        "保": [],
+    }
+    lines = format_candidates(tiers).split("\n")
+    assert lines[0] == "档位|院校|专业组|选科要求|近1/2/3年最低位次|录取概率"
+    assert lines[1] == "冲|大学A|01|物理+化学|4000/4200/-|12%"
+    assert lines[2] == "稳|大学B|02|不限|9000/-/-|60%"
+    assert format_candidates({}) == NO_CANDIDATES
+    assert format_candidates({"冲": [], "稳": [], "保": []}) == NO_CANDIDATES
@@ -0,0 +1,113 @@
+"""
+对话图检查点的单元测试
+"""
+import pytest
+from unittest.mock import patch, AsyncMock, MagicMock
+import os
+import sys
+
+# 添加项目根目录到系统路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from langgraph.checkpoint.memory import MemorySaver
+from langgraph.graph import StateGraph, START, END
+from graph.checkpointer import GraphCheckpointer
+from graph.graph import State
+from services.message_service import MessageService
+
+def build_graph(seen):
+    """与对话图状态相同的简化图，节点记录收到的消息并追加回复"""
+    def reply(state: State):
+        seen.append([m.content for m in state["messages"]])
+        return {"messages": [{"role": "assistant", "content": f"回复{len(seen)}"}]}
+
+    def get_graph(checkpointer=None):
+        graph = StateGraph(State)
+        graph.add_node("reply", reply)
+        graph.add_edge(START, "reply")
+        graph.add_edge("reply", END)
+        return graph.compile(checkpointer=checkpointer)
+    return get_graph
+
+async def run_turn(user_message):
+    chunks = []
+    async for chunk in MessageService.stream_process_user_message(
+        user_message, "7", {"province": "北京", "requirement": ""}, user_id=1
+    ):
+        chunks.append(chunk)
+    return chunks
+
+# 测试话题对应的线程配置
+def test_thread_config():
+    config = GraphCheckpointer.thread_config(7, 1)
+    assert config["configurable"] == {"thread_id": "7", "topic_id": 7, "user_id": 1}
+
+# 测试未安装依赖时不启用检查点
+@pytest.mark.asyncio
+async def test_saver_disabled_without_dependency():
+    with patch("graph.checkpointer.AsyncPostgresSaver", None), \
+            patch.object(GraphCheckpointer, "_saver", None), \
+            patch.object(GraphCheckpointer, "_disabled", False):
+        assert await GraphCheckpointer.get_saver() is None
+        assert GraphCheckpointer._disabled
+
+# 测试有检查点时只传入新消息，不再从消息表加载历史
+@pytest.mark.asyncio
+async def test_resume_from_checkpoint():
+    seen = []
+    history = MagicMock()
+    history.get_messages = AsyncMock(return_value=[{"role": "user", "content": "历史消息"}])
+    with patch("graph.graph.getGraph", build_graph(seen)), \
+            patch.object(GraphCheckpointer, "get_saver", AsyncMock(return_value=MemorySaver())), \
+            patch.object(MessageService, "get_chat_history", AsyncMock(return_value=(history, None))), \
+            patch.object(MessageService, "sync_turn", AsyncMock()), \
+            patch.object(MessageService, "release_connection", AsyncMock()):
+        await run_turn("第一问")
+        await run_turn("第二问")
+    # 首轮用消息表中的历史初始化，第二轮从检查点恢复
+    assert history.get_messages.await_count == 1
+    assert seen == [["历史消息", "第一问"], ["历史消息", "第一问", "回复1", "第二问"]]
+
+# 测试未启用检查点时每轮从消息表重建
+@pytest.mark.asyncio
+async def test_rebuild_without_saver():
+    seen = []
+    history = MagicMock()
+    history.get_messages = AsyncMock(side_effect=lambda: [{"role": "user", "content": "历史消息"}])
+    with patch("graph.graph.getGraph", build_graph(seen)), \
+            patch.object(GraphCheckpointer, "get_saver", AsyncMock(return_value=None)), \
+            patch.object(MessageService, "get_chat_history", AsyncMock(return_value=(history, None))), \
+            patch.object(MessageService, "sync_turn", AsyncMock()), \
+            patch.object(MessageService, "release_connection", AsyncMock()):
+        await run_turn("第一问")
+        await run_turn("第二问")
+    assert history.get_messages.await_count == 2
+    assert seen == [["历史消息", "第一问"], ["历史消息", "第二问"]]
+
+# 测试清除消息时同时删除话题的检查点
+@pytest.mark.asyncio
+async def test_clear_history_deletes_checkpoint():
+    history = MagicMock()
+    history.topic_id = 7
+    history.clear = AsyncMock()
+    saver = MagicMock()
+    saver.adelete_thread = AsyncMock()
+    with patch.object(GraphCheckpointer, "get_saver", AsyncMock(return_value=saver)):
+        await MessageService.clear_history(history)
+    history.clear.assert_awaited_once()
+    saver.adelete_thread.assert_awaited_once_with("7")
+
+# 测试saver没有adelete_thread时直接删除检查点表中的行
+@pytest.mark.asyncio
+async def test_delete_thread_without_adelete():
+    conn = MagicMock()
+    conn.execute = AsyncMock()
+    pool = MagicMock()
+    pool.connection.return_value.__aenter__ = AsyncMock(return_value=conn)
+    pool.connection.return_value.__aexit__ = AsyncMock(return_value=False)
+    with patch.object(GraphCheckpointer, "get_saver", AsyncMock(return_value=object())), \
+            patch("graph.checkpointer.Database.get_checkpoint_pool", AsyncMock(return_value=pool)):
+        await GraphCheckpointer.delete_thread(7)
+    statements = [call.args for call in conn.execute.await_args_list]
+    assert statements == [(f"DELETE FROM {table} WHERE thread_id = %s", ("7",)) for table in
+                          ["checkpoints", "checkpoint_blobs", "checkpoint_writes"]]
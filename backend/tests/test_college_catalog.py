@@ -0,0 +1,98 @@
+"""
+院校目录缓存的单元测试
+"""
+import asyncio
+import pytest
+from unittest.mock import patch, AsyncMock
+import os
+import sys
+
+# 添加项目根目录到系统路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services.college_catalog import CollegeCatalog
+
+def make_college(code, name, province, nature, categories, features):
+    return {
+        "code": code,
+        "cn_name": name,
+        "province_name": province,
+        "nature_type": nature,
+        "categories": categories,
+        "features": features,
+        "introduction": "简介",
+        "zs_extra": "详情字段",
+    }
+
+# 模拟院校表，已按updated_at降序
+@pytest.fixture
+def mock_colleges():
+    return [
+        make_college("10001", "北京大学", "北京", "public", ["综合"], ["985", "211"]),
+        make_college("10003", "清华大学", "北京", "public", ["理工"], ["985", "211"]),
+        make_college("10246", "复旦大学", "上海", "public", ["综合"], ["985"]),
+        make_college("12345", "北京城市学院", "北京", "privite", ["综合"], []),
+    ]
+
+@pytest.fixture
+def catalog(mock_colleges):
+    CollegeCatalog.invalidate()
+    # 每个测试使用新的事件循环
+    CollegeCatalog._reload_lock = None
+    with patch("services.college_catalog.SpecialistDAO") as mock_dao:
+        mock_dao.get_college_catalog_version = AsyncMock(return_value="v1")
+        mock_dao.get_college_catalog = AsyncMock(side_effect=lambda: [dict(c) for c in mock_colleges])
+        yield mock_dao
+    CollegeCatalog.invalidate()
+
+# 测试筛选语义与SQL一致：字段内任一匹配，字段间同时满足
+@pytest.mark.asyncio
+async def test_college_list_filters(catalog):
+    result = await CollegeCatalog.get_college_list(province_name=["北京"], features=["985", "211"])
+    assert result["total"] == 2
+    assert [c["code"] for c in result["items"]] == ["10001", "10003"]
+
+    result = await CollegeCatalog.get_college_list(cn_name="北京", nature_type=["public", "privite"])
+    assert [c["code"] for c in result["items"]] == ["10001", "12345"]
+
+    result = await CollegeCatalog.get_college_list(page=2, page_size=3)
+    assert result["total"] == 4
+    assert [c["code"] for c in result["items"]] == ["12345"]
+    # 列表只返回列表字段
+    assert "zs_extra" not in result["items"][0]
+
+    # 快照只加载一次
+    catalog.get_college_catalog.assert_awaited_once()
+
+# 测试详情和版本变化后的刷新
+@pytest.mark.asyncio
+async def test_college_detail_refresh(catalog):
+    detail = await CollegeCatalog.get_college_detail("10246")
+    assert detail["cn_name"] == "复旦大学"
+    assert detail["zs_extra"] == "详情字段"
+    assert await CollegeCatalog.get_college_detail("00000") == {}
+    etag = await CollegeCatalog.etag()
+
+    # 检查间隔内不访问ClickHouse
+    catalog.get_college_catalog_version.return_value = "v2"
+    assert await CollegeCatalog.etag() == etag
+
+    CollegeCatalog._snapshot.checked_at -= CollegeCatalog.CHECK_INTERVAL
+    assert await CollegeCatalog.etag() != etag
+    assert catalog.get_college_catalog.await_count == 2
+
+# 测试并发请求只有一个检查版本并重新加载
+@pytest.mark.asyncio
+async def test_concurrent_reload_once(catalog):
+    async def slow_version():
+        await asyncio.sleep(0.01)
+        return "v1"
+    catalog.get_college_catalog_version = AsyncMock(side_effect=slow_version)
+    snapshots = await asyncio.gather(*[CollegeCatalog.get_snapshot() for _ in range(10)])
+    assert len({id(s) for s in snapshots}) == 1
+    catalog.get_college_catalog_version.assert_awaited_once()
+    catalog.get_college_catalog.assert_awaited_once()
+
+    CollegeCatalog.invalidate()
+    await asyncio.gather(*[CollegeCatalog.get_snapshot() for _ in range(10)])
+    assert catalog.get_college_catalog.await_count == 2
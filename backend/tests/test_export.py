@@ -0,0 +1,86 @@
+"""
+专业版本流式导出的单元测试
+"""
+import io
+import pytest
+from unittest.mock import patch, MagicMock
+import os
+import sys
+
+# 添加项目根目录到系统路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from dao.clickhouse_db import ClickHouseDB
+from services.specialist_service import SpecialistService, CSV_BOM
+
+class _Stream(io.BytesIO):
+    closed_by_reader = False
+
+    def close(self):
+        self.closed_by_reader = True
+        super().close()
+
+# 测试按块读取原生输出并在结束后关闭连接
+def test_stream_raw_chunks():
+    stream = _Stream(b"a" * 10)
+    client = MagicMock()
+    client.raw_stream.return_value = stream
+    with patch.object(ClickHouseDB, "get_client", return_value=client):
+        chunks = list(ClickHouseDB.stream_raw("SELECT 1", {"p": 1}, fmt="Parquet", chunk_size=4))
+    assert chunks == [b"aaaa", b"aaaa", b"aa"]
+    assert stream.closed_by_reader
+    assert client.raw_stream.call_args.kwargs["fmt"] == "Parquet"
+
+# 测试导出复用列表接口的筛选条件，CSV前置BOM
+def test_export_profession_versions():
+    with patch("dao.specialist_dao.ClickHouseDB") as mock_db:
+        mock_db.has_column.return_value = False
+        mock_db.get_sorting_key.return_value = ["province", "bus_year", "college_code"]
+        mock_db.stream_raw.return_value = iter([b"bus_year\n", b"2024\n"])
+        chunks, media_type, extension = SpecialistService.export_profession_versions(
+            {"province": "北京", "bus_year": 2024, "college_name": "大学"}, fmt="csv"
+        )
+        assert b"".join(chunks) == CSV_BOM + b"bus_year\n2024\n"
+        query, params = mock_db.stream_raw.call_args.args
+        assert mock_db.stream_raw.call_args.kwargs["fmt"] == "CSVWithNames"
+    assert extension == "csv" and media_type.startswith("text/csv")
+    assert "{bus_year:UInt16}" in query
+    assert "LIMIT" not in query
+    assert "positionCaseInsensitiveUTF8(college_name" in query
+    assert params["college_name"] == "大学"
+
+# 测试不支持的格式和排序字段
+def test_export_rejects_invalid():
+    with pytest.raises(ValueError):
+        SpecialistService.export_profession_versions({}, fmt="xlsx")
+    with pytest.raises(ValueError):
+        SpecialistService.export_profession_versions({}, fmt="csv", sort_by="college_tags")
+
+# 测试客户端不使用会话，流式导出期间其他查询不会遇到SESSION_IS_LOCKED
+def test_client_without_session():
+    with patch("dao.clickhouse_db.clickhouse_connect.get_client") as mock_get_client, \
+            patch.object(ClickHouseDB, "_client", None):
+        ClickHouseDB.get_client()
+    assert mock_get_client.call_args.kwargs["autogenerate_session_id"] is False
+
+# 测试导出接口在线程池中发起查询
+def test_export_api_off_event_loop():
+    import threading
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from api.auth_api import get_current_user_id
+    from api.specialist_api import router
+
+    threads = []
+    def export(filters, fmt, sort_by, sort_order):
+        threads.append(threading.current_thread())
+        return iter([b"a,b\n"]), "text/csv", "csv"
+
+    app = FastAPI()
+    app.include_router(router)
+    app.dependency_overrides[get_current_user_id] = lambda: 1
+    with patch.object(SpecialistService, "export_profession_versions", side_effect=export):
+        response = TestClient(app).get("/api/data/specialist/profession-versions/export?province=北京")
+    assert response.content == b"a,b\n"
+    # asyncio默认线程池的线程
+    assert threads and threads[0].name.startswith("asyncio")
@@ -0,0 +1,60 @@
+"""
+分面计数的单元测试
+"""
+import pytest
+from unittest.mock import patch, AsyncMock
+import os
+import sys
+
+# 添加项目根目录到系统路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from dao.facet_dao import college_facet_query, profession_version_facet_query
+from services.facet_service import FacetService
+
+# 测试每个分面排除自身的已选条件
+def test_college_facet_query():
+    sql, params = college_facet_query({"province_name": ["北京", "上海"], "features": ["985"]}, cn_name="大学")
+    assert params["province_name"] == ["北京", "上海"]
+    assert "positionCaseInsensitiveUTF8(cn_name" in sql
+    lines = {line.strip().split(" AS ")[-1].rstrip(","): line for line in sql.splitlines() if " AS " in line}
+    # 省份分面只受特色条件约束
+    assert "hasAny(features" in lines["facet_province_name"]
+    assert "province_name:Array(String)" not in lines["facet_province_name"]
+    # 未选中的分面受全部条件约束
+    assert "hasAny(features" in lines["facet_nature_type"]
+    assert "province_name:Array(String)" in lines["facet_nature_type"]
+    assert "countIf(" in lines["total"]
+    # 数组分面按行去重后计数
+    assert "sumMapIf(arrayDistinct(features), arrayWithConstant(length(arrayDistinct(features))" in lines["facet_features"]
+
+# 测试专业版本分面的名称筛选按子串匹配
+def test_profession_version_facet_query_contains():
+    sql, params = profession_version_facet_query({}, college_name="大学", profession_name="100%")
+    assert "LIKE" not in sql
+    assert "positionCaseInsensitiveUTF8(college_name" in sql
+    assert "positionCaseInsensitiveUTF8(profession_name" in sql
+    assert params["college_name"] == "大学" and params["profession_name"] == "100%"
+
+# 测试结果整理和按筛选签名缓存
+@pytest.mark.asyncio
+async def test_college_facets_cached():
+    FacetService.invalidate()
+    row = {
+        "total": 3,
+        "facet_province_name": (["北京", "上海", ""], [2, 5, 1]),
+        "facet_nature_type": (["public"], [3]),
+        "facet_categories": ([], []),
+        "facet_features": None,
+    }
+    with patch("dao.facet_dao.ClickHouseDB") as mock_db:
+        mock_db.execute_async = AsyncMock(return_value=[row])
+        result = await FacetService.get_college_facets(province_name=["北京"])
+        await FacetService.get_college_facets(province_name=["北京"])
+        assert mock_db.execute_async.call_count == 1
+        await FacetService.get_college_facets(province_name=["上海"])
+        assert mock_db.execute_async.call_count == 2
+    assert result["total"] == 3
+    assert result["facets"]["province_name"] == [{"value": "上海", "count": 5}, {"value": "北京", "count": 2}]
+    assert result["facets"]["features"] == []
+    FacetService.invalidate()
@@ -0,0 +1,67 @@
+"""
+JSON序列化工具和专家列表字段投影、透传的单元测试
+"""
+import pytest
+from unittest.mock import patch, AsyncMock
+from datetime import datetime
+import orjson
+import os
+import sys
+
+# 添加项目根目录到系统路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils import json_utils
+from dao.specialist_dao import SpecialistDAO
+
+BASE_FIELDS = {"dt": "2024-06-01T00:00:00", "file_name": "a.json", "province_name": "北京"}
+
+# 测试额外字段拼接到原对象末尾
+def test_merge_raw():
+    merged = orjson.dumps(json_utils.merge_raw('{"name": "张三", "age": 40}', BASE_FIELDS))
+    assert orjson.loads(merged) == {"name": "张三", "age": 40, **BASE_FIELDS}
+    assert orjson.dumps(json_utils.merge_raw(" {} ", BASE_FIELDS)) == orjson.dumps(BASE_FIELDS)
+    assert orjson.dumps(json_utils.merge_raw('{"a":1}', {})) == b'{"a":1}'
+
+# 测试原对象已有同名键时以额外字段为准，输出没有重复的键
+def test_merge_raw_overlapping_keys():
+    merged = orjson.dumps(json_utils.merge_raw('{"name": "张三", "province_name": "上海", "dt": null}', BASE_FIELDS))
+    assert merged.count(b'"province_name"') == 1
+    assert merged.count(b'"dt"') == 1
+    assert orjson.loads(merged) == {"name": "张三", **BASE_FIELDS}
+
+def records(rows):
+    return AsyncMock(side_effect=[[{"total": len(rows)}], rows])
+
+def base_row(**kwargs):
+    return {"dt": datetime(2024, 6, 1), "file_name": "a.json", "province_name": "北京", **kwargs}
+
+# 测试字段投影由ClickHouse提取，返回值只包含指定字段和基础字段
+@pytest.mark.asyncio
+async def test_get_specialists_fields():
+    with patch("dao.specialist_dao.ClickHouseDB") as mock_db:
+        mock_db.execute_async = records([base_row(field_0='"张三"', field_1="")])
+        result = await SpecialistDAO.get_specialists(fields=["name", "title"])
+        query, params = mock_db.execute_async.call_args.args
+    assert "JSONExtractRaw(record_value, {field_0:String}) AS field_0" in query
+    assert params["field_0"] == "name" and params["field_1"] == "title"
+    assert result["data"] == [{"name": "张三", "title": None, **BASE_FIELDS}]
+
+# 测试透传模式下合法行不解析，非法行仍按原逻辑返回解析错误
+@pytest.mark.asyncio
+async def test_get_specialists_raw():
+    rows = [
+        base_row(record_value='{"name": "张三"}', valid_json=True),
+        base_row(record_value="not json", valid_json=False),
+    ]
+    with patch("dao.specialist_dao.ClickHouseDB") as mock_db, \
+         patch("dao.specialist_dao.json_utils.loads", wraps=json_utils.loads) as mock_loads:
+        mock_db.execute_async = records(rows)
+        result = await SpecialistDAO.get_specialists(raw=True)
+        query, _ = mock_db.execute_async.call_args.args
+    assert "isValidJSON(record_value)" in query
+    assert isinstance(result["data"][0], orjson.Fragment)
+    assert orjson.loads(orjson.dumps(result["data"][0])) == {"name": "张三", **BASE_FIELDS}
+    assert "parse_error" in result["data"][1]
+    # 只有非法行在Python中解析
+    assert mock_loads.call_count == 1
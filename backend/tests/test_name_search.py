@@ -0,0 +1,55 @@
+"""
+名称检索索引的单元测试
+"""
+import time
+import pytest
+import os
+import sys
+
+# 添加项目根目录到系统路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from utils.search_utils import NameSearchIndex, MATCH_EXACT, MATCH_PREFIX, MATCH_SUBSTRING, MATCH_SUBSEQUENCE
+
+@pytest.fixture
+def index():
+    return NameSearchIndex(
+        [
+            {"code": "10006", "name": "北京航空航天大学", "short_name": "北航"},
+            {"code": "10001", "name": "北京大学", "short_name": "北大"},
+            {"code": "10003", "name": "清华大学", "short_name": ""},
+            {"code": "10287", "name": "南京航空航天大学", "short_name": "南航,南京航院"},
+        ],
+        aliases_field="short_name"
+    )
+
+def codes(results):
+    return [entry["code"] for _, entry in results]
+
+# 测试精确、别名、前缀、中缀和按顺序模糊匹配
+def test_search_match_types(index):
+    assert index.search("北京大学")[0] == (MATCH_EXACT, index.entries[0])
+    assert codes(index.search("北航"))[0] == "10006"
+    assert index.search("北航")[0][0] == MATCH_EXACT
+    assert codes(index.search("南京航院")) == ["10287"]
+    assert codes(index.search("北京")) == ["10001", "10006"]
+    assert index.search("北京")[0][0] == MATCH_PREFIX
+    assert {kind for kind, _ in index.search("航空航天")} == {MATCH_SUBSTRING}
+    assert index.search("清大")[0] == (MATCH_SUBSEQUENCE, index.entries[1])
+    assert index.search("复旦") == []
+    assert len(index.search("大学", limit=2)) == 2
+
+# 测试拼音检索
+def test_search_pinyin(index):
+    assert codes(index.search("beihang"))[0] == "10006"
+    assert codes(index.search("qhdx")) == ["10003"]
+    assert "10001" in codes(index.search("beijing"))
+
+# 测试联想在千条规模下的耗时
+def test_search_latency():
+    entries = [{"code": str(i), "name": f"第{i}大学"} for i in range(5000)]
+    index = NameSearchIndex(entries)
+    start = time.perf_counter()
+    for _ in range(100):
+        index.search("第12")
+    assert (time.perf_counter() - start) / 100 < 0.001
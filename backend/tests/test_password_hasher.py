@@ -0,0 +1,50 @@
+"""
+密码哈希服务的单元测试
+"""
+import hashlib
+import pytest
+from unittest.mock import patch, AsyncMock
+import os
+import sys
+
+# 添加项目根目录到系统路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services.password_hasher import PasswordHasher, hash_password, verify_password, needs_rehash
+from services.auth_service import AuthService
+
+# 测试加盐哈希和校验
+def test_hash_and_verify():
+    first = hash_password("secret")
+    second = hash_password("secret")
+    assert first != second
+    assert verify_password("secret", first)
+    assert not verify_password("wrong", first)
+    assert not needs_rehash(first)
+    assert not verify_password("secret", "garbage$1$2")
+
+# 测试兼容旧版SHA-256哈希
+def test_legacy_hash():
+    legacy = hashlib.sha256("secret".encode()).hexdigest()
+    assert verify_password("secret", legacy)
+    assert not verify_password("wrong", legacy)
+    assert needs_rehash(legacy)
+
+# 测试登录成功后升级旧版哈希
+@pytest.mark.asyncio
+async def test_authenticate_upgrades_legacy_hash():
+    legacy = hashlib.sha256("secret".encode()).hexdigest()
+    user = {"user_id": 1, "username": "u", "password_hash": legacy}
+    with patch("services.auth_service.AuthDAO") as mock_dao:
+        mock_dao.get_user_by_username = AsyncMock(return_value=dict(user))
+        mock_dao.update_user = AsyncMock()
+        result = await AuthService.authenticate("u", "secret")
+        assert result == {"user_id": 1, "username": "u"}
+        new_hash = mock_dao.update_user.call_args.kwargs["password_hash"]
+        assert new_hash.startswith(("scrypt$", "pbkdf2_sha256$"))
+        assert await PasswordHasher.verify("secret", new_hash)
+
+        mock_dao.update_user.reset_mock()
+        mock_dao.get_user_by_username = AsyncMock(return_value=dict(user))
+        assert await AuthService.authenticate("u", "wrong") is None
+        mock_dao.update_user.assert_not_called()
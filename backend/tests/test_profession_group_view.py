@@ -0,0 +1,67 @@
+"""
+专业组预聚合表的单元测试
+"""
+import pytest
+from unittest.mock import patch, AsyncMock
+import os
+import sys
+
+# 添加项目根目录到系统路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from dao import profession_group_view
+from dao.specialist_recommendation_dao import get_recommendation_groups
+from dao.specialist_schema import SPECIALIST_VERSION_TABLE
+
+async def run_recommendation(available):
+    with patch("dao.profession_group_view.ClickHouseDB") as mock_view_db, \
+         patch("dao.specialist_recommendation_dao.ClickHouseDB") as mock_db:
+        mock_view_db.has_column.return_value = available
+        mock_db.has_column.side_effect = lambda table, column: table == profession_group_view.PROFESSION_GROUP_TABLE
+        mock_db.execute_async = AsyncMock(return_value=[])
+        await get_recommendation_groups(rank=5000, province_name="北京", subjects=["物理"])
+        return mock_db.execute_async.call_args.args[0]
+
+# 测试预聚合表存在时自动改为读取预聚合表
+@pytest.mark.asyncio
+async def test_recommendation_source():
+    sql = await run_recommendation(available=False)
+    assert f"FROM {SPECIALIST_VERSION_TABLE}" in sql
+    assert "hasAll(subject_requirements_clean" in sql
+
+    sql = await run_recommendation(available=True)
+    assert f"FROM {profession_group_view.PROFESSION_GROUP_TABLE}" in sql
+    # 预聚合表带有选科位掩码
+    assert "bitAnd(subject_mask" in sql
+    assert "min(last_2_year_min_rank)" in sql
+
+# 测试建表、视图和回填使用同一个聚合查询
+def test_migration_statements():
+    statements = profession_group_view.migration_statements()
+    assert len(statements) == 3
+    select = profession_group_view.aggregate_select()
+    assert all(select in sql for sql in statements)
+    assert "AggregatingMergeTree" in statements[0]
+    assert "minSimpleState(last_1_year_min_rank)" in select
+
+# 测试全量重算写入临时表后交换，预聚合表不会被清空
+def test_rebuild_statements():
+    statements = profession_group_view.rebuild_statements()
+    table = profession_group_view.PROFESSION_GROUP_TABLE
+    staging = profession_group_view.PROFESSION_GROUP_STAGING_TABLE
+    assert not any(sql.startswith("TRUNCATE") for sql in statements)
+    assert not any(sql.startswith(f"INSERT INTO {table} ") for sql in statements)
+    insert = statements.index(f"INSERT INTO {staging} {profession_group_view.aggregate_select()}")
+    exchange = statements.index(f"EXCHANGE TABLES {table} AND {staging}")
+    assert insert < exchange
+    assert statements[-1] == f"DROP TABLE {staging}"
+
+    # 回填前临时表已有视图写入，交换后原视图写入旧表，先删除再由临时表的视图接替
+    view = profession_group_view.PROFESSION_GROUP_VIEW
+    staging_view = profession_group_view.PROFESSION_GROUP_STAGING_VIEW
+    create_staging_view = next(i for i, sql in enumerate(statements)
+                               if sql.startswith(f"CREATE MATERIALIZED VIEW IF NOT EXISTS {staging_view} TO {staging} "))
+    drop_view = statements.index(f"DROP VIEW IF EXISTS {view}")
+    rename_view = statements.index(f"RENAME TABLE {staging_view} TO {view}")
+    assert create_staging_view < insert and exchange < drop_view < rename_view < len(statements) - 1
+    assert not any(sql.startswith(f"CREATE MATERIALIZED VIEW IF NOT EXISTS {view} ") for sql in statements)
@@ -0,0 +1,58 @@
+"""
+用户档案缓存的单元测试
+"""
+import pytest
+from unittest.mock import patch, AsyncMock
+import os
+import sys
+
+# 添加项目根目录到系统路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services.profile_service import ProfileService
+
+PROFILE = {"user_id": 1, "province": "北京", "score": 600, "subject_choice": ["物理"], "requirement": "计算机"}
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    ProfileService.invalidate()
+    yield
+    ProfileService.invalidate()
+
+# 测试重复读取只查询一次数据库
+@pytest.mark.asyncio
+async def test_get_profile_cached():
+    with patch("services.profile_service.ProfileDAO") as mock_dao:
+        mock_dao.get_profile = AsyncMock(return_value=dict(PROFILE))
+        first = await ProfileService.get_profile(1)
+        first["score"] = 0
+        second = await ProfileService.get_profile(1)
+        assert mock_dao.get_profile.await_count == 1
+        assert second["score"] == 600
+
+# 测试更新需求后直接写入缓存
+@pytest.mark.asyncio
+async def test_update_requirement_write_through():
+    with patch("services.profile_service.ProfileDAO") as mock_dao:
+        mock_dao.get_profile = AsyncMock(return_value=dict(PROFILE))
+        mock_dao.update_profile = AsyncMock(return_value={**PROFILE, "requirement": "医学"})
+        await ProfileService.get_profile(1)
+        await ProfileService.update_requirement(1, "医学")
+        profile = await ProfileService.get_profile(1)
+        assert profile["requirement"] == "医学"
+        assert mock_dao.get_profile.await_count == 1
+
+# 测试缓存过期后重新读取，未找到的档案不缓存
+@pytest.mark.asyncio
+async def test_ttl_and_missing_profile():
+    with patch("services.profile_service.ProfileDAO") as mock_dao, \
+         patch.object(ProfileService, "CACHE_TTL", 0):
+        mock_dao.get_profile = AsyncMock(return_value=dict(PROFILE))
+        await ProfileService.get_profile(1)
+        await ProfileService.get_profile(1)
+        assert mock_dao.get_profile.await_count == 2
+    with patch("services.profile_service.ProfileDAO") as mock_dao:
+        mock_dao.get_profile = AsyncMock(return_value=None)
+        assert await ProfileService.get_profile(2) is None
+        assert await ProfileService.get_profile(2) is None
+        assert mock_dao.get_profile.await_count == 2
@@ -0,0 +1,66 @@
+"""
+ClickHouse查询构造器的单元测试
+"""
+import pytest
+from unittest.mock import patch, AsyncMock
+import os
+import sys
+
+# 添加项目根目录到系统路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from dao.query_builder import QueryBuilder, identifier, string_literal, cache_key
+from dao.specialist_dao import SpecialistDAO
+from dao.profession_dao import ProfessionDAO
+
+# 测试IN列表参数化后SQL文本与取值无关
+def test_isin_stable_sql():
+    a = QueryBuilder().isin("province_name", ["北京"])
+    b = QueryBuilder().isin("province_name", ["北京", "上海", "广东"])
+    assert a.where_sql() == b.where_sql() == "WHERE has({province_name:Array(String)}, province_name)"
+    assert b.params == {"province_name": ["北京", "上海", "广东"]}
+    assert cache_key(a.where_sql(), a.params) != cache_key(b.where_sql(), b.params)
+
+# 测试同名参数、HAVING和分页
+def test_builder_params():
+    q = QueryBuilder().eq("code", "1").eq("code", "2").between("rank", 1, 9, having=True)
+    assert q.where_sql() == "WHERE code = {code:String} AND code = {code_1:String}"
+    assert q.having_sql() == "HAVING rank BETWEEN {rank_min:Int64} AND {rank_max:Int64}"
+    assert q.limit_sql(10, 20) == "LIMIT {limit:UInt64} OFFSET {offset:UInt64}"
+    assert q.params["offset"] == 20
+
+# 测试标识符校验和字符串转义
+def test_identifier_and_literal():
+    assert identifier("qihang.dwd_youzy_college_info") == "qihang.dwd_youzy_college_info"
+    with pytest.raises(ValueError):
+        identifier("name; DROP TABLE x")
+    assert string_literal("a'b\\c") == "'a\\'b\\\\c'"
+
+# 测试get_college_list不再把筛选值拼进SQL
+@pytest.mark.asyncio
+async def test_college_list_parameterized():
+    with patch("dao.specialist_dao.ClickHouseDB") as mock_db:
+        mock_db.execute_async = AsyncMock(return_value=[{"total": 0}])
+        await SpecialistDAO.get_college_list(province_name=["北京", "x') OR 1=1 --"], nature_type=["public"])
+        for call in mock_db.execute_async.call_args_list:
+            sql, params = call.args
+            assert "北京" not in sql and "OR 1=1" not in sql
+            assert params["province_name"] == ["北京", "x') OR 1=1 --"]
+            assert "has({nature_type:Array(String)}, nature_type)" in sql
+
+# 测试模糊搜索不受%和_影响，整数列按列类型绑定参数
+@pytest.mark.asyncio
+async def test_filters_contains_and_typed():
+    q, _ = SpecialistDAO._profession_version_filters({"college_name": "100%_大学", "bus_year": 2024})
+    assert "LIKE" not in q.where_sql()
+    assert "positionCaseInsensitiveUTF8(college_name, {college_name:String}) > 0" in q.where_sql()
+    assert "bus_year = {bus_year:UInt16}" in q.where_sql()
+    assert q.params == {"college_name": "100%_大学", "bus_year": 2024}
+
+    with patch("dao.profession_dao.ClickHouseDB") as mock_db:
+        mock_db.get_sorting_key.return_value = []
+        mock_db.execute_async = AsyncMock(return_value=[{"total": 0}])
+        await ProfessionDAO.get_profession_list(filters={"establishment_year": 2012, "degree_category": "工学"})
+        sql, params = mock_db.execute_async.call_args_list[0].args
+    assert "establishment_year = {establishment_year:UInt16}" in sql
+    assert "degree_category = {degree_category:String}" in sql
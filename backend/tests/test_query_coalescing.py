@@ -0,0 +1,99 @@
+"""
+ClickHouse相同查询合并的单元测试
+"""
+import asyncio
+import threading
+import time
+import pytest
+from unittest.mock import patch
+import os
+import sys
+
+# 添加项目根目录到系统路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from dao.clickhouse_db import ClickHouseDB
+
+def slow_execute(calls, delay=0.05, error=None):
+    def _execute(query, params, array_columns, settings):
+        calls.append((query, params))
+        time.sleep(delay)
+        if error:
+            raise error
+        return [{"code": params.get("code"), "categories": ["985"]}]
+    return _execute
+
+# 测试多个线程的相同查询只执行一次，结果互不影响
+def test_execute_coalesces_threads():
+    calls = []
+    results = []
+    with patch.object(ClickHouseDB, "_execute", side_effect=slow_execute(calls)):
+        before = ClickHouseDB.get_query_stats()
+        threads = [threading.Thread(target=lambda: results.append(ClickHouseDB.execute("SELECT {code:String}", {"code": "1"})))
+                   for _ in range(5)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        stats = ClickHouseDB.get_query_stats()
+    assert len(calls) == 1
+    assert stats["coalesced"] - before["coalesced"] == 4
+    assert all(r == [{"code": "1", "categories": ["985"]}] for r in results)
+    # 先发起的调用和等待者各自拿到副本
+    assert len({id(r[0]) for r in results}) == len(results)
+    results[0][0]["code"] = "changed"
+    results[0][0]["categories"].append("211")
+    assert results[1][0] == {"code": "1", "categories": ["985"]}
+
+# 测试参数不同的查询分别执行，错误传递给所有等待者
+def test_execute_distinct_params_and_errors():
+    calls = []
+    with patch.object(ClickHouseDB, "_execute", side_effect=slow_execute(calls, delay=0)):
+        ClickHouseDB.execute("SELECT {code:String}", {"code": "1"})
+        ClickHouseDB.execute("SELECT {code:String}", {"code": "2"})
+    assert len(calls) == 2
+
+    errors = []
+    def run():
+        try:
+            ClickHouseDB.execute("SELECT fail", {})
+        except Exception as e:
+            errors.append(str(e))
+    with patch.object(ClickHouseDB, "_execute", side_effect=slow_execute([], error=Exception("执行查询失败"))):
+        threads = [threading.Thread(target=run) for _ in range(3)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+    assert errors == ["执行查询失败"] * 3
+
+# 测试同一事件循环内的相同查询只提交一次
+@pytest.mark.asyncio
+async def test_execute_async_coalesces():
+    calls = []
+    with patch.object(ClickHouseDB, "_execute", side_effect=slow_execute(calls)):
+        results = await asyncio.gather(*[ClickHouseDB.execute_async("SELECT {code:String}", {"code": "1"})
+                                         for _ in range(10)])
+    assert len(calls) == 1
+    assert all(r[0]["code"] == "1" for r in results)
+    assert len({id(r[0]) for r in results}) == len(results)
+    assert not ClickHouseDB._inflight and not ClickHouseDB._inflight_async
+
+# 测试DDL和INSERT等非只读语句不合并，每次调用都执行
+@pytest.mark.asyncio
+async def test_write_statements_not_coalesced():
+    assert ClickHouseDB.is_read_query("  -- 注释\n with t AS (SELECT 1) SELECT * FROM t")
+    assert ClickHouseDB.is_read_query("/* x */ select 1")
+    assert not ClickHouseDB.is_read_query("INSERT INTO t SELECT 1")
+    assert not ClickHouseDB.is_read_query("ALTER TABLE t MATERIALIZE COLUMN c")
+
+    calls = []
+    sql = "INSERT INTO t SELECT {code:String}"
+    with patch.object(ClickHouseDB, "_execute", side_effect=slow_execute(calls)):
+        threads = [threading.Thread(target=ClickHouseDB.execute, args=(sql, {"code": "1"})) for _ in range(3)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        await asyncio.gather(*[ClickHouseDB.execute_async(sql, {"code": "1"}) for _ in range(3)])
+    assert len(calls) == 6
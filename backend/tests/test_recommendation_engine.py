@@ -0,0 +1,138 @@
+"""
+进程内推荐引擎的单元测试
+"""
+import asyncio
+import pytest
+from unittest.mock import patch
+import os
+import sys
+
+# 添加项目根目录到系统路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services.recommendation_engine import RecommendationEngine
+
+def make_group(code, rank_1, rank_2, rank_3, subjects):
+    return {
+        "college_code": code,
+        "college_name": f"大学{code}",
+        "profession_group_code": "01",
+        "profession_group_plan_num": 10,
+        "subject_requirements": "+".join(subjects) or "不限",
+        "college_tags": "",
+        "city_level": "一线",
+        "subject_requirements_clean": subjects,
+        "last_1_year_min_rank": rank_1,
+        "last_1_year_min_score": 600,
+        "last_2_year_min_rank": rank_2,
+        "last_2_year_min_score": 600,
+        "last_3_year_min_rank": rank_3,
+        "last_3_year_min_score": 600,
+    }
+
+# 模拟专业组快照
+@pytest.fixture
+def mock_groups():
+    return [
+        make_group("A", 4000, 4200, 4100, ["物理", "化学"]),
+        make_group("B", 9000, 9500, 9800, ["物理"]),
+        make_group("C", 14000, 15000, 16000, []),
+        make_group("D", 30000, 31000, 29000, ["物理"]),
+        make_group("E", 10000, None, None, ["历史"]),
+    ]
+
+@pytest.fixture
+def engine(mock_groups):
+    RecommendationEngine.invalidate()
+    with patch("services.recommendation_engine.get_profession_group_snapshot") as mock_snapshot:
+        mock_snapshot.side_effect = lambda province_name: [dict(g) for g in mock_groups]
+        yield mock_snapshot
+    RecommendationEngine.invalidate()
+
+# 测试位次窗口和选科筛选与SQL语义一致
+def test_recommend_filters(engine):
+    result = RecommendationEngine.recommend("北京", rank=5000)
+    assert [g["college_code"] for g in result] == ["A", "B", "C"]
+
+    result = RecommendationEngine.recommend("北京", rank=5000, subjects=["物理"])
+    assert [g["college_code"] for g in result] == ["A", "B"]
+
+    result = RecommendationEngine.recommend("北京", subjects=["物理", "化学"])
+    assert [g["college_code"] for g in result] == ["A"]
+
+    # 快照只加载一次
+    engine.assert_called_once_with("北京")
+
+# 测试返回条数限制且不泄露内部字段
+def test_recommend_limit(engine):
+    result = RecommendationEngine.recommend("北京", limit=2)
+    assert len(result) == 2
+    assert "subject_requirements_clean" not in result[0]
+
+# 测试冲/稳/保分档和每档条数
+def test_recommend_tiered(engine):
+    result = RecommendationEngine.recommend_tiered("北京", rank=10000, k=1)
+
+    assert set(result.keys()) == {"冲", "稳", "保"}
+    assert all(len(groups) <= 1 for groups in result.values())
+    # 历年最低位次约9500的专业组对位次10000的考生是冲
+    assert result["冲"][0]["college_code"] == "B"
+    # 历年最低位次约15000的专业组对位次10000的考生是保
+    assert result["保"][0]["college_code"] == "C"
+    for tier, groups in result.items():
+        for group in groups:
+            assert group["tier"] == tier
+            assert 0 <= group["admission_probability"] <= 1
+
+# 测试按考生选科筛选可报考的专业组
+def test_recommend_tiered_eligible(engine):
+    result = RecommendationEngine.recommend_tiered("北京", rank=10000, k=10, eligible_subjects=["物理", "生物", "地理"])
+    codes = {g["college_code"] for groups in result.values() for g in groups}
+    # A要求物理+化学，E要求历史，考生不能报考
+    assert "A" not in codes
+    assert "E" not in codes
+    assert {"B", "C"} <= codes
+
+# 测试选科要求含位掩码无法表示的科目时，按集合判断能否报考
+def test_eligible_with_unencodable_subjects():
+    RecommendationEngine.invalidate()
+    groups = [
+        make_group("T", 9000, 9500, 9800, ["物理", "技术"]),
+        make_group("P", 9000, 9500, 9800, ["物理"]),
+    ]
+    with patch("services.recommendation_engine.get_profession_group_snapshot", return_value=groups):
+        snapshot = RecommendationEngine.get_snapshot("浙江")
+        assert list(snapshot.select(eligible_subjects=["物理", "化学", "生物"])) == [1]
+        assert list(snapshot.select(eligible_subjects=["物理", "技术", "生物"])) == [0, 1]
+    RecommendationEngine.invalidate()
+
+# 测试后台刷新全部已加载省份，单个省份失败不影响其他省份
+@pytest.mark.asyncio
+async def test_refresh_loop(mock_groups):
+    RecommendationEngine.invalidate()
+    with patch("services.recommendation_engine.get_profession_group_snapshot", return_value=mock_groups):
+        RecommendationEngine.get_snapshot("北京")
+        RecommendationEngine.get_snapshot("上海")
+    loaded_at = RecommendationEngine.get_snapshot("上海").loaded_at
+
+    def snapshot(province_name):
+        if province_name == "北京":
+            raise ConnectionError("timeout")
+        return mock_groups
+
+    sleeps = []
+
+    async def sleep(seconds):
+        # 第二次等待时模拟服务关闭取消任务
+        sleeps.append(seconds)
+        if len(sleeps) > 1:
+            raise asyncio.CancelledError()
+
+    with patch("services.recommendation_engine.get_profession_group_snapshot", side_effect=snapshot), \
+         patch("services.recommendation_engine.asyncio.sleep", sleep):
+        with pytest.raises(asyncio.CancelledError):
+            await RecommendationEngine.run_refresh_loop()
+    assert sleeps[0] == RecommendationEngine.REFRESH_INTERVAL / 2
+    assert RecommendationEngine.get_snapshot("上海").loaded_at > loaded_at
+    assert len(RecommendationEngine.get_snapshot("北京")) == len(mock_groups)
+    RecommendationEngine.invalidate()
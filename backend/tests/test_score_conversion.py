@@ -0,0 +1,71 @@
+"""
+跨年份等位分转换表的单元测试
+"""
+import pytest
+import numpy as np
+import json
+import os
+import sys
+
+# 添加项目根目录到系统路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services.score_rank_index import ScoreRankTable
+from services.score_conversion import ScoreConversion, build_rank_matrix, build_conversion_matrix
+
+# 模拟两年的一分一段数据，2023年同位次分数比2024年低10分
+@pytest.fixture
+def mock_tables():
+    def segments(offset):
+        return [
+            {"minScore": s - offset, "maxScore": s - offset, "sameCount": 10,
+             "lowestRank": (700 - s + 1) * 10, "highestRank": (700 - s) * 10 + 1}
+            for s in range(600, 701)
+        ]
+    return [
+        ScoreRankTable("北京", 2023, "本科", segments(10)),
+        ScoreRankTable("北京", 2024, "本科", segments(0)),
+    ]
+
+# 测试转换矩阵
+def test_build_conversion_matrix(mock_tables):
+    ranks = build_rank_matrix(mock_tables, 590, 700)
+    conv = build_conversion_matrix(ranks, 590)
+
+    assert conv.shape == (2, 2, 111)
+    # 同一年份转换为自身
+    assert conv[1, 1, 650 - 590] == 650
+    # 2024年650分对应2023年640分，反之亦然
+    assert conv[1, 0, 650 - 590] == 640
+    assert conv[0, 1, 640 - 590] == 650
+
+# 测试从磁盘mmap加载后查询
+def test_load_and_convert(mock_tables, tmp_path):
+    ranks = build_rank_matrix(mock_tables, 590, 700)
+    np.save(tmp_path / "北京_本科.rank.npy", ranks)
+    np.save(tmp_path / "北京_本科.conv.npy", build_conversion_matrix(ranks, 590))
+    manifest = {"tables": {"北京|本科": {"prefix": "北京_本科", "years": [2023, 2024], "score_min": 590, "score_max": 700}}}
+    (tmp_path / "manifest.json").write_text(json.dumps(manifest, ensure_ascii=False), encoding="utf-8")
+
+    assert ScoreConversion.load(str(tmp_path))
+    assert ScoreConversion.convert("北京", "本科", [650, 660.5], 2024, 2023).tolist() == [640, 650]
+    assert ScoreConversion.rank_of("北京", "本科", 650, 2024).tolist() == [510]
+    assert ScoreConversion.convert("北京", "本科", 650, 2024, 2020) is None
+    assert ScoreConversion.convert("上海", "本科", 650, 2024, 2023) is None
+
+# 测试默认目录与工作目录无关，重新加载时丢弃已打开的数组
+def test_reload_resets_tables(mock_tables, tmp_path):
+    from services import score_conversion
+    assert os.path.isabs(score_conversion.DATA_DIR)
+    assert score_conversion.DATA_DIR.startswith(score_conversion.BACKEND_DIR)
+
+    ranks = build_rank_matrix(mock_tables, 590, 700)
+    np.save(tmp_path / "北京_本科.rank.npy", ranks)
+    np.save(tmp_path / "北京_本科.conv.npy", build_conversion_matrix(ranks, 590))
+    manifest = {"tables": {"北京|本科": {"prefix": "北京_本科", "years": [2023, 2024], "score_min": 590, "score_max": 700}}}
+    (tmp_path / "manifest.json").write_text(json.dumps(manifest, ensure_ascii=False), encoding="utf-8")
+    assert ScoreConversion.load(str(tmp_path))
+    assert ScoreConversion.years("北京", "本科") == [2023, 2024]
+
+    assert not ScoreConversion.load(str(tmp_path / "missing"))
+    assert ScoreConversion.years("北京", "本科") == []
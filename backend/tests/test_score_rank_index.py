@@ -0,0 +1,125 @@
+"""
+一分一段表索引的单元测试
+"""
+import pytest
+from unittest.mock import patch, AsyncMock
+import os
+import sys
+
+# 添加项目根目录到系统路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from services.score_rank_index import ScoreRankTable, ScoreRankIndex
+
+# 模拟一分一段数据，650-659分段之间留有空隙
+@pytest.fixture
+def mock_ranks_data():
+    return [
+        {"minScore": 690, "maxScore": 750, "sameCount": 120, "lowestRank": 120, "highestRank": 1},
+        {"minScore": 680, "maxScore": 689, "sameCount": 300, "lowestRank": 420, "highestRank": 121},
+        {"minScore": 660, "maxScore": 679, "sameCount": 900, "lowestRank": 1320, "highestRank": 421},
+        {"minScore": 640, "maxScore": 649, "sameCount": 1500, "lowestRank": 2820, "highestRank": 1321},
+    ]
+
+def reference_rank(ranks_data, score):
+    """原/equivalent-rank接口中的查找逻辑，用于对照"""
+    sorted_data = sorted(ranks_data, key=lambda x: x["minScore"], reverse=True)
+    if score > sorted_data[0]["maxScore"]:
+        return sorted_data[0]["lowestRank"]
+    if score < sorted_data[-1]["minScore"]:
+        return sorted_data[-1]["highestRank"] + 1
+    left, right = 0, len(sorted_data) - 1
+    while left <= right:
+        mid = (left + right) // 2
+        current = sorted_data[mid]
+        if current["minScore"] <= score <= current["maxScore"]:
+            return current["lowestRank"]
+        if score > current["maxScore"]:
+            right = mid - 1
+        else:
+            left = mid + 1
+    if left > 0:
+        return sorted_data[left - 1]["lowestRank"]
+    return sorted_data[-1]["highestRank"] + 1
+
+# 测试批量查找与原逻辑一致
+def test_ranks_match_reference(mock_ranks_data):
+    table = ScoreRankTable("北京", 2024, "本科", mock_ranks_data)
+    scores = [x / 2 for x in range(1200, 1560)]
+    ranks = table.ranks(scores)
+    for score, rank in zip(scores, ranks):
+        assert rank == reference_rank(mock_ranks_data, score), score
+
+# 测试边界情况
+def test_equivalent_rank_boundaries(mock_ranks_data):
+    table = ScoreRankTable("北京", 2024, "本科", mock_ranks_data)
+
+    # 高于最高分数段
+    result = table.equivalent_rank(760)
+    assert result["rank"] == 120
+    assert result["score_range"] == {"min": 690, "max": 750}
+    assert all(type(v) is int for v in result["score_range"].values())
+
+    # 低于最低分数段
+    result = table.equivalent_rank(600)
+    assert result["rank"] == 1322
+    assert result["same_count"] == 1500
+
+    # 落在空隙中取较高的分数段
+    result = table.equivalent_rank(655)
+    assert result["rank"] == 1320
+
+# 测试缓存命中时不再访问数据库
+@pytest.mark.asyncio
+async def test_index_caches_table(mock_ranks_data):
+    ScoreRankIndex.invalidate()
+    with patch("services.score_rank_index.SpecialistDAO.get_score_rank", new_callable=AsyncMock) as mock_get, \
+            patch.object(ScoreRankIndex, "data_version", AsyncMock(return_value="v1")):
+        mock_get.return_value = {"data": mock_ranks_data, "province_name": "北京", "batch": "本科"}
+
+        first = await ScoreRankIndex.equivalent_rank("北京", 2024, "本科", 685)
+        second = await ScoreRankIndex.equivalent_rank("北京", 2024, "本科", 665)
+
+        assert first["rank"] == 420
+        assert second["rank"] == 1320
+        mock_get.assert_called_once()
+
+        # 失效后重新加载
+        ScoreRankIndex.invalidate(province_name="北京")
+        await ScoreRankIndex.equivalent_rank("北京", 2024, "本科", 665)
+        assert mock_get.call_count == 2
+    ScoreRankIndex.invalidate()
+
+# 测试批量计算多个年份，每个年份只加载一次
+@pytest.mark.asyncio
+async def test_batch_ranks(mock_ranks_data):
+    ScoreRankIndex.invalidate()
+    with patch("services.score_rank_index.SpecialistDAO.get_score_rank", new_callable=AsyncMock) as mock_get, \
+            patch.object(ScoreRankIndex, "data_version", AsyncMock(return_value="v1")):
+        mock_get.side_effect = lambda province_name, year, batch: (
+            {"data": mock_ranks_data, "province_name": province_name, "batch": batch} if year == 2024 else None
+        )
+
+        result = await ScoreRankIndex.batch_ranks("北京", "本科", [700, 685, 600], [2024, 2023, 2024])
+
+        assert result == {2024: [120, 420, 1322], 2023: None}
+        assert mock_get.call_count == 2
+    ScoreRankIndex.invalidate()
+
+# 测试过期后检查数据版本走execute_async，版本未变时续期不重新加载
+@pytest.mark.asyncio
+async def test_version_check_async(mock_ranks_data):
+    ScoreRankIndex.invalidate()
+    with patch("services.score_rank_index.SpecialistDAO.get_score_rank", new_callable=AsyncMock) as mock_get, \
+            patch("services.score_rank_index.ClickHouseDB") as mock_db:
+        mock_get.return_value = {"data": mock_ranks_data, "province_name": "北京", "batch": "本科"}
+        mock_db.execute_async = AsyncMock(return_value=[{"version": "v1"}])
+        await ScoreRankIndex.get_table("北京", 2024, "本科")
+        loaded_at, version, table = ScoreRankIndex._tables[("北京", 2024, "本科")]
+        ScoreRankIndex._tables[("北京", 2024, "本科")] = (loaded_at - ScoreRankIndex.TTL, version, table)
+
+        assert await ScoreRankIndex.get_table("北京", 2024, "本科") is table
+        assert mock_db.execute_async.await_count == 2
+        mock_db.execute.assert_not_called()
+        mock_get.assert_called_once()
+    ScoreRankIndex.invalidate()
@@ -0,0 +1,62 @@
+"""
+排序规划器的单元测试
+"""
+import pytest
+from unittest.mock import patch
+import os
+import sys
+
+# 添加项目根目录到系统路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from dao.sort_planner import SortPlanner
+
+@pytest.fixture
+def planner():
+    with patch("dao.sort_planner.ClickHouseDB") as mock_db:
+        mock_db.get_sorting_key.return_value = ["province", "bus_year", "college_code"]
+        yield SortPlanner(
+            "t",
+            fields={"bus_year": "bus_year", "college_code": "college_code", "tuition": "tuition"},
+            default=[("bus_year", "DESC"), ("college_code", "ASC")],
+            late_materialize=True
+        )
+
+# 测试不在白名单中的字段被拒绝
+def test_plan_rejects_unknown(planner):
+    with pytest.raises(ValueError):
+        planner.plan("college_tags")
+    with pytest.raises(ValueError):
+        planner.plan("bus_year; DROP TABLE t")
+
+# 测试排序键前缀被等值条件固定时按存储顺序读取
+def test_plan_read_in_order(planner):
+    plan = planner.plan(None, fixed_columns=["province"])
+    assert plan.order_by_sql == "ORDER BY bus_year DESC, college_code ASC"
+    assert plan.read_in_order and not plan.late_materialize
+
+    plan = planner.plan("college_code", "asc", fixed_columns=["province", "bus_year"])
+    assert plan.order_by_sql == "ORDER BY college_code ASC"
+    assert plan.read_in_order
+
+# 测试默认排序和小结果集不走延迟物化
+def test_plan_default_sort_single_pass(planner):
+    plan = planner.plan(None, total_rows=10 ** 7)
+    assert not plan.read_in_order and not plan.late_materialize
+
+    plan = planner.plan("tuition", "DESC", total_rows=100)
+    assert not plan.late_materialize
+    plan = planner.plan("tuition", "DESC")
+    assert not plan.late_materialize
+
+# 测试显式按非排序键字段排序大结果集时走延迟物化
+def test_plan_late_materialize(planner):
+    rows = SortPlanner.LATE_MATERIALIZE_MIN_ROWS
+    plan = planner.plan("bus_year", "DESC", total_rows=rows)
+    assert not plan.read_in_order and plan.late_materialize
+
+    plan = planner.plan("tuition", "DESC", fixed_columns=["province"], total_rows=rows)
+    assert plan.late_materialize
+    sql = planner.top_n_query("a, b", "WHERE x = {x:String}", plan, "LIMIT 10")
+    assert "SELECT _part, _part_offset" in sql
+    assert sql.count("ORDER BY tuition DESC") == 2
@@ -0,0 +1,59 @@
+"""
+专家宽表JSON字段物化列的单元测试
+"""
+import pytest
+from unittest.mock import patch
+import os
+import sys
+
+# 添加项目根目录到系统路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from dao import specialist_schema
+from dao.specialist_schema import SPECIALIST_TABLE, json_field_expr, promoted_column, migration_statements
+
+def has_columns(*columns):
+    return patch("dao.specialist_schema.ClickHouseDB.has_column",
+                 side_effect=lambda table, column: table == SPECIALIST_TABLE and column in columns)
+
+# 测试已登记且迁移完成的字段改写为物化列
+def test_promoted_key():
+    with has_columns("json_name"):
+        assert promoted_column("name") == "json_name"
+        assert json_field_expr("name") == "json_name"
+        # 已登记但列还不存在时仍从JSON读取
+        assert promoted_column("id") is None
+        assert json_field_expr("id") == "JSONExtractString(record_value, 'id')"
+
+# 测试未登记的字段和非record_value来源不改写
+def test_non_promoted_key():
+    with has_columns("json_name"):
+        assert promoted_column("title") is None
+        assert json_field_expr("title") == "JSONExtractString(record_value, 'title')"
+        assert json_field_expr("name", source="JSONExtractRaw(record_value, 'info')") == \
+            "JSONExtractString(JSONExtractRaw(record_value, 'info'), 'name')"
+
+# 测试字段名中的引号被转义
+def test_key_quoting():
+    with has_columns():
+        assert json_field_expr("it's") == "JSONExtractString(record_value, 'it\\'s')"
+    with patch.dict(specialist_schema.PROMOTED_JSON_KEYS, {"it's": {"column": "json_its", "index": None}}):
+        statements = migration_statements(["it's"])
+    assert statements[0].endswith("MATERIALIZED JSONExtractString(record_value, 'it\\'s')")
+
+# 测试迁移语句：加列、回填，有索引定义时建索引并回填
+def test_migration_statements():
+    statements = migration_statements(["name"])
+    assert statements == [
+        f"ALTER TABLE {SPECIALIST_TABLE} ADD COLUMN IF NOT EXISTS json_name String "
+        f"MATERIALIZED JSONExtractString(record_value, 'name')",
+        f"ALTER TABLE {SPECIALIST_TABLE} MATERIALIZE COLUMN json_name",
+        f"ALTER TABLE {SPECIALIST_TABLE} ADD INDEX IF NOT EXISTS idx_json_name json_name "
+        f"TYPE bloom_filter(0.01) GRANULARITY 4",
+        f"ALTER TABLE {SPECIALIST_TABLE} MATERIALIZE INDEX idx_json_name",
+    ]
+    assert len(migration_statements()) == 4 * len(specialist_schema.PROMOTED_JSON_KEYS)
+    with patch.dict(specialist_schema.PROMOTED_JSON_KEYS, {"title": {"column": "json_title", "index": None}}):
+        assert len(migration_statements(["title"])) == 2
+    with pytest.raises(ValueError):
+        migration_statements(["unknown"])
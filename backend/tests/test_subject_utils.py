@@ -0,0 +1,86 @@
+"""
+选科位掩码编码的单元测试
+"""
+import pytest
+import re
+import os
+import sys
+
+# 添加项目根目录到系统路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from unittest.mock import patch
+from dao.clickhouse_db import ClickHouseDB
+from dao.specialist_dao import SpecialistDAO
+from utils.subject_utils import (
+    encode_subjects, parse_requirement, decode_mask, contains_all, is_either_of,
+    clickhouse_mask_expr, UNKNOWN_SUBJECT_BIT
+)
+
+# 测试科目编码
+def test_encode_subjects():
+    assert encode_subjects([]) == 0
+    assert encode_subjects(["物理", "化学"]) == encode_subjects(["化学", "物理"])
+    assert encode_subjects(["思想政治"]) == encode_subjects(["政治"])
+    assert encode_subjects(["物理", "技术"]) is None
+    assert encode_subjects(["物理", "技术"], strict=False) == encode_subjects(["物理"]) | UNKNOWN_SUBJECT_BIT
+    assert encode_subjects(["不限"], strict=False) == 0
+    assert decode_mask(encode_subjects(["历史", "地理"])) == ["历史", "地理"]
+
+# 测试选科要求字符串解析
+@pytest.mark.parametrize("text,expected", [
+    ("物理+化学", ["物理", "化学"]),
+    ("化学、物理", ["物理", "化学"]),
+    ("物理", ["物理"]),
+    ("不限", []),
+])
+def test_parse_requirement(text, expected):
+    assert parse_requirement(text) == encode_subjects(expected)
+
+def test_parse_requirement_unknown():
+    assert parse_requirement("首选物理，再选化学(2科必选)") is None
+    assert parse_requirement(None) is None
+
+# 测试与hasAll语义一致
+def test_contains_all():
+    requirement = encode_subjects(["物理", "化学", "生物"])
+    assert contains_all(requirement, encode_subjects(["物理", "化学"]))
+    assert contains_all(requirement, 0)
+    assert not contains_all(requirement, encode_subjects(["物理", "历史"]))
+
+# 测试"任选其一"的写法不编码为位掩码
+@pytest.mark.parametrize("text", ["物理/化学", "物理／化学", "物理或化学"])
+def test_parse_requirement_either_of(text):
+    assert is_either_of(text)
+    assert parse_requirement(text) is None
+    assert not is_either_of("物理和化学")
+    assert parse_requirement("物理和化学") == encode_subjects(["物理", "化学"])
+
+# 测试专业版本的选科筛选："全部要求"按位掩码并排除"任选其一"的行，"任选其一"按字符串相等
+def test_subject_requirement_filters():
+    with patch.object(ClickHouseDB, "has_column", return_value=True):
+        q, _ = SpecialistDAO._profession_version_filters({"subject_requirements": "化学+物理"})
+        sql = q.where_sql()
+        assert "subject_mask = {subject_mask:UInt16}" in sql
+        assert "NOT match(subject_requirements, {either_of:String})" in sql
+        assert q.params["subject_mask"] == encode_subjects(["物理", "化学"])
+        assert re.search(q.params["either_of"], "物理/化学")
+        assert not re.search(q.params["either_of"], "物理+化学")
+
+        q, _ = SpecialistDAO._profession_version_filters({"subject_requirements": "物理/化学"})
+        assert q.where_sql() == "WHERE subject_requirements = {subject_requirements:String}"
+        assert q.params["subject_requirements"] == "物理/化学"
+
+# 测试含有技术等无法识别科目的行与只含已知科目的筛选值掩码不同
+def test_unknown_subject_row_not_matched():
+    row_mask = encode_subjects(["物理", "技术"], strict=False)
+    assert row_mask != parse_requirement("物理")
+    assert encode_subjects(["技术"], strict=False) != parse_requirement("不限")
+    # 含有技术的筛选值不能编码，改为按字符串相等
+    assert parse_requirement("物理+技术") is None
+    # 按位与的"包含全部科目"语义不受保留位影响
+    assert contains_all(row_mask, encode_subjects(["物理"]))
+
+    expr = clickhouse_mask_expr("subject_requirements_clean")
+    assert f"{UNKNOWN_SUBJECT_BIT}, 0)" in expr
+    assert "arrayExists(s -> NOT has(" in expr
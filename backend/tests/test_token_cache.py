@@ -0,0 +1,82 @@
+"""
+令牌验证缓存的单元测试
+"""
+import time
+import pytest
+from datetime import timedelta
+from unittest.mock import patch
+from fastapi import HTTPException
+import os
+import sys
+
+# 添加项目根目录到系统路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from api.auth_api import get_current_user_id, create_access_token
+from services.token_cache import TokenCache
+
+@pytest.fixture(autouse=True)
+def clear_cache():
+    TokenCache.clear()
+    yield
+    TokenCache.clear()
+
+# 测试重复请求不再验证签名
+@pytest.mark.asyncio
+async def test_repeat_request_skips_decode():
+    token = create_access_token({"user_id": 7})
+    assert await get_current_user_id(token) == 7
+    with patch("api.auth_api.jwt.decode") as mock_decode:
+        assert await get_current_user_id(token) == 7
+        mock_decode.assert_not_called()
+
+# 测试过期令牌不从缓存返回
+@pytest.mark.asyncio
+async def test_expired_entry_not_served():
+    token = create_access_token({"user_id": 7}, timedelta(seconds=-1))
+    TokenCache.put(token, 7, time.time() - 1)
+    with pytest.raises(HTTPException) as exc:
+        await get_current_user_id(token)
+    assert exc.value.detail == "令牌已过期"
+
+# 测试注销单个令牌和吊销用户的全部令牌
+@pytest.mark.asyncio
+async def test_revocation():
+    token = create_access_token({"user_id": 7})
+    other = create_access_token({"user_id": 8})
+    await get_current_user_id(token)
+    TokenCache.revoke(token, time.time() + 60)
+    with pytest.raises(HTTPException) as exc:
+        await get_current_user_id(token)
+    assert exc.value.detail == "令牌已注销"
+    assert await get_current_user_id(other) == 8
+    with patch("services.token_cache.time.time", return_value=time.time() + 1):
+        TokenCache.revoke_user(8)
+    with pytest.raises(HTTPException):
+        await get_current_user_id(other)
+
+# 测试吊销前同一秒内签发的令牌失效，吊销后重新登录签发的令牌有效
+@pytest.mark.asyncio
+async def test_revoke_user_same_second():
+    now = int(time.time())
+    with patch("api.auth_api.time.time", return_value=now + 0.2):
+        before = create_access_token({"user_id": 7})
+    assert await get_current_user_id(before) == 7
+    with patch("services.token_cache.time.time", return_value=now + 0.5):
+        TokenCache.revoke_user(7)
+    # 整数秒的iat同样按吊销时间比较
+    assert TokenCache.is_revoked("t", 7, issued_at=now)
+    with pytest.raises(HTTPException) as exc:
+        await get_current_user_id(before)
+    assert exc.value.detail == "令牌已注销"
+
+    with patch("api.auth_api.time.time", return_value=now + 0.8):
+        after = create_access_token({"user_id": 7})
+    assert await get_current_user_id(after) == 7
+
+# 测试条目数上限
+def test_max_entries():
+    with patch.object(TokenCache, "MAX_ENTRIES", 3):
+        for i in range(5):
+            TokenCache.put(f"t{i}", i, time.time() + 60)
+        assert TokenCache.get("t0") is None and TokenCache.get("t4") == 4
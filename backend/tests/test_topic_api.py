@@ -183,4 +183,27 @@ async def test_get_topic_messages(client, mock_get_current_user_id, mock_created
         assert data[0]["content"] == mock_created_message["content"]
         
         # 验证调用服务
-        mock_get_topic_messages.assert_called_once_with(1) 
\ No newline at end of file
+        mock_get_topic_messages.assert_called_once_with(1) 
+# 测试档案有位次时直接使用
+@pytest.mark.asyncio
+async def test_resolve_rank_from_profile():
+    from api.topic_api import resolve_rank
+    with patch("api.topic_api.ScoreRankIndex.equivalent_rank", new_callable=AsyncMock) as mock_rank:
+        assert await resolve_rank({"rank": 1234, "province": "北京", "score": 600}) == 1234
+        mock_rank.assert_not_called()
+
+# 测试档案没有位次时按分数换算等效位次
+@pytest.mark.asyncio
+async def test_resolve_rank_from_score():
+    from api.topic_api import resolve_rank, DEFAULT_BASE_YEAR
+    with patch("api.topic_api.ScoreRankIndex.equivalent_rank", new_callable=AsyncMock) as mock_rank:
+        mock_rank.return_value = {"rank": 5000}
+        assert await resolve_rank({"province": "北京", "score": 600}) == 5000
+        mock_rank.assert_awaited_once_with(province_name="北京", year=DEFAULT_BASE_YEAR, batch="本科", score=600)
+
+        mock_rank.return_value = None
+        assert await resolve_rank({"province": "北京", "score": 600, "batch": "专科"}) is None
+        assert await resolve_rank({"province": "北京"}) is None
+
+        mock_rank.side_effect = Exception("一分一段表未加载")
+        assert await resolve_rank({"province": "北京", "score": 600}) is None
@@ -0,0 +1,81 @@
+"""
+话题分页列表的单元测试
+"""
+import pytest
+from unittest.mock import patch, AsyncMock
+from datetime import datetime, timedelta
+from fastapi import FastAPI, status
+from fastapi.testclient import TestClient
+import os
+import sys
+
+# 添加项目根目录到系统路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from api.auth_api import get_current_user_id
+from api.topic_api import router
+from services.topic_service import TopicService, PREVIEW_LENGTH
+
+def make_topics(count):
+    base = datetime(2025, 6, 1, 12, 0, 0, 123456)
+    return [{
+        "topic_id": 100 - i,
+        "user_id": 1,
+        "topic": f"话题{i}",
+        "started_at": base,
+        "updated_at": base - timedelta(minutes=i),
+        "last_message": "最后一条消息",
+        "last_message_type": "ai",
+        "last_message_at": base,
+        "message_count": 4
+    } for i in range(count)]
+
+# 测试游标编码后可还原，且保留微秒
+def test_cursor_roundtrip():
+    updated_at = datetime(2025, 6, 1, 12, 0, 0, 123456)
+    cursor = TopicService.encode_cursor(updated_at, 42)
+    assert TopicService.decode_cursor(cursor) == (updated_at, 42)
+    with pytest.raises(ValueError):
+        TopicService.decode_cursor("not-a-cursor")
+
+# 测试多取一条判断下一页，游标取本页最后一个话题
+@pytest.mark.asyncio
+async def test_page_with_next_cursor():
+    topics = make_topics(3)
+    with patch("services.topic_service.TopicDAO.get_user_topics_page",
+               new_callable=AsyncMock, return_value=topics) as mock_page:
+        page = await TopicService.get_user_topics_page(1, limit=2)
+    mock_page.assert_awaited_once_with(1, 3, None, PREVIEW_LENGTH)
+    assert [t["topic_id"] for t in page["items"]] == [100, 99]
+    assert page["items"][0]["updated_at"] == "2025-06-01T12:00:00.123456"
+    assert TopicService.decode_cursor(page["next_cursor"]) == (topics[1]["updated_at"], 99)
+
+# 测试最后一页没有游标，传入的游标解析后交给DAO
+@pytest.mark.asyncio
+async def test_last_page():
+    after = (datetime(2025, 6, 1, 11, 59), 99)
+    with patch("services.topic_service.TopicDAO.get_user_topics_page",
+               new_callable=AsyncMock, return_value=make_topics(1)) as mock_page:
+        page = await TopicService.get_user_topics_page(1, limit=2, cursor=TopicService.encode_cursor(*after))
+    mock_page.assert_awaited_once_with(1, 3, after, PREVIEW_LENGTH)
+    assert len(page["items"]) == 1
+    assert page["next_cursor"] is None
+
+# 测试分页接口
+def test_page_api():
+    app = FastAPI()
+    app.include_router(router)
+    app.dependency_overrides[get_current_user_id] = lambda: 1
+    client = TestClient(app)
+    page = {"items": [{
+        "topic_id": 1, "user_id": 1, "topic": "话题", "started_at": "2025-06-01T12:00:00",
+        "updated_at": "2025-06-01T12:00:00", "last_message": None, "last_message_type": None,
+        "last_message_at": None, "message_count": 0
+    }], "next_cursor": None}
+    with patch.object(TopicService, "get_user_topics_page", new_callable=AsyncMock, return_value=page) as mock_page:
+        response = client.get("/api/topics/page?limit=20")
+        assert response.status_code == status.HTTP_200_OK
+        assert response.json() == page
+        mock_page.assert_awaited_once_with(1, 20, None)
+    assert client.get("/api/topics/page?cursor=bad").status_code == status.HTTP_400_BAD_REQUEST
+    assert client.get("/api/topics/page?limit=0").status_code == 422
@@ -0,0 +1,149 @@
+"""
+对话结束后状态同步的单元测试
+"""
+import pytest
+from unittest.mock import patch, AsyncMock, MagicMock
+import os
+import sys
+
+# 添加项目根目录到系统路径
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), '..')))
+
+from dao.message_dao import ChatMessageHistory
+from services.message_service import MessageService
+from services.profile_service import ProfileService
+
+class FakeTransaction:
+    def __init__(self, log):
+        self.log = log
+
+    async def __aenter__(self):
+        self.log.append("begin")
+
+    async def __aexit__(self, exc_type, exc, tb):
+        self.log.append("rollback" if exc_type else "commit")
+
+def fake_connection(log):
+    conn = MagicMock()
+    conn.transaction.side_effect = lambda: FakeTransaction(log)
+    conn.executemany = AsyncMock(side_effect=lambda *args: log.append("insert_messages"))
+    conn.execute = AsyncMock(side_effect=lambda *args: log.append("touch_topic"))
+    conn.fetchrow = AsyncMock(side_effect=lambda *args: log.append("update_profile") or {
+        "user_id": 1, "requirement": args[2], "updated_at": None
+    })
+    return conn
+
+# 测试只同步发生变化的字段，等效位次不写回
+def test_diff_user_info():
+    before = {"province": "北京", "score": 600, "rank": 5000, "subjects": ["物理"], "requirement": "- 计算机"}
+    after = {**before, "rank": 4800, "requirement": "- 计算机\n- 北京"}
+    assert ProfileService.diff_user_info(before, after) == {"requirement": "- 计算机\n- 北京"}
+    assert ProfileService.diff_user_info(before, dict(before)) == {}
+
+# 测试消息和档案在同一个事务中写入
+@pytest.mark.asyncio
+async def test_sync_turn_single_transaction():
+    log = []
+    conn = fake_connection(log)
+    history = ChatMessageHistory(topic_id=3, connection=conn, user_id=1)
+    ProfileService.invalidate()
+    await MessageService.sync_turn(
+        history, "想学计算机", "推荐如下",
+        {"requirement": "- 无"}, {"requirement": "- 计算机"}
+    )
+    assert log == ["begin", "insert_messages", "touch_topic", "update_profile", "commit"]
+    rows = conn.executemany.call_args.args[1]
+    assert rows == [(3, 1, "user", "想学计算机"), (3, 1, "ai", "推荐如下")]
+    assert "requirement = $2" in conn.fetchrow.call_args.args[0]
+    # 档案缓存同步更新
+    with patch("services.profile_service.ProfileDAO") as mock_dao:
+        profile = await ProfileService.get_profile(1)
+        mock_dao.get_profile.assert_not_called()
+    assert profile["requirement"] == "- 计算机"
+    ProfileService.invalidate()
+
+# 测试档案未变化时不更新档案
+@pytest.mark.asyncio
+async def test_sync_turn_without_profile_changes():
+    log = []
+    history = ChatMessageHistory(topic_id=3, connection=fake_connection(log), user_id=1)
+    await MessageService.sync_turn(history, "你好", "", {"requirement": "x"}, {"requirement": "x"})
+    assert log == ["begin", "insert_messages", "touch_topic", "commit"]
+
+def strict_connection(log):
+    """与asyncpg一致，INT参数传入字符串时报错"""
+    def check_ints(*values):
+        for value in values:
+            if not isinstance(value, int):
+                raise TypeError(f"invalid input for query argument: {value!r} (expected int)")
+
+    def executemany(query, rows):
+        for topic_id, user_id, message_type, content in rows:
+            check_ints(topic_id, user_id)
+        log.extend(rows)
+
+    conn = MagicMock()
+    conn.transaction.side_effect = lambda: FakeTransaction([])
+    conn.executemany = AsyncMock(side_effect=executemany)
+    conn.execute = AsyncMock(side_effect=lambda query, topic_id: check_ints(topic_id))
+    return conn
+
+async def chat_events(conn, topic_id):
+    """按接口的参数类型跑完一轮对话，返回推送的事件"""
+    from langgraph.graph import StateGraph, START, END
+    from graph.checkpointer import GraphCheckpointer
+    from graph.graph import State
+
+    def get_graph(checkpointer=None):
+        graph = StateGraph(State)
+        graph.add_node("reply", lambda state: {"messages": []})
+        graph.add_edge(START, "reply")
+        graph.add_edge("reply", END)
+        return graph.compile(checkpointer=checkpointer)
+
+    pool = MagicMock()
+    pool.acquire = AsyncMock(return_value=conn)
+    pool.release = AsyncMock()
+    conn.fetch = AsyncMock(return_value=[])
+    with patch("graph.graph.getGraph", get_graph), \
+            patch.object(GraphCheckpointer, "get_saver", AsyncMock(return_value=None)), \
+            patch("dao.message_dao.Database.get_pool", AsyncMock(return_value=pool)):
+        return [event async for event in MessageService.stream_process_user_message(
+            "你好", topic_id, {"requirement": ""}, user_id=1
+        )]
+
+# 测试接口把路径中的话题ID解析为int，保存时按INT列的类型写入
+def test_chat_stream_topic_id_is_int():
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from api.auth_api import get_current_user_id
+    from api.topic_api import router
+
+    app = FastAPI()
+    app.include_router(router)
+    app.dependency_overrides[get_current_user_id] = lambda: 1
+
+    async def fake_stream(message, topic_id, user_info, user_id):
+        yield f"data: {type(topic_id).__name__}:{topic_id}\n\n"
+
+    with patch.object(ProfileService, "get_profile", AsyncMock(return_value={"province": "北京", "score": 600})), \
+            patch("api.topic_api.resolve_rank", AsyncMock(return_value=5000)), \
+            patch.object(MessageService, "stream_process_user_message", fake_stream):
+        response = TestClient(app).post("/api/topics/7/chat/stream", json={"message": "你好"})
+    assert response.text == "data: int:7\n\n"
+
+# 测试以实际参数类型保存一轮对话
+@pytest.mark.asyncio
+async def test_save_turn_with_real_argument_types():
+    rows = []
+    events = await chat_events(strict_connection(rows), 7)
+    assert rows == [(7, 1, "user", "你好")]
+    assert not any('"error"' in event for event in events)
+
+# 测试保存失败时向前端推送错误事件
+@pytest.mark.asyncio
+async def test_save_failure_sends_error_event():
+    conn = strict_connection([])
+    conn.executemany.side_effect = ConnectionError("连接已断开")
+    events = await chat_events(conn, 7)
+    assert '"type": "error"' in events[-1]
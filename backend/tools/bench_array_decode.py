@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+"""
+数组解码基准测试：在1000行一页的院校数据上对比eval与parse_string_array
+
+默认使用合成数据；指定--live时从dwd_youzy_college_info读取一页真实数据，
+并额外对比以原生Array(String)返回与toString后在Python中解码的端到端耗时。
+
+用法:
+    python tools/bench_array_decode.py --page-size 1000 --repeat 20
+    python tools/bench_array_decode.py --live
+"""
+import os
+import sys
+import time
+import random
+import argparse
+import statistics
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.array_utils import parse_string_array, _parse
+
+CATEGORIES = ["综合", "理工", "师范", "医药", "财经", "农林", "政法", "艺术", "语言", "民族"]
+FEATURES = ["985", "211", "双一流", "强基计划", "保研资格", "中外合作", "国重点"]
+
+
+def synthetic_page(page_size: int):
+    """生成与院校表相同格式的字符串数组字段"""
+    rng = random.Random(42)
+    page = []
+    for _ in range(page_size):
+        page.append({
+            "categories": str(rng.sample(CATEGORIES, rng.randint(1, 2))),
+            "features": str(rng.sample(FEATURES, rng.randint(0, 4)))
+        })
+    return page
+
+
+def live_page(page_size: int):
+    """从ClickHouse读取一页，数组列转为字符串以模拟旧数据格式"""
+    from dao.clickhouse_db import ClickHouseDB
+    query = f"""
+    SELECT toString(categories) AS categories, toString(features) AS features
+    FROM qihang.dwd_youzy_college_info LIMIT {page_size}
+    """
+    return ClickHouseDB.execute(query)
+
+
+def decode_page(page, decoder):
+    for record in page:
+        decoder(record["categories"])
+        decoder(record["features"])
+
+
+def measure(page, decoder, repeat: int) -> float:
+    """多次解码同一页，返回耗时中位数(ms)"""
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        decode_page(page, decoder)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def measure_query(sql: str, repeat: int) -> float:
+    from dao.clickhouse_db import ClickHouseDB
+    from dao.specialist_dao import COLLEGE_ARRAY_COLUMNS
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        ClickHouseDB.execute(sql, array_columns=COLLEGE_ARRAY_COLUMNS)
+        timings.append((time.perf_counter() - start) * 1000)
+    return statistics.median(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="数组解码基准测试")
+    parser.add_argument("--page-size", type=int, default=1000, help="每页行数")
+    parser.add_argument("--repeat", type=int, default=20, help="重复次数")
+    parser.add_argument("--live", action="store_true", help="使用ClickHouse中的真实数据")
+    args = parser.parse_args()
+
+    page = live_page(args.page_size) if args.live else synthetic_page(args.page_size)
+    print(f"每页 {len(page)} 行，重复 {args.repeat} 次")
+
+    eval_ms = measure(page, eval, args.repeat)
+    _parse.cache_clear()
+    cold_ms = measure(page, parse_string_array, 1)
+    warm_ms = measure(page, parse_string_array, args.repeat)
+
+    print(f"{'方式':<28}{'耗时(ms)':>12}")
+    print(f"{'eval':<28}{eval_ms:>12.2f}")
+    print(f"{'parse_string_array(冷缓存)':<28}{cold_ms:>12.2f}")
+    print(f"{'parse_string_array(热缓存)':<28}{warm_ms:>12.2f}")
+
+    if args.live:
+        from dao.clickhouse_db import ClickHouseDB
+        native_sql = f"SELECT code, categories, features FROM qihang.dwd_youzy_college_info LIMIT {args.page_size}"
+        string_sql = (f"SELECT code, toString(categories) AS categories, toString(features) AS features "
+                      f"FROM qihang.dwd_youzy_college_info LIMIT {args.page_size}")
+        print(f"{'原生Array(String)查询':<28}{measure_query(native_sql, args.repeat):>12.2f}")
+        print(f"{'字符串查询+解码':<28}{measure_query(string_sql, args.repeat):>12.2f}")
+        ClickHouseDB.close_client()
+
+
+if __name__ == "__main__":
+    main()
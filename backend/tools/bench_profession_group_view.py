@@ -0,0 +1,78 @@
+#!/usr/bin/env python
+"""
+专业组预聚合表基准测试：对比从专业版本宽表和从预聚合表执行专业组聚合查询的耗时和扫描量
+
+需要先运行tools/migrate_profession_group_view.py创建预聚合表。
+
+用法:
+    python tools/bench_profession_group_view.py --province 北京 --repeat 5
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dao.clickhouse_db import ClickHouseDB
+from dao import profession_group_view
+from dao.specialist_schema import SPECIALIST_VERSION_TABLE
+
+MIN_COLUMNS_SQL = ",\n    ".join(f"min({c}) AS {c}" for c in profession_group_view.MIN_COLUMNS)
+GROUP_KEYS_SQL = ", ".join(k for k in profession_group_view.GROUP_KEYS if k != "province")
+
+
+def group_query(source: str) -> str:
+    """与get_recommendation_groups相同的聚合查询"""
+    return f"""
+    SELECT {GROUP_KEYS_SQL},
+    {MIN_COLUMNS_SQL}
+    FROM {source}
+    WHERE province = {{province:String}}
+    GROUP BY {GROUP_KEYS_SQL}
+    """
+
+
+def run_query(client, sql: str, params: dict, repeat: int):
+    """多次执行查询，返回耗时中位数(ms)、结果行数和扫描行数/字节数"""
+    timings = []
+    summary = {}
+    rows = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = client.query(sql, parameters=params, settings={"use_query_cache": 0})
+        timings.append((time.perf_counter() - start) * 1000)
+        summary = result.summary or {}
+        rows = len(result.result_rows)
+    return statistics.median(timings), rows, summary.get("read_rows"), summary.get("read_bytes")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="专业组预聚合表基准测试")
+    parser.add_argument("--province", default="北京", help="省份")
+    parser.add_argument("--repeat", type=int, default=5, help="每个查询重复次数")
+    args = parser.parse_args()
+
+    if not profession_group_view.available():
+        print(f"预聚合表{profession_group_view.PROFESSION_GROUP_TABLE}不存在，请先运行tools/migrate_profession_group_view.py")
+        return
+
+    client = ClickHouseDB.get_client()
+    params = {"province": args.province}
+    wide = run_query(client, group_query(SPECIALIST_VERSION_TABLE), params, args.repeat)
+    agg = run_query(client, group_query(profession_group_view.PROFESSION_GROUP_TABLE), params, args.repeat)
+
+    print(f"{'来源':<16}{'耗时(ms)':>12}{'结果行数':>10}{'扫描行数':>14}{'扫描字节':>16}")
+    print(f"{'专业版本宽表':<16}{wide[0]:>12.2f}{wide[1]:>10}{wide[2]!s:>14}{wide[3]!s:>16}")
+    print(f"{'预聚合表':<16}{agg[0]:>12.2f}{agg[1]:>10}{agg[2]!s:>14}{agg[3]!s:>16}")
+    if wide[1] != agg[1]:
+        print("警告: 两种来源的结果行数不一致，预聚合表可能需要重建(--rebuild)")
+    if wide[2] and agg[2]:
+        print(f"扫描行数减少 {1 - int(agg[2]) / int(wide[2]):.1%}，扫描字节减少 {1 - int(agg[3]) / int(wide[3]):.1%}")
+    ClickHouseDB.close_client()
+
+
+if __name__ == "__main__":
+    main()
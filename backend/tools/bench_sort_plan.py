@@ -0,0 +1,86 @@
+#!/usr/bin/env python
+"""
+专业版本列表排序基准测试：对比直接排序（单次读表）和延迟物化（先排序行位置再回表）的耗时和扫描量
+
+分别测试默认排序（bus_year DESC, college_code ASC）和显式按非排序键字段排序，
+用于确定SortPlanner.LATE_MATERIALIZE_MIN_ROWS的取值。
+
+用法:
+    python tools/bench_sort_plan.py --province 北京 --sort-by tuition --repeat 5
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dao.clickhouse_db import ClickHouseDB
+from dao.sort_planner import SortPlan
+from dao.specialist_dao import PROFESSION_VERSION_SORT, PROFESSION_VERSION_COLUMNS
+from dao.specialist_schema import SPECIALIST_VERSION_TABLE
+
+COLUMNS_SQL = ", ".join(PROFESSION_VERSION_COLUMNS)
+
+
+def single_pass_query(where_sql: str, plan: SortPlan, limit_sql: str) -> str:
+    """与get_profession_version_list不走延迟物化时相同的查询"""
+    return f"""
+    SELECT {COLUMNS_SQL}
+    FROM {SPECIALIST_VERSION_TABLE}
+    {where_sql}
+    {plan.order_by_sql}
+    {limit_sql}
+    """
+
+
+def run_query(client, sql: str, params: dict, repeat: int):
+    """多次执行查询，返回耗时中位数(ms)、结果行数和扫描行数/字节数"""
+    timings = []
+    summary = {}
+    rows = 0
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = client.query(sql, parameters=params, settings={"use_query_cache": 0})
+        timings.append((time.perf_counter() - start) * 1000)
+        summary = result.summary or {}
+        rows = len(result.result_rows)
+    return statistics.median(timings), rows, summary.get("read_rows"), summary.get("read_bytes")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="专业版本列表排序基准测试")
+    parser.add_argument("--province", default="", help="省份，为空时不筛选")
+    parser.add_argument("--sort-by", default="tuition", help="显式排序字段")
+    parser.add_argument("--page-size", type=int, default=20, help="每页条数")
+    parser.add_argument("--repeat", type=int, default=5, help="每个查询重复次数")
+    args = parser.parse_args()
+
+    where_sql = "WHERE province = {province:String}" if args.province else ""
+    params = {"province": args.province} if args.province else {}
+    limit_sql = f"LIMIT {args.page_size}"
+    fixed_columns = ["province"] if args.province else []
+
+    client = ClickHouseDB.get_client()
+    total = client.query(f"SELECT count() FROM {SPECIALIST_VERSION_TABLE} {where_sql}", parameters=params).result_rows[0][0]
+    print(f"筛选后行数: {total}，延迟物化阈值: {PROFESSION_VERSION_SORT.LATE_MATERIALIZE_MIN_ROWS}")
+
+    print(f"{'排序':<28}{'方式':<10}{'耗时(ms)':>12}{'结果行数':>10}{'扫描行数':>14}{'扫描字节':>16}")
+    for label, sort_by in [("默认排序", None), (f"{args.sort_by} DESC", args.sort_by)]:
+        plan = PROFESSION_VERSION_SORT.plan(sort_by, "DESC", fixed_columns, total_rows=total)
+        two_pass = SortPlan(plan.terms, plan.read_in_order, late_materialize=True)
+        single = run_query(client, single_pass_query(where_sql, plan, limit_sql), params, args.repeat)
+        late = run_query(client, PROFESSION_VERSION_SORT.top_n_query(COLUMNS_SQL, where_sql, two_pass, limit_sql),
+                         params, args.repeat)
+        chosen = "延迟物化" if plan.late_materialize else "直接排序"
+        for name, r in [("直接排序", single), ("延迟物化", late)]:
+            mark = "*" if name == chosen else ""
+            print(f"{label:<28}{name + mark:<10}{r[0]:>12.2f}{r[1]:>10}{r[2]!s:>14}{r[3]!s:>16}")
+    print("*为当前SortPlanner选择的方式")
+    ClickHouseDB.close_client()
+
+
+if __name__ == "__main__":
+    main()
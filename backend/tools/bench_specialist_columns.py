@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+"""
+物化列基准测试：在百万行合成专家表上对比JSONExtractString筛选与物化列+跳数索引筛选
+
+用法:
+    python tools/bench_specialist_columns.py --rows 1000000 --repeat 5
+"""
+import os
+import sys
+import time
+import argparse
+import statistics
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dao.clickhouse_db import ClickHouseDB
+
+BENCH_TABLE = "bench_specialist_fat"
+
+
+def create_table(client, rows: int):
+    """创建合成数据表，结构与dwd_tszh_specialist_fat一致"""
+    client.command(f"DROP TABLE IF EXISTS {BENCH_TABLE}")
+    client.command(f"""
+        CREATE TABLE {BENCH_TABLE} (
+            record_value String,
+            dt DateTime,
+            file_name String,
+            province_name String
+        ) ENGINE = MergeTree ORDER BY (province_name, dt)
+    """)
+    client.command(f"""
+        INSERT INTO {BENCH_TABLE}
+        SELECT
+            concat('{{"id":"', toString(number), '","name":"专家', toString(number % 200000),
+                   '","education":"', ['本科','硕士','博士'][number % 3 + 1],
+                   '","intro":"', repeat('x', 200), '"}}'),
+            now() - number,
+            concat('file_', toString(number % 100), '.json'),
+            ['北京','上海','广东','江苏','浙江'][number % 5 + 1]
+        FROM numbers({rows})
+    """)
+
+
+def promote_columns(client):
+    """与迁移脚本相同的提升方式"""
+    client.command(f"ALTER TABLE {BENCH_TABLE} ADD COLUMN json_id String MATERIALIZED JSONExtractString(record_value, 'id')")
+    client.command(f"ALTER TABLE {BENCH_TABLE} MATERIALIZE COLUMN json_id SETTINGS mutations_sync = 1")
+    client.command(f"ALTER TABLE {BENCH_TABLE} ADD INDEX idx_json_id json_id TYPE bloom_filter(0.01) GRANULARITY 4")
+    client.command(f"ALTER TABLE {BENCH_TABLE} MATERIALIZE INDEX idx_json_id SETTINGS mutations_sync = 1")
+
+
+def run_query(client, sql: str, params: dict, repeat: int):
+    """多次执行查询，返回耗时中位数(ms)和扫描行数/字节数"""
+    timings = []
+    summary = {}
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = client.query(sql, parameters=params, settings={"use_query_cache": 0})
+        timings.append((time.perf_counter() - start) * 1000)
+        summary = result.summary or {}
+    return statistics.median(timings), summary.get("read_rows"), summary.get("read_bytes")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="专家表物化列基准测试")
+    parser.add_argument("--rows", type=int, default=1000000, help="合成数据行数")
+    parser.add_argument("--repeat", type=int, default=5, help="每个查询重复次数")
+    parser.add_argument("--keep", action="store_true", help="测试结束后保留合成表")
+    args = parser.parse_args()
+
+    client = ClickHouseDB.get_client()
+    print(f"创建 {args.rows} 行合成数据...")
+    create_table(client, args.rows)
+
+    target = {"value": str(args.rows // 2)}
+    json_sql = f"SELECT record_value FROM {BENCH_TABLE} WHERE JSONExtractString(record_value, 'id') = {{value:String}} LIMIT 1"
+    column_sql = f"SELECT record_value FROM {BENCH_TABLE} WHERE json_id = {{value:String}} LIMIT 1"
+
+    before = run_query(client, json_sql, target, args.repeat)
+    print("提升物化列并建立索引...")
+    promote_columns(client)
+    after = run_query(client, column_sql, target, args.repeat)
+
+    print(f"{'方式':<24}{'耗时(ms)':>12}{'扫描行数':>14}{'扫描字节':>16}")
+    print(f"{'JSONExtractString':<24}{before[0]:>12.2f}{before[1]!s:>14}{before[2]!s:>16}")
+    print(f"{'物化列+bloom_filter':<24}{after[0]:>12.2f}{after[1]!s:>14}{after[2]!s:>16}")
+
+    if not args.keep:
+        client.command(f"DROP TABLE IF EXISTS {BENCH_TABLE}")
+    ClickHouseDB.close_client()
+
+
+if __name__ == "__main__":
+    main()
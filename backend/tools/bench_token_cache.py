@@ -0,0 +1,59 @@
+#!/usr/bin/env python
+"""
+令牌验证基准测试：对比每次jwt.decode与使用已验证令牌缓存时get_current_user_id的单次耗时
+
+用法:
+    python tools/bench_token_cache.py --requests 100000 --users 1000
+"""
+import os
+import sys
+import time
+import asyncio
+import argparse
+import random
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import jwt
+from api.auth_api import get_current_user_id, create_access_token, SECRET_KEY, ALGORITHM
+from services.token_cache import TokenCache
+
+
+def decode_every_time(tokens):
+    for token in tokens:
+        jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+
+
+async def cached(tokens):
+    for token in tokens:
+        await get_current_user_id(token)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="令牌验证基准测试")
+    parser.add_argument("--requests", type=int, default=100000, help="请求数")
+    parser.add_argument("--users", type=int, default=1000, help="不同令牌数")
+    args = parser.parse_args()
+
+    rng = random.Random(42)
+    pool = [create_access_token({"sub": f"user{i}", "user_id": i + 1, "role": "user"}) for i in range(args.users)]
+    tokens = [rng.choice(pool) for _ in range(args.requests)]
+
+    start = time.perf_counter()
+    decode_every_time(tokens)
+    before = (time.perf_counter() - start) / args.requests * 1e6
+
+    TokenCache.clear()
+    start = time.perf_counter()
+    asyncio.run(cached(tokens))
+    after = (time.perf_counter() - start) / args.requests * 1e6
+
+    print(f"请求数: {args.requests}, 令牌数: {args.users}")
+    print(f"每次jwt.decode:   {before:.2f} us/请求")
+    print(f"已验证令牌缓存:   {after:.2f} us/请求")
+    print(f"加速比: {before / after:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,37 @@
+#!/usr/bin/env python
+"""
+预计算各省份、批次的跨年份等位分转换表（.npy，可mmap加载）
+
+用法:
+    python tools/build_score_conversion.py
+    python tools/build_score_conversion.py --years 2022 2023 2024 --output data/score_conversion
+"""
+import os
+import sys
+import asyncio
+import argparse
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dao.clickhouse_db import ClickHouseDB
+from services.score_conversion import DATA_DIR, build_conversion_tables
+
+
+async def main():
+    parser = argparse.ArgumentParser(description="预计算跨年份等位分转换表")
+    parser.add_argument("--output", default=DATA_DIR, help="输出目录")
+    parser.add_argument("--years", nargs="*", type=int, help="只使用指定年份")
+    args = parser.parse_args()
+
+    try:
+        manifest = await build_conversion_tables(output_dir=args.output, years=args.years)
+        print(f"生成完成，共{len(manifest['tables'])}组转换表，输出目录: {args.output}")
+        for key, meta in manifest["tables"].items():
+            print(f"  {key}: 年份{meta['years']}，分数{meta['score_min']}-{meta['score_max']}")
+    finally:
+        ClickHouseDB.close_client()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,44 @@
+#!/usr/bin/env python
+"""
+创建专业组预聚合表和物化视图，专业组列表和推荐查询自动改为读取预聚合表
+
+用法:
+    python tools/migrate_profession_group_view.py
+    python tools/migrate_profession_group_view.py --dry-run
+    python tools/migrate_profession_group_view.py --rebuild   # 宽表重新导入后全量重算，可配置为夜间任务
+"""
+import os
+import sys
+import argparse
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dao.clickhouse_db import ClickHouseDB
+from dao import profession_group_view
+
+
+def main():
+    parser = argparse.ArgumentParser(description="创建专业组预聚合表")
+    parser.add_argument("--dry-run", action="store_true", help="只打印SQL，不执行")
+    parser.add_argument("--rebuild", action="store_true", help="全量重算到临时表后与预聚合表交换")
+    args = parser.parse_args()
+
+    if args.rebuild:
+        statements = profession_group_view.rebuild_statements()
+    else:
+        statements = profession_group_view.migration_statements()
+    client = None if args.dry_run else ClickHouseDB.get_client()
+    for sql in statements:
+        print(f"[SQL] {sql}")
+        if client:
+            client.command(sql)
+
+    if client:
+        ClickHouseDB.invalidate_table_columns(profession_group_view.PROFESSION_GROUP_TABLE)
+        print(f"{profession_group_view.PROFESSION_GROUP_TABLE}: {'已生效' if profession_group_view.available() else '未生效'}")
+        ClickHouseDB.close_client()
+
+
+if __name__ == "__main__":
+    main()
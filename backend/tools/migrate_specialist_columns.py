@@ -0,0 +1,43 @@
+#!/usr/bin/env python
+"""
+专家宽表结构演进：将高频筛选的JSON字段提升为物化列并建立跳数索引
+
+用法:
+    python tools/migrate_specialist_columns.py              # 提升全部已登记字段
+    python tools/migrate_specialist_columns.py --keys id    # 只提升指定字段
+    python tools/migrate_specialist_columns.py --dry-run    # 只打印SQL
+"""
+import os
+import sys
+import argparse
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dao.clickhouse_db import ClickHouseDB
+from dao.specialist_schema import SPECIALIST_TABLE, PROMOTED_JSON_KEYS, migration_statements
+
+
+def main():
+    parser = argparse.ArgumentParser(description="将专家宽表的JSON字段提升为物化列")
+    parser.add_argument("--keys", nargs="*", help=f"需要提升的字段，可选: {', '.join(PROMOTED_JSON_KEYS)}")
+    parser.add_argument("--dry-run", action="store_true", help="只打印SQL，不执行")
+    args = parser.parse_args()
+
+    statements = migration_statements(args.keys)
+    for sql in statements:
+        print(f"[SQL] {sql}")
+        if not args.dry_run:
+            ClickHouseDB.execute(sql)
+
+    if not args.dry_run:
+        ClickHouseDB.invalidate_table_columns(SPECIALIST_TABLE)
+        columns = ClickHouseDB.get_table_columns(SPECIALIST_TABLE)
+        for key in args.keys or PROMOTED_JSON_KEYS:
+            column = PROMOTED_JSON_KEYS[key]["column"]
+            print(f"{key} -> {column}: {'已生效' if column in columns else '未生效'}")
+        ClickHouseDB.close_client()
+
+
+if __name__ == "__main__":
+    main()
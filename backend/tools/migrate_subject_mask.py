@@ -0,0 +1,49 @@
+#!/usr/bin/env python
+"""
+为专业版本宽表增加选科要求位掩码列subject_mask（UInt16），选科筛选改为按位与
+
+用法:
+    python tools/migrate_subject_mask.py
+    python tools/migrate_subject_mask.py --dry-run
+
+编码表达式变化后重新运行本工具回填，并运行tools/migrate_profession_group_view.py --rebuild重建预聚合表。
+"""
+import os
+import sys
+import argparse
+
+# 添加项目根目录到Python路径
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from dao.clickhouse_db import ClickHouseDB
+from dao.specialist_schema import SPECIALIST_VERSION_TABLE, SUBJECT_MASK_COLUMN
+from utils.subject_utils import clickhouse_mask_expr
+
+
+def main():
+    parser = argparse.ArgumentParser(description="增加选科要求位掩码列")
+    parser.add_argument("--dry-run", action="store_true", help="只打印SQL，不执行")
+    args = parser.parse_args()
+
+    statements = [
+        f"ALTER TABLE {SPECIALIST_VERSION_TABLE} ADD COLUMN IF NOT EXISTS {SUBJECT_MASK_COLUMN} UInt16 "
+        f"MATERIALIZED {clickhouse_mask_expr('subject_requirements_clean')}",
+        # 列已存在时更新为当前的编码表达式（如新增的无法识别科目保留位）
+        f"ALTER TABLE {SPECIALIST_VERSION_TABLE} MODIFY COLUMN {SUBJECT_MASK_COLUMN} UInt16 "
+        f"MATERIALIZED {clickhouse_mask_expr('subject_requirements_clean')}",
+        # 存量数据需要显式回填
+        f"ALTER TABLE {SPECIALIST_VERSION_TABLE} MATERIALIZE COLUMN {SUBJECT_MASK_COLUMN}",
+    ]
+    for sql in statements:
+        print(f"[SQL] {sql}")
+        if not args.dry_run:
+            ClickHouseDB.execute(sql)
+
+    if not args.dry_run:
+        ClickHouseDB.invalidate_table_columns(SPECIALIST_VERSION_TABLE)
+        print(f"{SUBJECT_MASK_COLUMN}: {'已生效' if ClickHouseDB.has_column(SPECIALIST_VERSION_TABLE, SUBJECT_MASK_COLUMN) else '未生效'}")
+        ClickHouseDB.close_client()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,55 @@
+import re
+from functools import lru_cache
+from typing import List, Optional, Tuple
+
+# 数组字面量中的单个元素：单引号或双引号字符串，支持反斜杠转义
+_ELEMENT = re.compile(r"'((?:[^'\\]|\\.)*)'|\"((?:[^\"\\]|\\.)*)\"")
+_ESCAPE = re.compile(r"\\(.)")
+_ESCAPES = {"n": "\n", "t": "\t", "r": "\r", "0": "\0"}
+
+
+def _unescape(text: str) -> str:
+    if "\\" not in text:
+        return text
+    return _ESCAPE.sub(lambda m: _ESCAPES.get(m.group(1), m.group(1)), text)
+
+
+@lru_cache(maxsize=4096)
+def _parse(text: str) -> Optional[Tuple[str, ...]]:
+    body = text.strip()
+    if not (body.startswith("[") and body.endswith("]")):
+        return None
+    body = body[1:-1].strip()
+    if not body:
+        return ()
+    elements = []
+    pos = 0
+    for match in _ELEMENT.finditer(body):
+        # 元素之间只能是逗号和空白
+        if body[pos:match.start()].strip(" \t\n,"):
+            return None
+        single, double = match.groups()
+        elements.append(_unescape(single if single is not None else double))
+        pos = match.end()
+    if body[pos:].strip(" \t\n,"):
+        return None
+    return tuple(elements)
+
+
+def parse_string_array(text: Optional[str]) -> List[str]:
+    """
+    解析ClickHouse或JSON格式的字符串数组字面量，如"['985','211']"、'["985", "211"]'
+
+    只识别字符串元素，不执行任何代码；相同文本的解析结果会被缓存，
+    院校类别、特色等取值较少的字段几乎都命中缓存。
+
+    Args:
+        text: 数组字面量
+
+    Returns:
+        字符串列表，无法解析时返回空列表
+    """
+    if not text:
+        return []
+    parsed = _parse(text)
+    return list(parsed) if parsed is not None else []
@@ -0,0 +1,195 @@
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Tuple
+from urllib.parse import parse_qsl, urlencode
+import orjson
+
+# 每个缓存条目除响应体和响应头以外的估算开销（字节）
+ENTRY_OVERHEAD = 256
+
+
+def normalize_query(query_string: str) -> str:
+    """
+    规范化查询参数：去掉空值，按参数名排序
+
+    同名参数保持原有先后顺序，避免改变"取最后一个值"的语义
+    """
+    pairs = [(k, v) for k, v in parse_qsl(query_string or "", keep_blank_values=False) if v.strip()]
+    pairs.sort(key=lambda kv: kv[0])
+    return urlencode(pairs)
+
+
+def response_cache_key(path: str, query_string: str) -> str:
+    """响应缓存键：路径 + 规范化后的查询参数"""
+    query = normalize_query(query_string)
+    return f"{path}?{query}" if query else path
+
+
+class CachedResponse:
+    """缓存的完整响应"""
+
+    def __init__(self, status: int, headers: List[Tuple[bytes, bytes]], body: bytes, etag: str,
+                 expires_at: float, protected: bool = False):
+        """
+        Args:
+            status: HTTP状态码
+            headers: 响应头
+            body: 响应体
+            etag: ETag
+            expires_at: 过期时间戳
+            protected: 接口是否需要登录，命中时需先校验令牌
+        """
+        self.status = status
+        self.headers = headers
+        self.body = body
+        self.etag = etag
+        self.expires_at = expires_at
+        self.protected = protected
+
+    @property
+    def size(self) -> int:
+        """占用字节数的估算值"""
+        return len(self.body) + sum(len(k) + len(v) for k, v in self.headers) + ENTRY_OVERHEAD
+
+    def expired(self, now: Optional[float] = None) -> bool:
+        return (now or time.time()) >= self.expires_at
+
+    def dumps(self) -> bytes:
+        """序列化为"元数据JSON + 换行 + 响应体"，用于写入共享缓存"""
+        meta = {
+            "status": self.status,
+            "headers": [[k.decode("latin-1"), v.decode("latin-1")] for k, v in self.headers],
+            "etag": self.etag,
+            "expires_at": self.expires_at,
+            "protected": self.protected,
+        }
+        return orjson.dumps(meta) + b"\n" + self.body
+
+    @classmethod
+    def loads(cls, data: bytes) -> "CachedResponse":
+        meta, body = data.split(b"\n", 1)
+        meta = orjson.loads(meta)
+        headers = [(k.encode("latin-1"), v.encode("latin-1")) for k, v in meta["headers"]]
+        return cls(meta["status"], headers, body, meta["etag"], meta["expires_at"], meta.get("protected", True))
+
+
+def body_etag(body: bytes) -> str:
+    """按响应体计算强ETag"""
+    return '"' + hashlib.sha1(body).hexdigest() + '"'
+
+
+class MemoryLRU:
+    """
+    按字节数限制容量的LRU缓存
+
+    写入时从最久未访问的条目开始淘汰，直到总字节数不超过max_bytes；
+    单个条目超过max_entry_bytes时不缓存
+    """
+
+    def __init__(self, max_bytes: int, max_entry_bytes: int):
+        self.max_bytes = max_bytes
+        self.max_entry_bytes = max_entry_bytes
+        self.bytes = 0
+        self._entries: "OrderedDict[str, CachedResponse]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[CachedResponse]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry.expired():
+                self._remove(key)
+                return None
+            self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key: str, entry: CachedResponse) -> bool:
+        """
+        Returns:
+            是否已缓存
+        """
+        size = entry.size
+        if size > self.max_entry_bytes or size > self.max_bytes:
+            return False
+        with self._lock:
+            self._remove(key)
+            self._entries[key] = entry
+            self.bytes += size
+            while self.bytes > self.max_bytes:
+                self._remove(next(iter(self._entries)))
+        return True
+
+    def _remove(self, key: str):
+        entry = self._entries.pop(key, None)
+        if entry is not None:
+            self.bytes -= entry.size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.bytes = 0
+
+
+class SharedCacheBackend:
+    """
+    共享缓存层接口，多个服务进程共用，如Redis
+
+    实现get/set即可，值为CachedResponse.dumps()的字节串
+    """
+
+    async def get(self, key: str) -> Optional[bytes]:
+        raise NotImplementedError
+
+    async def set(self, key: str, value: bytes, ttl: int):
+        raise NotImplementedError
+
+    async def clear(self):
+        raise NotImplementedError
+
+
+class LocalSharedCache(SharedCacheBackend):
+    """
+    进程内的共享缓存替代实现，用于测试
+
+    按写入顺序限制条目数，超出时先清理已过期的条目，仍超出再淘汰最早写入的条目
+    """
+
+    def __init__(self, max_entries: int = 10000):
+        self.max_entries = max_entries
+        self._data: Dict[str, Tuple[float, bytes]] = {}
+
+    async def get(self, key: str) -> Optional[bytes]:
+        item = self._data.get(key)
+        if item is None:
+            return None
+        if time.time() >= item[0]:
+            self._data.pop(key, None)
+            return None
+        return item[1]
+
+    async def set(self, key: str, value: bytes, ttl: int):
+        now = time.time()
+        self._data.pop(key, None)
+        self._data[key] = (now + ttl, value)
+        if len(self._data) > self.max_entries:
+            for expired in [k for k, (expires_at, _) in self._data.items() if expires_at <= now]:
+                del self._data[expired]
+            while len(self._data) > self.max_entries:
+                del self._data[next(iter(self._data))]
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    async def clear(self):
+        self._data.clear()
+
+
+SHARED_BACKENDS: Dict[str, Any] = {
+    "local": LocalSharedCache,
+}
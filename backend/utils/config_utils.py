@@ -111,6 +111,10 @@ class ConfigManager:
         """获取ClickHouse配置"""
         return self._config.get('clickhouse', {})
 
+    def get_response_cache_config(self) -> Dict[str, Any]:
+        """获取响应缓存配置"""
+        return self._config.get('response_cache', {})
+
 # 创建全局配置管理器实例
 config_manager = ConfigManager()
 
@@ -128,4 +132,8 @@ def get_logging_config() -> Dict[str, Any]:
 
 def get_clickhouse_config() -> Dict[str, Any]:
     """获取ClickHouse配置的便捷函数"""
-    return config_manager.get_clickhouse_config() 
\ No newline at end of file
+    return config_manager.get_clickhouse_config()
+
+def get_response_cache_config() -> Dict[str, Any]:
+    """获取响应缓存配置的便捷函数"""
+    return config_manager.get_response_cache_config()
@@ -0,0 +1,55 @@
+from typing import Dict, Any, Union
+import orjson
+
+
+def loads(data: Union[str, bytes]) -> Any:
+    """
+    使用orjson解析JSON
+
+    Args:
+        data: JSON字符串或字节串
+
+    Returns:
+        解析结果
+
+    Raises:
+        orjson.JSONDecodeError: JSON格式错误（是json.JSONDecodeError的子类）
+    """
+    return orjson.loads(data)
+
+
+def dumps(data: Any) -> bytes:
+    """使用orjson序列化为JSON字节串，保留中文字符"""
+    return orjson.dumps(data, option=orjson.OPT_NON_STR_KEYS)
+
+
+def merge_raw(raw_object: Union[str, bytes], extra: Dict[str, Any]) -> orjson.Fragment:
+    """
+    将额外字段拼接到已序列化的JSON对象末尾，返回可直接嵌入响应的片段
+
+    原始对象不做解析和重新编码，额外字段放在末尾。原对象中可能已有同名键时
+    （字节串中出现了"键名"）改为解析后合并，同名键以额外字段为准，与dict.update的语义一致，
+    输出中不会出现重复的键。调用方需保证raw_object是合法的JSON对象。
+
+    Args:
+        raw_object: 已序列化的JSON对象
+        extra: 需要追加的字段
+
+    Returns:
+        orjson.Fragment，可被orjson.dumps原样输出
+    """
+    if isinstance(raw_object, str):
+        raw_object = raw_object.encode("utf-8")
+    body = raw_object.strip()
+    extra_bytes = dumps(extra)
+    if not extra:
+        return orjson.Fragment(body)
+    if any(dumps(key) in body for key in extra):
+        data = loads(body)
+        data.update(extra)
+        return orjson.Fragment(dumps(data))
+    # 去掉原对象的右括号，判断原对象是否为空对象
+    head = body[:-1].rstrip()
+    if head == b"{":
+        return orjson.Fragment(extra_bytes)
+    return orjson.Fragment(head + b"," + extra_bytes[1:])
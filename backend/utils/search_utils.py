@@ -0,0 +1,169 @@
+import re
+from typing import Dict, Any, List, Optional, Set, Iterable, Tuple
+from pypinyin import lazy_pinyin, Style
+
+# 每个前缀节点保留的候选数量
+TRIE_TOP_K = 20
+# 匹配类型的优先级，数值越小越靠前
+MATCH_EXACT = 0
+MATCH_PREFIX = 1
+MATCH_SUBSTRING = 2
+MATCH_SUBSEQUENCE = 3
+
+_NON_WORD = re.compile(r"[\s\-_·()（）]+")
+_ALIAS_SEPARATORS = re.compile(r"[,，;；、/|]+")
+
+
+def normalize(text: Optional[str]) -> str:
+    """统一为小写并去掉空白和常见标点"""
+    return _NON_WORD.sub("", (text or "").lower())
+
+
+def split_aliases(text: Optional[str]) -> List[str]:
+    """拆分short_name等字段中的多个别名"""
+    return [alias for alias in (normalize(a) for a in _ALIAS_SEPARATORS.split(text or "")) if alias]
+
+
+def pinyin_keys(text: str) -> List[str]:
+    """
+    生成全拼和首字母，如"北航"生成"beihang"和"bh"
+
+    Returns:
+        拼音检索键，文本不含汉字时返回空列表
+    """
+    if not re.search(r"[一-鿿]", text):
+        return []
+    syllables = lazy_pinyin(text, errors="ignore")
+    initials = lazy_pinyin(text, style=Style.FIRST_LETTER, errors="ignore")
+    return [key for key in ("".join(syllables), "".join(initials)) if key]
+
+
+def ngrams(text: str, n: int) -> Set[str]:
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+def is_subsequence(query: str, text: str) -> bool:
+    """query的字符是否按顺序出现在text中，用于匹配"北航"这类未登记的简称"""
+    it = iter(text)
+    return all(ch in it for ch in query)
+
+
+class NameSearchIndex:
+    """
+    名称检索索引
+
+    - 检索键：名称、别名，以及二者的全拼和拼音首字母
+    - 前缀树：每个节点预存前TRIE_TOP_K个候选，输入联想只需沿前缀走一遍
+    - n-gram倒排索引：单字和二元组，用于中缀和按顺序的模糊匹配
+    """
+
+    def __init__(self, entries: Iterable[Dict[str, Any]], aliases_field: Optional[str] = None):
+        """
+        Args:
+            entries: 条目列表，必须包含name字段，其余字段原样返回
+            aliases_field: 存放别名的字段，如院校的short_name
+        """
+        # 名称短的优先，构建前缀树时先插入的即为每个节点的前K个候选
+        self.entries = sorted(
+            (entry for entry in entries if entry.get("name")),
+            key=lambda e: (len(e["name"]), e["name"])
+        )
+        self.keys: List[List[str]] = []
+        self.exact: Dict[str, Set[int]] = {}
+        self.grams: Dict[str, Set[int]] = {}
+        self.trie: Dict[str, Any] = {"ids": []}
+        for i, entry in enumerate(self.entries):
+            words = [normalize(entry["name"])]
+            if aliases_field:
+                words += split_aliases(entry.get(aliases_field))
+            keys = []
+            for word in words:
+                keys.append(word)
+                keys += pinyin_keys(word)
+            keys = list(dict.fromkeys(k for k in keys if k))
+            self.keys.append(keys)
+            for key in keys:
+                self.exact.setdefault(key, set()).add(i)
+                self._insert(key, i)
+                for gram in ngrams(key, 1) | ngrams(key, 2):
+                    self.grams.setdefault(gram, set()).add(i)
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def _insert(self, key: str, i: int):
+        node = self.trie
+        for ch in key:
+            node = node.setdefault(ch, {"ids": []})
+            ids = node["ids"]
+            if len(ids) < TRIE_TOP_K and (not ids or ids[-1] != i):
+                ids.append(i)
+
+    def _prefix(self, query: str) -> List[int]:
+        node = self.trie
+        for ch in query:
+            node = node.get(ch)
+            if node is None:
+                return []
+        return node["ids"]
+
+    def _candidates(self, query: str) -> Set[int]:
+        """各字符（及二元组）倒排集合的交集，由小到大求交"""
+        grams = ngrams(query, 2) if len(query) > 1 else {query}
+        sets = sorted((self.grams.get(g, set()) for g in grams), key=len)
+        if not sets or not sets[0]:
+            # 二元组不连续时退化为按单字求交，支持按顺序的模糊匹配
+            sets = sorted((self.grams.get(ch, set()) for ch in set(query)), key=len)
+            if not sets or not sets[0]:
+                return set()
+        result = set(sets[0])
+        for s in sets[1:]:
+            result &= s
+            if not result:
+                break
+        return result
+
+    def _match_type(self, query: str, i: int) -> Optional[int]:
+        best = None
+        for key in self.keys[i]:
+            if key == query:
+                return MATCH_EXACT
+            if key.startswith(query):
+                kind = MATCH_PREFIX
+            elif query in key:
+                kind = MATCH_SUBSTRING
+            elif is_subsequence(query, key):
+                kind = MATCH_SUBSEQUENCE
+            else:
+                continue
+            best = kind if best is None else min(best, kind)
+        return best
+
+    def search(self, query: str, limit: int = 10) -> List[Tuple[int, Dict[str, Any]]]:
+        """
+        检索名称
+
+        Args:
+            query: 检索词，支持汉字、简称、全拼和拼音首字母
+            limit: 返回条数
+
+        Returns:
+            (匹配类型, 条目)列表，按匹配类型和名称长度排序
+        """
+        query = normalize(query)
+        if not query:
+            return []
+        scored: Dict[int, int] = {}
+        for i in self.exact.get(query, ()):
+            scored[i] = MATCH_EXACT
+        for i in self._prefix(query):
+            scored.setdefault(i, MATCH_PREFIX)
+        if len(scored) < limit:
+            for i in self._candidates(query):
+                if i in scored:
+                    continue
+                kind = self._match_type(query, i)
+                if kind is not None:
+                    scored[i] = kind
+        ranked = sorted(scored.items(), key=lambda item: (item[1], item[0]))[:limit]
+        return [(kind, self.entries[i]) for i, kind in ranked]
@@ -0,0 +1,118 @@
+import re
+from typing import Iterable, Optional
+
+# 3+1+2选科体系中的科目，下标即位掩码中的位置
+SUBJECTS = ["物理", "化学", "生物", "历史", "地理", "政治"]
+
+# 科目别名
+SUBJECT_ALIASES = {
+    "生物学": "生物",
+    "思想政治": "政治",
+    "思政": "政治",
+}
+
+# 表示不限选科的写法
+NO_REQUIREMENT = {"", "不限", "无", "不提科目要求", "再选不限"}
+
+SUBJECT_BITS = {name: 1 << i for i, name in enumerate(SUBJECTS)}
+# 无法识别的科目（如技术）共用的保留位，含有这类科目的选科要求与只含已知科目的要求掩码不同
+UNKNOWN_SUBJECT_BIT = 1 << len(SUBJECTS)
+
+# "全部要求"的分隔符，如"物理+化学"
+_SEPARATORS = re.compile(r"[+＋、,，和\s]+")
+# "任选其一"的分隔符，如"物理/化学"，语义与位掩码（全部要求）不同
+EITHER_OF_PATTERN = r"[/／或]"
+_EITHER_OF = re.compile(EITHER_OF_PATTERN)
+
+
+def normalize_subject(name: str) -> str:
+    """统一科目写法"""
+    name = name.strip()
+    return SUBJECT_ALIASES.get(name, name)
+
+
+def encode_subjects(subjects: Iterable[str], strict: bool = True) -> Optional[int]:
+    """
+    将科目列表编码为位掩码
+
+    Args:
+        subjects: 科目列表
+        strict: 为True时遇到无法识别的科目返回None，否则置UNKNOWN_SUBJECT_BIT位
+
+    Returns:
+        位掩码
+    """
+    mask = 0
+    for name in subjects:
+        name = normalize_subject(name)
+        if name in NO_REQUIREMENT:
+            continue
+        bit = SUBJECT_BITS.get(name)
+        if bit is None:
+            if strict:
+                return None
+            bit = UNKNOWN_SUBJECT_BIT
+        mask |= bit
+    return mask
+
+
+def is_either_of(text: Optional[str]) -> bool:
+    """选科要求是否为"任选其一"的写法，如物理/化学、物理或化学"""
+    return bool(text) and _EITHER_OF.search(text) is not None
+
+
+def parse_requirement(text: Optional[str]) -> Optional[int]:
+    """
+    解析选科要求字符串，如"物理+化学"、"物理、化学"、"不限"
+
+    Args:
+        text: 选科要求
+
+    Returns:
+        位掩码，"不限"为0；"任选其一"的写法或无法完整解析时返回None
+    """
+    if text is None:
+        return None
+    text = text.strip()
+    if text in NO_REQUIREMENT:
+        return 0
+    if is_either_of(text):
+        return None
+    return encode_subjects(part for part in _SEPARATORS.split(text) if part)
+
+
+def decode_mask(mask: int) -> list:
+    """将位掩码还原为科目列表，忽略UNKNOWN_SUBJECT_BIT位"""
+    return [name for name, bit in SUBJECT_BITS.items() if mask & bit]
+
+
+def contains_all(requirement_mask: int, subjects_mask: int) -> bool:
+    """选科要求是否包含全部指定科目，等价于hasAll(要求, 科目)"""
+    return requirement_mask & subjects_mask == subjects_mask
+
+
+def clickhouse_mask_expr(column: str) -> str:
+    """
+    生成在ClickHouse中由科目数组计算UInt16位掩码的表达式，编码与encode_subjects(strict=False)一致，
+    含有无法识别的科目时置UNKNOWN_SUBJECT_BIT位
+
+    Args:
+        column: Array(String)类型的科目列
+
+    Returns:
+        SQL表达式
+    """
+    subjects_sql = "[" + ", ".join(f"'{name}'" for name in SUBJECTS) + "]"
+    alias_from = "[" + ", ".join(f"'{name}'" for name in SUBJECT_ALIASES) + "]"
+    alias_to = "[" + ", ".join(f"'{name}'" for name in SUBJECT_ALIASES.values()) + "]"
+    ignored_sql = "[" + ", ".join(f"'{name}'" for name in sorted(NO_REQUIREMENT)) + "]"
+    normalized = f"arrayMap(s -> transform(trimBoth(s), {alias_from}, {alias_to}, trimBoth(s)), {column})"
+    known = (
+        f"arraySum(arrayMap(s -> bitShiftLeft(toUInt16(1), indexOf({subjects_sql}, s) - 1), "
+        f"arrayDistinct(arrayFilter(s -> has({subjects_sql}, s), {normalized}))))"
+    )
+    unknown = (
+        f"if(arrayExists(s -> NOT has({subjects_sql}, s) AND NOT has({ignored_sql}, s), {normalized}), "
+        f"{UNKNOWN_SUBJECT_BIT}, 0)"
+    )
+    return f"toUInt16(bitOr({known}, {unknown}))"
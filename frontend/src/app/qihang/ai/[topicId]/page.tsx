@@ -4,8 +4,6 @@ import Prompt from "@/components/prompt";
 import TopicList from "@/components/TopicList";
 import { useNotification } from "@/contexts/NotificationContext";
 import {
-    createAIMessage,
-    createMessage,
     createTopic,
     getTopicMessages,
 } from "@/lib/api";
@@ -253,6 +251,8 @@ export default function AiPage() {
                                             : msg
                                     )
                                 );
+                            } else if (data.type === "error") {
+                                showNotification("error", data.content);
                             }
                         } catch (error) {
                             console.error("解析响应数据失败:", error);
@@ -260,24 +260,7 @@ export default function AiPage() {
                     }
                 }
 
-                // 流结束后，先保存用户问题，再保存AI回复到后端
-                try {
-                    // 确保activeTopic现在有值
-                    if (!activeTopic) {
-                        throw new Error("话题ID不存在");
-                    }
-
-                    // 首先保存用户消息
-                    await createMessage(activeTopic, prompt);
-
-                    // 然后保存AI回复
-                    if (aiResponse.trim()) {
-                        await createAIMessage(activeTopic, aiResponse);
-                    }
-                } catch (error) {
-                    console.error("保存对话消息失败:", error);
-                    showNotification("error", "无法保存对话到历史记录");
-                }
+                // 用户问题和AI回复由后端在流结束后保存，无需再单独提交
             } catch (error) {
                 console.error("对话请求失败:", error);
                 showNotification("error", "对话请求失败，请稍后再试");